@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ASC文件批量解析
+按目录或通配符收集大量ASC文件（含 gzip/xz/zstd 压缩文件），在进程池中并行解析，
+结果写入二进制解析缓存（之后查看器打开这些文件时直接命中），并生成逐文件汇总表
+（CAN ID数、时间范围、帧数、无法解析的行数、吞吐量）。
+
+- 调度按文件从大到小提交，大文件先开始，避免最后只剩一个大文件在跑；
+- 按文件大小估算每个任务的内存，正在解析的任务估算总和不超过内存上限，
+  放不下最大的文件时先用能放下的小文件填补空闲进程（至少总有一个任务在跑）。
+
+命令行:
+    python asc_batch.py logs/                          解析目录下所有ASC文件
+    python asc_batch.py "logs/**/*.asc" -j 8 --memory-limit-mb 8192 --summary summary.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from asc_parse_cache import ASCParseCache
+from compressed_io import COMPRESSED_PATTERNS, detect_compression
+from progress import PROGRESS_INTERVAL, ProgressReporter
+from simple_asc_reader import SimpleASCReader
+
+# 目录下收集的文件
+ASC_PATTERNS = ('*.asc',) + tuple(f'*.asc{pattern[1:]}' for pattern in COMPRESSED_PATTERNS)
+
+# 内存估算：解析峰值约为文件大小的2倍，压缩文件按解压后约8倍计，另加每个进程的固定开销
+MEMORY_PER_FILE_BYTE = 2.5
+COMPRESSED_EXPANSION = 8
+WORKER_BASE_MEMORY = 64 * 1024 * 1024
+
+DEFAULT_MEMORY_LIMIT_MB = 4096
+
+# 汇总表的列
+SUMMARY_FIELDS = ['file', 'size_mb', 'messages', 'unique_can_ids', 'channels', 'time_start', 'time_end',
+                  'duration_seconds', 'unparsed_lines', 'elapsed_seconds', 'mb_per_second',
+                  'frames_per_second', 'cache', 'error']
+
+
+def collect_files(patterns: Sequence[str], recursive: bool = False) -> List[str]:
+    """
+    收集待解析的文件
+
+    Args:
+        patterns: 目录、文件或通配符（支持 ** 递归通配）
+        recursive: 目录是否递归查找
+
+    Returns:
+        去重后的文件路径列表（按路径排序）
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            prefix = os.path.join(pattern, '**') if recursive else pattern
+            for name_pattern in ASC_PATTERNS:
+                files.update(glob.glob(os.path.join(prefix, name_pattern), recursive=recursive))
+        elif os.path.isfile(pattern):
+            files.add(pattern)
+        else:
+            files.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(os.path.abspath(path) for path in files)
+
+
+def estimate_memory(file_path: str) -> int:
+    """估算解析一个文件的峰值内存（字节）"""
+    size = os.path.getsize(file_path)
+    if detect_compression(file_path):
+        size *= COMPRESSED_EXPANSION
+    return int(size * MEMORY_PER_FILE_BYTE) + WORKER_BASE_MEMORY
+
+
+def ingest_file(file_path: str, cache_dir: Optional[str] = None, cache_max_mb: Optional[float] = None,
+                use_cache: bool = True) -> Dict[str, Any]:
+    """
+    进程池任务：解析一个文件并写入解析缓存，返回汇总（出错时 error 字段为错误信息）
+
+    已有缓存时直接加载缓存汇总；解析器的控制台输出被屏蔽。
+    """
+    summary = {'file': file_path, 'size_mb': os.path.getsize(file_path) / (1024 * 1024), 'error': ''}
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cache = ASCParseCache(cache_dir, cache_max_mb) if use_cache else None
+            cached = cache.load(file_path) if cache else None
+            reader = SimpleASCReader()
+            if cached:
+                messages, file_info = cached
+                reader.attach(file_path, messages, file_info)
+                summary['cache'] = 'hit'
+            else:
+                messages = reader.read_file(file_path)
+                summary['cache'] = 'stored' if cache and messages and cache.store(
+                    file_path, messages, reader.file_info) else ''
+            stats = reader.get_statistics()
+    except Exception as e:
+        summary['error'] = str(e) or type(e).__name__
+        return summary
+
+    elapsed = time.perf_counter() - start
+    summary.update({
+        'messages': stats.get('total_messages', 0),
+        'unique_can_ids': stats.get('unique_can_ids', 0),
+        'channels': ' '.join(str(channel) for channel in stats.get('channel_counts', {})),
+        'time_start': stats.get('time_start'),
+        'time_end': stats.get('time_end'),
+        'duration_seconds': stats.get('duration_seconds', 0.0),
+        'unparsed_lines': reader.file_info.get('unparsed_lines'),
+        'elapsed_seconds': elapsed,
+        'mb_per_second': summary['size_mb'] / elapsed if elapsed > 0 else 0.0,
+        'frames_per_second': stats.get('total_messages', 0) / elapsed if elapsed > 0 else 0.0,
+    })
+    return summary
+
+
+def ingest_files(file_paths: Sequence[str], workers: Optional[int] = None,
+                 memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB, cache_dir: Optional[str] = None,
+                 cache_max_mb: Optional[float] = None, use_cache: bool = True,
+                 progress: Optional[ProgressReporter] = None) -> Iterator[Dict[str, Any]]:
+    """
+    并行解析多个文件，按完成顺序逐个产出汇总
+
+    Args:
+        file_paths: 文件列表
+        workers: 进程数，默认CPU核数
+        memory_limit_mb: 正在解析的任务估算内存之和的上限
+        progress: 进度报告器（按已完成文件的字节数报告；取消时撤销未开始的任务）
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    memory_limit = memory_limit_mb * 1024 * 1024
+    # 从大到小调度
+    queue = sorted(file_paths, key=os.path.getsize, reverse=True)
+    estimates = {path: estimate_memory(path) for path in queue}
+    total_bytes = sum(os.path.getsize(path) for path in queue)
+    if progress:
+        progress.start(total_bytes, '批量解析')
+
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(queue) or 1))
+    running = {}
+    used = done_bytes = frames = 0
+    try:
+        while queue or running:
+            # 依次提交放得下的最大文件（没有任务在跑时总是提交一个）
+            index = 0
+            while index < len(queue) and len(running) < workers:
+                path = queue[index]
+                if running and used + estimates[path] > memory_limit:
+                    index += 1
+                    continue
+                running[executor.submit(ingest_file, path, cache_dir, cache_max_mb, use_cache)] = path
+                used += estimates[path]
+                queue.pop(index)
+
+            done, _ = wait(running, timeout=PROGRESS_INTERVAL / 2, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = running.pop(future)
+                used -= estimates[path]
+                summary = future.result()
+                done_bytes += os.path.getsize(path)
+                frames += summary.get('messages', 0)
+                yield summary
+            if progress:
+                progress.update(done_bytes, frames)
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    if progress:
+        progress.finish()
+
+
+def write_summary(output_path: str, summaries: Sequence[Dict[str, Any]]):
+    """写出汇总表（.json 为JSON，其余为CSV）"""
+    if output_path.lower().endswith('.json'):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(list(summaries), f, ensure_ascii=False, indent=2)
+        return
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(summaries)
+
+
+def print_summary(summaries: Sequence[Dict[str, Any]], elapsed: float):
+    """打印汇总表"""
+    print(f"\n{'文件':<40}{'MB':>9}{'帧数':>12}{'ID数':>6}{'时长(s)':>10}{'未解析':>8}{'MB/s':>8}  缓存")
+    for summary in sorted(summaries, key=lambda s: s['file']):
+        name = os.path.basename(summary['file'])
+        if summary['error']:
+            print(f"{name:<40}{summary['size_mb']:>9.1f}  ❌ {summary['error']}")
+            continue
+        unparsed = summary['unparsed_lines']
+        print(f"{name:<40}{summary['size_mb']:>9.1f}{summary['messages']:>12,}{summary['unique_can_ids']:>6}"
+              f"{summary['duration_seconds']:>10.1f}{'-' if unparsed is None else unparsed:>8}"
+              f"{summary['mb_per_second']:>8.1f}  {summary['cache']}")
+
+    total_mb = sum(s['size_mb'] for s in summaries)
+    failed = sum(1 for s in summaries if s['error'])
+    print(f"📊 {len(summaries)} 个文件, {total_mb:.1f}MB, "
+          f"{sum(s.get('messages', 0) for s in summaries):,} 帧, 失败 {failed} 个, "
+          f"耗时 {elapsed:.1f}s ({total_mb / elapsed if elapsed > 0 else 0:.1f} MB/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASC文件批量并行解析")
+    parser.add_argument('paths', nargs='+', help="目录、文件或通配符（如 \"logs/**/*.asc\"）")
+    parser.add_argument('-r', '--recursive', action='store_true', help="递归查找目录")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1, help="进程数")
+    parser.add_argument('--memory-limit-mb', type=float, default=DEFAULT_MEMORY_LIMIT_MB,
+                        help="所有进程估算内存之和的上限(MB)")
+    parser.add_argument('--no-cache', action='store_true', help="不读写解析缓存")
+    parser.add_argument('--cache-dir', help="解析缓存目录")
+    parser.add_argument('--cache-max-mb', type=float, help="解析缓存总大小上限(MB)")
+    parser.add_argument('--summary', help="汇总表输出文件（.csv 或 .json）")
+    args = parser.parse_args()
+
+    file_paths = collect_files(args.paths, args.recursive)
+    if not file_paths:
+        print("⚠️ 没有找到ASC文件")
+        return
+    print(f"📁 {len(file_paths)} 个文件，{args.workers} 个进程，内存上限 {args.memory_limit_mb:.0f}MB")
+
+    start = time.perf_counter()
+    summaries = []
+    for summary in ingest_files(file_paths, args.workers, args.memory_limit_mb, args.cache_dir,
+                                args.cache_max_mb, not args.no_cache):
+        summaries.append(summary)
+        name = os.path.basename(summary['file'])
+        if summary['error']:
+            print(f"❌ [{len(summaries)}/{len(file_paths)}] {name}: {summary['error']}")
+        else:
+            print(f"✅ [{len(summaries)}/{len(file_paths)}] {name}: {summary['messages']:,} 帧, "
+                  f"{summary['mb_per_second']:.1f} MB/s")
+
+    print_summary(summaries, time.perf_counter() - start)
+    if args.summary:
+        write_summary(args.summary, summaries)
+        print(f"💾 汇总表已保存: {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,21 @@ import os
 import math
 from pathlib import Path
 import threading
-import time
+
+from compressed_io import (COMPRESSED_PATTERNS, COMPRESSION_SUFFIXES, ZSTD_AVAILABLE,
+                           detect_compression, open_compressed, strip_compression_suffix)
+from progress import PROGRESS_LINES, CancelToken, OperationCancelled, ProgressReporter
+
+# 输出压缩选项: 显示名称 -> 压缩格式
+OUTPUT_COMPRESSION_OPTIONS = [("不压缩", None), ("gzip (.gz)", 'gzip'), ("xz (.xz)", 'xz')]
+if ZSTD_AVAILABLE:
+    OUTPUT_COMPRESSION_OPTIONS.append(("zstd (.zst)", 'zstd'))
+
+# 分块读取时每次 readlines 的大小提示（字节）
+READ_CHUNK_HINT = 4 * 1024 * 1024
+
+# 各阶段在总进度条上所占的区间（百分比）
+STAGE_PROGRESS_RANGES = {'读取': (0, 50), '写入': (50, 100)}
 
 class ASCFileSplitterGUI:
     def __init__(self, root):
@@ -22,6 +36,7 @@ class ASCFileSplitterGUI:
         self.input_file = ""
         self.output_dir = ""
         self.is_processing = False
+        self.cancel_token = None
         
         # 缓存文件分析结果，避免重复读取
         self.cached_file_info = {
@@ -121,6 +136,14 @@ class ASCFileSplitterGUI:
                                         textvariable=self.split_value, command=self.update_preview)
         self.value_spinbox.grid(row=0, column=0, padx=(0, 10))
         
+        # 输出压缩选择
+        compression_frame = ttk.Frame(settings_frame)
+        compression_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        ttk.Label(compression_frame, text="输出压缩：", style='Info.TLabel').grid(row=0, column=0, sticky=tk.W, padx=(0, 10))
+        self.output_compression = tk.StringVar(value=OUTPUT_COMPRESSION_OPTIONS[0][0])
+        ttk.Combobox(compression_frame, textvariable=self.output_compression, state='readonly', width=14,
+                     values=[name for name, _ in OUTPUT_COMPRESSION_OPTIONS]).grid(row=0, column=1, sticky=tk.W)
+        
         # 文件预览信息
         self.info_label = ttk.Label(settings_frame, text="", style='Info.TLabel')
         self.info_label.grid(row=2, column=0, sticky=tk.W, pady=(10, 0))
@@ -129,6 +152,7 @@ class ASCFileSplitterGUI:
         
         # 进度区域
         progress_frame = ttk.LabelFrame(main_frame, text="📊 处理进度", padding="15")
+        self.progress_frame = progress_frame
         progress_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
         
         self.progress_var = tk.DoubleVar()
@@ -147,9 +171,12 @@ class ASCFileSplitterGUI:
         self.start_button = ttk.Button(button_frame, text="🚀 开始分割", command=self.start_split, style='Accent.TButton')
         self.start_button.grid(row=0, column=0, padx=(0, 10))
         
-        ttk.Button(button_frame, text="📋 查看结果", command=self.view_results).grid(row=0, column=1, padx=(0, 10))
-        ttk.Button(button_frame, text="❌ 清空", command=self.clear_all).grid(row=0, column=2, padx=(0, 10))
-        ttk.Button(button_frame, text="❓ 帮助", command=self.show_help).grid(row=0, column=3)
+        self.stop_button = ttk.Button(button_frame, text="⏹ 停止", command=self.stop_split, state='disabled')
+        self.stop_button.grid(row=0, column=1, padx=(0, 10))
+        
+        ttk.Button(button_frame, text="📋 查看结果", command=self.view_results).grid(row=0, column=2, padx=(0, 10))
+        ttk.Button(button_frame, text="❌ 清空", command=self.clear_all).grid(row=0, column=3, padx=(0, 10))
+        ttk.Button(button_frame, text="❓ 帮助", command=self.show_help).grid(row=0, column=4)
         
         # 配置权重
         main_frame.columnconfigure(0, weight=1)
@@ -163,7 +190,7 @@ class ASCFileSplitterGUI:
         """浏览输入文件"""
         filename = filedialog.askopenfilename(
             title="选择ASC文件",
-            filetypes=[("ASC文件", "*.asc"), ("所有文件", "*.*")]
+            filetypes=[("ASC文件", "*.asc"), ("压缩ASC文件", " ".join(COMPRESSED_PATTERNS)), ("所有文件", "*.*")]
         )
         if filename:
             self.input_file = filename
@@ -212,8 +239,8 @@ class ASCFileSplitterGUI:
         
         def analyze_worker():
             try:
-                # 读取并分析文件
-                with open(self.input_file, 'r', encoding='utf-8', errors='ignore') as f:
+                # 读取并分析文件（压缩文件由后台线程解压）
+                with open_compressed(self.input_file, 'r', errors='ignore') as f:
                     lines = f.readlines()
                 
                 # 解析文件结构，获取数据行数
@@ -320,21 +347,40 @@ class ASCFileSplitterGUI:
         
         # 在线程中执行分割
         self.is_processing = True
+        self.cancel_token = CancelToken()
         self.start_button.config(state='disabled', text='🔄 处理中...')
+        self.stop_button.config(state='normal')
         
         thread = threading.Thread(target=self.split_file_thread)
         thread.daemon = True
         thread.start()
     
-    def parse_asc_file(self, lines):
-        """解析ASC文件，分离文件头和数据部分"""
+    def stop_split(self):
+        """请求停止分割（工作线程在下一个检查点停止）"""
+        if self.cancel_token:
+            self.cancel_token.cancel()
+            self.stop_button.config(state='disabled')
+            self.status_label.config(text="正在停止...")
+    
+    def report_progress(self, info):
+        """进度回调（工作线程中调用，切回界面线程更新）"""
+        low, high = STAGE_PROGRESS_RANGES.get(info.stage, (0, 100))
+        fraction = info.fraction or 0.0
+        percent = low + (high - low) * fraction
+        text = info.format()
+        self.root.after(0, lambda: (self.progress_var.set(percent), self.status_label.config(text=text)))
+    
+    def parse_asc_file(self, lines, progress=None):
+        """解析ASC文件，分离文件头和数据部分（progress 用于检查取消）"""
         header_lines = []
         data_lines = []
         footer_lines = []
         
         in_data_section = False
         
-        for line in lines:
+        for line_num, line in enumerate(lines, 1):
+            if progress and line_num % PROGRESS_LINES == 0:
+                progress.check()
             line_stripped = line.strip().lower()
             
             # 检测数据部分开始 - 更精确的检测
@@ -407,17 +453,27 @@ base hex timestamps absolute
         return ""
 
     def split_file_thread(self):
-        """分割文件的线程函数"""
+        """分割文件的线程函数（定期报告进度，点击停止后在下一个检查点退出）"""
+        progress = ProgressReporter(self.report_progress, self.cancel_token, unit='行')
+        output_path = None
         try:
             self.root.after(0, lambda: self.status_label.config(text="正在读取文件..."))
             
-            # 读取文件
-            with open(self.input_file, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+            # 分块读取文件（压缩文件由后台线程解压，总量未知）
+            total_size = None if detect_compression(self.input_file) else os.path.getsize(self.input_file)
+            progress.start(total_size, '读取')
+            lines = []
+            with open_compressed(self.input_file, 'r', errors='ignore') as f:
+                while True:
+                    chunk = f.readlines(READ_CHUNK_HINT)
+                    if not chunk:
+                        break
+                    lines.extend(chunk)
+                    progress.advance(sum(map(len, chunk)), len(chunk))
             
             # 解析ASC文件结构
             self.root.after(0, lambda: self.status_label.config(text="正在分析文件结构..."))
-            header_lines, data_lines, footer_lines = self.parse_asc_file(lines)
+            header_lines, data_lines, footer_lines = self.parse_asc_file(lines, progress)
             
             # 只对数据行进行分割计算
             total_data_lines = len(data_lines)
@@ -432,10 +488,13 @@ base hex timestamps absolute
                 lines_per_file = self.split_value.get()
                 file_count = math.ceil(total_data_lines / lines_per_file)
             
-            # 获取原文件名（不含扩展名）
-            base_name = Path(self.input_file).stem
+            # 获取原文件名（不含扩展名，压缩文件同时去掉压缩扩展名）
+            base_name = Path(strip_compression_suffix(self.input_file)).stem
+            compression = dict(OUTPUT_COMPRESSION_OPTIONS).get(self.output_compression.get())
+            suffix = '.asc' + COMPRESSION_SUFFIXES[compression] if compression else '.asc'
             
             # 分割文件
+            progress.start(sum(map(len, data_lines)), '写入')
             for i in range(file_count):
                 start_idx = i * lines_per_file
                 end_idx = min((i + 1) * lines_per_file, total_data_lines)
@@ -444,49 +503,67 @@ base hex timestamps absolute
                     break
                 
                 # 生成输出文件名
-                output_filename = f"{base_name}_part_{i+1:03d}.asc"
+                output_filename = f"{base_name}_part_{i+1:03d}{suffix}"
                 output_path = os.path.join(self.output_dir, output_filename)
                 
-                # 写入分割文件
-                with open(output_path, 'w', encoding='utf-8') as f:
+                # 写入分割文件（可选压缩输出）
+                with open_compressed(output_path, 'w', compression) as f:
                     # 写入文件头
                     header = self.generate_asc_header(i+1, file_count)
                     f.write(header)
                     
-                    # 写入数据部分
-                    f.writelines(data_lines[start_idx:end_idx])
+                    # 写入数据部分（分段写出，段间报告进度）
+                    for block_start in range(start_idx, end_idx, PROGRESS_LINES):
+                        block = data_lines[block_start:min(block_start + PROGRESS_LINES, end_idx)]
+                        f.writelines(block)
+                        progress.advance(sum(map(len, block)), len(block))
                     
                     # 写入文件尾
                     footer = self.generate_asc_footer()
                     f.write(footer)
+                output_path = None
                 
-                # 更新进度
-                progress = ((i + 1) / file_count) * 100
-                self.root.after(0, lambda p=progress: self.progress_var.set(p))
-                self.root.after(0, lambda i=i, fc=file_count: self.status_label.config(
-                    text=f"正在生成第 {i+1}/{fc} 个文件..."))
-                
-                time.sleep(0.01)  # 避免界面卡顿
+                self.root.after(0, lambda i=i, fc=file_count: self.progress_frame.config(
+                    text=f"📊 处理进度（第 {i+1}/{fc} 个文件）"))
+            
+            progress.finish()
             
             # 完成
             self.root.after(0, self.split_complete)
             
+        except OperationCancelled:
+            # 删除写了一半的分割文件，已完成的文件保留
+            if output_path and os.path.exists(output_path):
+                os.remove(output_path)
+            self.root.after(0, self.split_cancelled)
         except Exception as e:
             self.root.after(0, lambda: self.split_error(str(e)))
     
-    def split_complete(self):
-        """分割完成处理"""
+    def reset_controls(self):
+        """恢复按钮状态"""
         self.is_processing = False
+        self.cancel_token = None
         self.start_button.config(state='normal', text='🚀 开始分割')
+        self.stop_button.config(state='disabled')
+        self.progress_frame.config(text="📊 处理进度")
+    
+    def split_complete(self):
+        """分割完成处理"""
+        self.reset_controls()
         self.status_label.config(text="✅ 分割完成！", style='Success.TLabel')
         self.progress_var.set(100)
         
         messagebox.showinfo("成功", f"文件分割完成！\n输出目录: {self.output_dir}")
     
+    def split_cancelled(self):
+        """分割被停止"""
+        self.reset_controls()
+        self.status_label.config(text="⏹ 已停止（未完成的文件已删除）", style='Info.TLabel')
+        self.progress_var.set(0)
+    
     def split_error(self, error_msg):
         """分割出错处理"""
-        self.is_processing = False
-        self.start_button.config(state='normal', text='🚀 开始分割')
+        self.reset_controls()
         self.status_label.config(text=f"❌ 处理失败: {error_msg}", style='Error.TLabel')
         self.progress_var.set(0)
         
@@ -526,9 +603,11 @@ base hex timestamps absolute
 
 📊 输出格式：
 分割后的文件命名格式：原文件名_part_001.asc
+可选择输出压缩：原文件名_part_001.asc.gz / .xz / .zst
 
 💡 小贴士：
 • 支持大文件分割，处理过程中会显示进度
+• 可直接分割 gzip/xz/zstd 压缩的ASC文件，无需先解压
 • 分割后的文件保持原始编码格式
 • 建议在分割前备份原文件
 
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ASC文件的行偏移索引
+每隔 stride 行记录一次行首的字节位置（默认每1024行一个 int64，约为文件大小的万分之一），
+按行号取原始文本时先定位到最近的采样点，再向后扫描不超过 stride 行，
+取任意帧周围的原始行、按时间裁剪原始片段都只读需要的字节。
+
+索引在首次使用时由向量化换行扫描构建，文件追加内容后 update() 只扫描新增部分；
+压缩文件无法随机访问，不支持建立索引。
+"""
+
+import mmap
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from can_message_table import GrowableArray
+
+# 默认采样间隔（行）
+LINE_INDEX_STRIDE = 1024
+
+# 建立索引时每次扫描的字节数
+INDEX_SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+class LineOffsetIndex:
+    """
+    行首字节偏移的采样索引
+
+    offsets[k] 为第 k*stride+1 行（行号从1开始）的行首字节位置。
+
+    Args:
+        file_path: 未压缩的文本文件路径
+        stride: 采样间隔（行）
+    """
+
+    def __init__(self, file_path: str, stride: int = LINE_INDEX_STRIDE):
+        if stride < 1:
+            raise ValueError(f"采样间隔必须大于0: {stride}")
+        self.file_path = file_path
+        self.stride = stride
+        self._reset()
+
+    def _reset(self):
+        self._offsets = GrowableArray(np.zeros(1, dtype=np.int64))
+        # 已扫描的字节数和其中的换行数（完整行数）
+        self.indexed_bytes = 0
+        self.newline_count = 0
+        # 最后一个换行之后的位置（最后一行的行首）
+        self._last_line_start = 0
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """采样点的字节位置"""
+        return self._offsets.view()
+
+    @property
+    def line_count(self) -> int:
+        """已索引的行数（末尾没有换行的不完整行也计入）"""
+        return self.newline_count + (self.indexed_bytes > self._last_line_start)
+
+    def update(self, end: Optional[int] = None) -> int:
+        """
+        扫描文件新增的部分（到 end 字节或文件末尾）
+
+        文件变短（被截断或替换）时重建索引。
+
+        Returns:
+            新扫描的字节数
+        """
+        size = os.path.getsize(self.file_path)
+        end = size if end is None else min(end, size)
+        if end < self.indexed_bytes:
+            self._reset()
+        start = self.indexed_bytes
+        if end <= start:
+            return 0
+
+        stride = self.stride
+        with open(self.file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for block_start in range(start, end, INDEX_SCAN_BLOCK_SIZE):
+                count = min(INDEX_SCAN_BLOCK_SIZE, end - block_start)
+                block = np.frombuffer(mm, dtype=np.uint8, count=count, offset=block_start)
+                newlines = np.flatnonzero(block == 0x0A)
+                if len(newlines):
+                    # 第 g 个换行（从0数）之后是第 g+2 行，(g+1) 为 stride 的倍数时记录
+                    first = (-(self.newline_count + 1)) % stride
+                    self._offsets.extend(newlines[first::stride].astype(np.int64) + (block_start + 1))
+                    self.newline_count += len(newlines)
+                    self._last_line_start = block_start + int(newlines[-1]) + 1
+                del block
+        self.indexed_bytes = end
+        return end - start
+
+    def line_offset(self, line: int) -> int:
+        """第 line 行（从1开始）的行首字节位置"""
+        return self.byte_range(line, 0)[0]
+
+    def byte_range(self, first_line: int, count: int) -> Tuple[int, int]:
+        """
+        从第 first_line 行开始 count 行的字节范围 [start, end)
+
+        超出已索引范围的部分被截断到已索引的末尾。
+        """
+        if first_line < 1:
+            raise ValueError(f"行号从1开始: {first_line}")
+        sample = min((first_line - 1) // self.stride, len(self._offsets) - 1)
+        offset = int(self.offsets[sample])
+        skip = first_line - 1 - sample * self.stride
+        limit = self.indexed_bytes
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            for _ in range(skip):
+                if f.tell() >= limit or not f.readline():
+                    break
+            start = min(f.tell(), limit)
+            for _ in range(count):
+                if f.tell() >= limit or not f.readline():
+                    break
+            return start, min(f.tell(), limit)
+
+    def read_lines(self, first_line: int, count: int) -> List[bytes]:
+        """读取从第 first_line 行开始的 count 行原始字节（不含行尾换行符）"""
+        start, end = self.byte_range(first_line, count)
+        with open(self.file_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        if not data:
+            return []
+        if data.endswith(b'\n'):
+            data = data[:-1]
+        return [line.rstrip(b'\r') for line in data.split(b'\n')]
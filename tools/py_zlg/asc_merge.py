@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+多个ASC日志按时间戳合并
+同一次试验被拆成多个ASC文件，或不同接口分别记录各自通道时，
+按全局时间戳顺序把 N 个日志合并为一个数据集（列式消息表或ASC文件）。
+
+- 每个输入按批次流式解析，内存占用与输入文件大小无关（每个输入只缓冲一个批次）；
+- 以各输入当前批次的末尾时间戳建堆做 K 路归并：堆顶输入的批次末尾时间之前的帧
+  在所有输入中都已读到，可整体按 (时间戳, 输入序号) 稳定排序后输出；
+- 每个输入可配置通道重映射和时间偏移；
+- 可选去除重叠区间内的重复帧：同一通道、ID、帧类型、DLC和数据的帧，
+  与序号更小（优先级更高）的输入中的帧时间差不超过窗口时丢弃。
+输入日志须按时间戳有序（ASC记录本身如此），批次内的少量乱序会被排序。
+
+命令行:
+    python asc_merge.py a.asc b.asc -o merged.asc
+    python asc_merge.py a.asc b.asc.gz -o merged.parquet --offset 1=0.25 --channel-map 1=1:2 --dedup-window 0.001
+"""
+
+import argparse
+import heapq
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from can_message_table import FLAG_EXTENDED, FLAG_FD, CANMessageTable
+from can_table_export import export_messages
+from compressed_io import detect_compression
+from progress import ProgressReporter
+from simple_asc_reader import DEFAULT_CHUNK_SIZE, MessageStatistics, SimpleASCReader
+
+# 判断重复帧时比较的标志位（方向不参与比较：同一帧在不同接口上可能分别记为Tx/Rx）
+_DEDUP_FLAGS = FLAG_EXTENDED | FLAG_FD
+
+
+@dataclass
+class MergeSource:
+    """合并输入：文件路径、通道重映射 {原通道: 新通道}、时间偏移(秒，加到时间戳上)"""
+    path: str
+    channel_map: Dict[int, int] = field(default_factory=dict)
+    time_offset: float = 0.0
+
+
+class ASCMergeReader:
+    """
+    多个ASC日志的K路时间戳归并
+
+    Args:
+        sources: 合并输入（文件路径或 MergeSource），顺序即去重时的优先级
+        dedup_window: 去重时间窗口(秒)，None 表示不去重
+        chunk_size: 每个输入每批解析的帧数
+    """
+
+    def __init__(self, sources: Sequence, dedup_window: Optional[float] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.sources = [source if isinstance(source, MergeSource) else MergeSource(source) for source in sources]
+        self.dedup_window = dedup_window
+        self.chunk_size = chunk_size
+        self.source_counts = [0] * len(self.sources)  # 各输入读取的帧数
+        self.duplicates_dropped = 0
+        self._statistics: Optional[MessageStatistics] = None
+
+    def iter_batches(self, progress: Optional[ProgressReporter] = None) -> Iterator[CANMessageTable]:
+        """
+        按全局时间戳顺序流式输出合并后的批次
+
+        Args:
+            progress: 进度报告器（按各输入已解析的字节数之和报告，有压缩输入时总量未知）
+        """
+        self.source_counts = [0] * len(self.sources)
+        self.duplicates_dropped = 0
+        self._statistics = MessageStatistics()
+
+        done_bytes = [0] * len(self.sources)
+        if progress:
+            compressed = any(detect_compression(source.path) for source in self.sources)
+            total = None if compressed else sum(os.path.getsize(source.path) for source in self.sources)
+            progress.start(total, '合并')
+        iterators = [self._iter_source(index, progress, done_bytes) for index in range(len(self.sources))]
+        buffers: List[Optional[CANMessageTable]] = [None] * len(self.sources)
+
+        def refill(index: int):
+            buffers[index] = next(iterators[index], None)
+            if buffers[index] is not None:
+                heapq.heappush(heap, (float(buffers[index].timestamps[-1]), index))
+
+        heap = []
+        for index in range(len(self.sources)):
+            refill(index)
+
+        emitted = 0
+        pending = tail = None
+        while heap:
+            # 堆顶输入的批次末尾时间：所有输入中不晚于该时间的帧都已读到
+            horizon = heap[0][0]
+            parts, part_sources = [], []
+            for index, buffer in enumerate(buffers):
+                if buffer is None:
+                    continue
+                split = int(np.searchsorted(buffer.timestamps, horizon, side='right'))
+                if split:
+                    parts.append(buffer.take(slice(0, split)))
+                    part_sources.append(np.full(split, index, dtype=np.uint16))
+                    buffers[index] = buffer.take(slice(split, None))
+            merged = CANMessageTable.concat(parts)
+            merged_sources = np.concatenate(part_sources)
+            order = np.lexsort((merged_sources, merged.timestamps))
+            merged, merged_sources = merged.take(order), merged_sources[order]
+
+            # 批次已全部输出的输入补充下一批（堆顶输入一定已输出完）
+            while heap and not len(buffers[heap[0][1]]):
+                refill(heapq.heappop(heap)[1])
+
+            if self.dedup_window is None:
+                batch = merged
+            else:
+                # 去重需要看到窗口之后的帧，只输出早于 horizon - 窗口 的部分
+                limit = horizon - self.dedup_window if heap else None
+                batch, pending, tail = self._deduplicate(merged, merged_sources, pending, tail, limit)
+
+            if len(batch):
+                emitted += len(batch)
+                self._statistics.update(batch)
+                if progress:
+                    progress.update(sum(done_bytes), emitted)
+                yield batch
+
+        if progress:
+            progress.finish()
+
+    def read(self, progress: Optional[ProgressReporter] = None) -> CANMessageTable:
+        """合并为一个列式消息表"""
+        return CANMessageTable.concat(list(self.iter_batches(progress)))
+
+    def export(self, output_path: str, progress: Optional[ProgressReporter] = None, **options) -> int:
+        """
+        流式合并并导出（格式按扩展名：ASC(可压缩)/CSV/Parquet/Arrow），返回导出的帧数
+        """
+        return export_messages(output_path, self.iter_batches(progress), **options)
+
+    def get_statistics(self):
+        """最近一次合并输出的统计信息"""
+        statistics = self._statistics or MessageStatistics()
+        return statistics.result()
+
+    def _iter_source(self, index: int, progress: Optional[ProgressReporter],
+                     done_bytes: List[int]) -> Iterator[CANMessageTable]:
+        """逐批读取一个输入：应用时间偏移和通道重映射，批次内按时间戳排序"""
+        source = self.sources[index]
+        channel_lut = np.arange(256, dtype=np.uint8)
+        for old, new in source.channel_map.items():
+            channel_lut[old] = new
+
+        source_progress = None
+        if progress:
+            # 子报告器只记录本输入的字节进度（同时检查取消），由 iter_batches 汇总报告
+            def record(info):
+                done_bytes[index] = info.done_bytes
+            source_progress = ProgressReporter(record, progress.cancel_token, interval=0)
+
+        reader = SimpleASCReader()
+        for batch in reader.iter_messages(source.path, self.chunk_size, progress=source_progress):
+            if not len(batch):
+                continue
+            self.source_counts[index] += len(batch)
+            if np.any(np.diff(batch.timestamps) < 0):
+                batch = batch.take(np.argsort(batch.timestamps, kind='stable'))
+            if source.time_offset:
+                batch.timestamps = batch.timestamps + source.time_offset
+            if source.channel_map:
+                batch.channels = channel_lut[batch.channels]
+            yield batch
+
+    def _deduplicate(self, merged: CANMessageTable, sources: np.ndarray, pending, tail, limit: Optional[float]):
+        """
+        去除重复帧
+
+        pending 为上一轮尚未输出的帧（窗口内的后续帧还未读到），tail 为已输出的最后一个窗口内的帧
+        （只作为比较对象）；limit 为本轮可输出帧的时间上限（None 表示输入已全部读完）。
+
+        Returns:
+            (本轮输出的批次, 新的 pending, 新的 tail)
+        """
+        window = self.dedup_window
+        if pending is not None:
+            merged = CANMessageTable.concat([pending[0], merged])
+            sources = np.concatenate([pending[1], sources])
+        ready = len(merged) if limit is None else int(np.searchsorted(merged.timestamps, limit, side='right'))
+
+        # 比较范围：上一窗口已输出的帧 + 本轮全部帧（含尚不能输出的后续帧）
+        if tail is not None:
+            candidates = CANMessageTable.concat([tail[0], merged])
+            candidate_sources = np.concatenate([tail[1], sources])
+            offset = len(tail[0])
+        else:
+            candidates, candidate_sources, offset = merged, sources, 0
+        duplicates = _duplicate_rows(_frame_keys(candidates), candidates.timestamps, candidate_sources, window)
+        keep = ~duplicates[offset:offset + ready]
+        self.duplicates_dropped += int(ready - keep.sum())
+
+        batch = merged.take(np.flatnonzero(keep))
+        rest = slice(ready, None)
+        new_pending = (merged.take(rest), sources[rest]) if ready < len(merged) else None
+        # 已输出部分的最后一个窗口（可能跨越上一轮的 tail）
+        end = offset + ready
+        if end:
+            start = int(np.searchsorted(candidates.timestamps[:end], candidates.timestamps[end - 1] - window,
+                                        side='left'))
+            new_tail = (candidates.take(slice(start, end)), candidate_sources[start:end])
+        else:
+            new_tail = None
+        return batch, new_pending, new_tail
+
+
+def _frame_keys(table: CANMessageTable) -> np.ndarray:
+    """每帧的内容键编号（通道、ID、帧类型、DLC、数据长度和数据都相同的帧编号相同）"""
+    n = len(table)
+    width = CANMessageTable.FD_PAYLOAD_WIDTH if len(table.fd_rows) else CANMessageTable.PAYLOAD_WIDTH
+    key_bytes = np.concatenate([
+        table.channels[:, None],
+        table.can_ids.astype('<u4').view(np.uint8).reshape(n, 4),
+        (table.flags & _DEDUP_FLAGS)[:, None],
+        table.dlcs[:, None],
+        table.lengths[:, None],
+        table.payload_matrix(width=width),
+    ], axis=1)
+    keys = np.ascontiguousarray(key_bytes).view(f'V{key_bytes.shape[1]}').ravel()
+    return np.unique(keys, return_inverse=True)[1].ravel()
+
+
+def _duplicate_rows(keys: np.ndarray, timestamps: np.ndarray, sources: np.ndarray, window: float) -> np.ndarray:
+    """
+    标记重复帧：存在内容键相同、来自序号更小的输入、时间差不超过窗口的帧
+
+    按 (键, 时间戳) 排序后，对每个输入序号 s，用前向/后向累积找到每帧之前/之后
+    最近的一个序号小于 s 的帧，比较键和时间差（全部向量化，序号 0 的帧总是保留）。
+    """
+    n = len(keys)
+    duplicates = np.zeros(n, dtype=bool)
+    if not n:
+        return duplicates
+    order = np.lexsort((timestamps, keys))
+    keys, timestamps, sources = keys[order], timestamps[order], sources[order]
+    positions = np.arange(n)
+    found = np.zeros(n, dtype=bool)
+    for source in np.unique(sources)[1:].tolist():
+        reference = sources < source
+        candidates = sources == source
+        previous = np.maximum.accumulate(np.where(reference, positions, -1))
+        following = np.minimum.accumulate(np.where(reference, positions, n)[::-1])[::-1]
+        for neighbour in (previous, following):
+            valid = candidates & (neighbour >= 0) & (neighbour < n)
+            neighbour = np.clip(neighbour, 0, n - 1)
+            found |= valid & (keys[neighbour] == keys) & (np.abs(timestamps[neighbour] - timestamps) <= window)
+    duplicates[order] = found
+    return duplicates
+
+
+def _parse_assignments(values: Sequence[str], count: int, name: str) -> Dict[int, str]:
+    """解析 "输入序号=值" 形式的命令行参数"""
+    result = {}
+    for value in values or ():
+        index, _, setting = value.partition('=')
+        if not index.isdigit() or int(index) >= count or not setting:
+            raise ValueError(f"{name} 参数格式错误: {value}（应为 输入序号=值，序号从0开始）")
+        result[int(index)] = setting
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按时间戳合并多个ASC日志")
+    parser.add_argument('files', nargs='+', help="输入ASC文件（可压缩），顺序即去重优先级")
+    parser.add_argument('-o', '--output', required=True, help="输出文件（.asc/.asc.gz/.csv/.parquet/.arrow）")
+    parser.add_argument('--offset', action='append', help="时间偏移: 输入序号=秒，如 1=0.25")
+    parser.add_argument('--channel-map', action='append', help="通道重映射: 输入序号=原:新[,原:新]，如 1=1:2")
+    parser.add_argument('--dedup-window', type=float, help="去除重复帧的时间窗口(秒)")
+    args = parser.parse_args()
+
+    offsets = _parse_assignments(args.offset, len(args.files), '--offset')
+    channel_maps = _parse_assignments(args.channel_map, len(args.files), '--channel-map')
+    sources = []
+    for index, path in enumerate(args.files):
+        channel_map = {}
+        for pair in channel_maps.get(index, '').split(','):
+            if pair:
+                old, new = pair.split(':')
+                channel_map[int(old)] = int(new)
+        sources.append(MergeSource(path, channel_map, float(offsets.get(index, 0.0))))
+
+    merger = ASCMergeReader(sources, dedup_window=args.dedup_window)
+    progress = ProgressReporter(lambda info: print(f"\r⏳ {info.format()}", end='', flush=True), interval=0.5)
+    total = merger.export(args.output, progress)
+    print()
+    for source, count in zip(sources, merger.source_counts):
+        print(f"📄 {source.path}: {count:,} 帧")
+    if args.dedup_window is not None:
+        print(f"🧹 去除重复帧: {merger.duplicates_dropped:,}")
+    print(f"✅ 已合并 {total:,} 帧: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ASC解析结果缓存
+首次解析后把列式消息表及其 (CAN ID, 通道) 行索引写成二进制旁路文件
+（每列一个 .npy，外加 meta.json），再次打开同一文件时按文件身份
+（路径、大小、修改时间、采样内容哈希）命中，以内存映射方式加载，无需重新解析。
+CAN FD 长帧的64字节数据矩阵一并缓存；延迟解码的消息表连同数据字段位置一起缓存，
+命中后仍按需从源文件解码。
+
+缓存目录可通过参数或环境变量 ZLG_ASC_CACHE_DIR 配置，
+总大小上限可通过参数或环境变量 ZLG_ASC_CACHE_MAX_MB 配置，超出时按最近使用时间淘汰。
+
+命令行:
+    python asc_parse_cache.py --list              列出缓存条目
+    python asc_parse_cache.py --clear             清空全部缓存
+    python asc_parse_cache.py --clear a.asc b.asc 只清除指定文件的缓存
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from can_message_table import CANMessageTable
+
+# 缓存格式版本，列布局或元数据变化时递增，旧版本条目自动失效
+CACHE_FORMAT_VERSION = 4
+
+# 默认缓存位置与大小上限
+DEFAULT_CACHE_DIR = Path.home() / '.zlg_offline_tools' / 'asc_cache'
+DEFAULT_MAX_CACHE_MB = 4096
+
+# 内容哈希采样：文件头、中间、尾部各取一个窗口
+_SAMPLE_SIZE = 64 * 1024
+
+_META_FILE = 'meta.json'
+_INDEX_COLUMNS = ('index_keys', 'index_offsets', 'index_rows')
+
+# 延迟解码表中会被 ensure_payloads 写入的列，以写时复制方式映射（不修改缓存文件）
+_WRITABLE_LAZY_COLUMNS = ('data', 'lengths', 'payload_pending')
+
+
+def file_identity(file_path: str) -> Dict[str, Any]:
+    """
+    计算文件身份：绝对路径、大小、修改时间和采样内容哈希
+    采样哈希只读取头/中/尾三个窗口，与文件大小无关
+    """
+    path = os.path.normcase(os.path.abspath(file_path))
+    stat = os.stat(path)
+    size = stat.st_size
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for offset in sorted({0, max(0, size // 2 - _SAMPLE_SIZE // 2), max(0, size - _SAMPLE_SIZE)}):
+            f.seek(offset)
+            digest.update(f.read(_SAMPLE_SIZE))
+
+    return {
+        'path': path,
+        'size': size,
+        'mtime_ns': stat.st_mtime_ns,
+        'content_hash': digest.hexdigest(),
+    }
+
+
+class ASCParseCache:
+    """ASC解析结果的二进制旁路缓存"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_mb: Optional[float] = None):
+        """
+        Args:
+            cache_dir: 缓存目录，默认取环境变量 ZLG_ASC_CACHE_DIR 或 ~/.zlg_offline_tools/asc_cache
+            max_mb: 缓存总大小上限(MB)，默认取环境变量 ZLG_ASC_CACHE_MAX_MB 或 4096
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get('ZLG_ASC_CACHE_DIR') or DEFAULT_CACHE_DIR
+        if max_mb is None:
+            max_mb = float(os.environ.get('ZLG_ASC_CACHE_MAX_MB') or DEFAULT_MAX_CACHE_MB)
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+    def _entry_dir(self, path: str) -> Path:
+        """每个源文件路径对应一个缓存条目目录"""
+        return self.cache_dir / hashlib.sha1(path.encode('utf-8')).hexdigest()
+
+    def load(self, file_path: str) -> Optional[Tuple[CANMessageTable, Dict[str, Any]]]:
+        """
+        查找缓存
+
+        Returns:
+            命中时返回 (内存映射的消息表, 文件头信息)，未命中或已过期返回 None
+        """
+        identity = file_identity(file_path)
+        entry_dir = self._entry_dir(identity['path'])
+        meta_path = entry_dir / _META_FILE
+        if not meta_path.exists():
+            return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != CACHE_FORMAT_VERSION or meta.get('identity') != identity:
+                # 源文件已变化或缓存格式过期
+                self._remove_entry(entry_dir)
+                return None
+
+            lazy = meta.get('payload_encoding') is not None
+            names = CANMessageTable.COLUMNS + CANMessageTable.FD_COLUMNS + _INDEX_COLUMNS
+            if lazy:
+                names += CANMessageTable.LAZY_COLUMNS
+            columns = {name: np.load(entry_dir / f'{name}.npy',
+                                     mmap_mode='c' if lazy and name in _WRITABLE_LAZY_COLUMNS else 'r')
+                       for name in names}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 读取解析缓存失败: {e}")
+            self._remove_entry(entry_dir)
+            return None
+
+        # 更新访问时间，用于LRU淘汰
+        os.utime(meta_path)
+
+        index = tuple(columns[name] for name in _INDEX_COLUMNS)
+        payload_source = (identity['path'], meta['payload_encoding']) if lazy else None
+        return CANMessageTable.from_columns(columns, index, payload_source), meta['file_info']
+
+    def store(self, file_path: str, table: CANMessageTable, file_info: Dict[str, Any]) -> bool:
+        """写入缓存（先写临时目录再改名，避免留下半成品），写入后按大小上限淘汰"""
+        if file_info.get('filter'):
+            # 缓存按源文件命中，只保存完整解析的结果
+            print("⚠️ 过滤读取的结果不写入解析缓存")
+            return False
+        try:
+            identity = file_identity(file_path)
+            entry_dir = self._entry_dir(identity['path'])
+            tmp_dir = entry_dir.with_name(f"{entry_dir.name}.tmp{os.getpid()}")
+            self._remove_entry(tmp_dir)
+            tmp_dir.mkdir(parents=True)
+
+            columns = table.columns()
+            columns.update(zip(_INDEX_COLUMNS, table.build_index()))
+            for name, column in columns.items():
+                np.save(tmp_dir / f'{name}.npy', np.ascontiguousarray(column))
+
+            meta = {
+                'version': CACHE_FORMAT_VERSION,
+                'identity': identity,
+                'file_info': file_info,
+                'message_count': len(table),
+                # 延迟解码表记录源文件编码（命中后从源文件解码数据）
+                'payload_encoding': table.payload_source[1] if table.is_lazy else None,
+                'created': time.time(),
+            }
+            with open(tmp_dir / _META_FILE, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+
+            self._remove_entry(entry_dir)
+            tmp_dir.rename(entry_dir)
+        except OSError as e:
+            print(f"⚠️ 写入解析缓存失败: {e}")
+            return False
+
+        self.evict()
+        return True
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """列出缓存条目（按最近使用时间从新到旧）"""
+        if not self.cache_dir.exists():
+            return []
+
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            meta_path = entry_dir / _META_FILE
+            if not meta_path.exists():
+                continue
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                size = sum(p.stat().st_size for p in entry_dir.iterdir())
+                last_used = meta_path.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            entries.append({
+                'dir': entry_dir,
+                'source': meta.get('identity', {}).get('path', ''),
+                'message_count': meta.get('message_count', 0),
+                'size': size,
+                'last_used': last_used,
+            })
+
+        entries.sort(key=lambda e: e['last_used'], reverse=True)
+        return entries
+
+    def evict(self) -> int:
+        """淘汰最久未使用的条目，直到总大小不超过上限，返回淘汰数量"""
+        entries = self.entries()
+        total = sum(e['size'] for e in entries)
+        removed = 0
+        while entries and total > self.max_bytes:
+            entry = entries.pop()
+            if self._remove_entry(entry['dir']):
+                total -= entry['size']
+                removed += 1
+        return removed
+
+    def invalidate(self, file_path: Optional[str] = None) -> int:
+        """
+        清除缓存
+
+        Args:
+            file_path: 只清除该源文件的缓存，None 表示清空全部
+
+        Returns:
+            清除的条目数
+        """
+        if file_path is not None:
+            path = os.path.normcase(os.path.abspath(file_path))
+            return int(self._remove_entry(self._entry_dir(path)))
+
+        return sum(int(self._remove_entry(entry['dir'])) for entry in self.entries())
+
+    @staticmethod
+    def _remove_entry(entry_dir: Path) -> bool:
+        """删除条目目录（Windows下正被内存映射的条目删除会失败，跳过即可）"""
+        if not entry_dir.exists():
+            return False
+        try:
+            shutil.rmtree(entry_dir)
+            return True
+        except OSError as e:
+            print(f"⚠️ 无法删除缓存 {entry_dir}: {e}")
+            return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASC解析缓存管理")
+    parser.add_argument('files', nargs='*', help="指定源文件（配合 --clear）")
+    parser.add_argument('--dir', help="缓存目录")
+    parser.add_argument('--list', action='store_true', help="列出缓存条目")
+    parser.add_argument('--clear', action='store_true', help="清除缓存（未指定文件时清空全部）")
+    args = parser.parse_args()
+
+    cache = ASCParseCache(args.dir)
+
+    if args.clear:
+        if args.files:
+            removed = sum(cache.invalidate(file_path) for file_path in args.files)
+        else:
+            removed = cache.invalidate()
+        print(f"🗑️ 已清除 {removed} 个缓存条目")
+        return
+
+    entries = cache.entries()
+    print(f"📁 缓存目录: {cache.cache_dir}")
+    print(f"📊 {len(entries)} 个条目, 共 {sum(e['size'] for e in entries) / (1024 * 1024):.1f}MB "
+          f"(上限 {cache.max_bytes / (1024 * 1024):.0f}MB)")
+    if args.list:
+        for entry in entries:
+            last_used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))
+            print(f"   {last_used}  {entry['size'] / (1024 * 1024):8.1f}MB  "
+                  f"{entry['message_count']:>10,} 条  {entry['source']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ASC解析性能基准
+生成测试语料，对比旧版逐行解析、正则解析路径与快速分词路径（字节行）的每秒处理行数，
+以及延迟解码和多进程并行read_file
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from simple_asc_reader import SimpleASCReader
+
+# 旧版解析器使用的正则（每行依次尝试，未预编译）
+_LEGACY_PATTERNS = [
+    r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]+)x?\s+(Rx|Tx)\s+d\s+(\d+)\s+(.*)$',
+    r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]+)x?\s+(Rx|Tx)\s+(\d+)\s+(.*)$',
+    r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]{8})\s+(Rx|Tx)\s+d\s+(\d+)\s+(.*)$',
+]
+
+
+def legacy_parse_line(line: str, line_num: int):
+    """旧版逐行解析算法（基准参照）：依次尝试正则，逐字节int解析，生成消息字典"""
+    for pattern in _LEGACY_PATTERNS:
+        match = re.match(pattern, line, re.IGNORECASE)
+        if not match:
+            continue
+        timestamp, channel, can_id, direction, dlc, data_str = match.groups()
+        is_extended = line.find(can_id + 'x') != -1
+        data_bytes = []
+        for hex_val in data_str.strip().split():
+            if len(hex_val) <= 2:
+                try:
+                    data_bytes.append(int(hex_val, 16))
+                except ValueError:
+                    break
+        can_id_int = int(can_id, 16)
+        is_extended = is_extended or can_id_int > 0x7FF
+        return {
+            'timestamp': float(timestamp),
+            'channel': int(channel),
+            'can_id': can_id_int,
+            'can_id_hex': can_id.upper(),
+            'is_extended': is_extended,
+            'frame_type': 'Extended' if is_extended else 'Standard',
+            'direction': direction,
+            'dlc': int(dlc),
+            'data': data_bytes,
+            'data_hex': ' '.join(f'{b:02X}' for b in data_bytes),
+            'line_number': line_num,
+            'raw_line': line_num
+        }
+    return None
+
+
+def generate_corpus(file_path: str, line_count: int, seed: int = 0):
+    """生成测试用ASC文件（混合格式1/格式2、标准帧/扩展帧）"""
+    rng = random.Random(seed)
+    can_ids = [0x100, 0x1A0, 0x2F0, 0x7FF, 0x18FEF100, 0x0CF00400]
+    timestamp = 0.0
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write("date Mon Oct  5 06:00:00 2025\n")
+        f.write("base hex timestamps absolute\n")
+        f.write("// version 7.0.0\n")
+        f.write("Begin Triggerblock Mon Oct  5 06:00:00 2025\n")
+        for i in range(line_count):
+            can_id = can_ids[i % len(can_ids)]
+            dlc = rng.randint(1, 8)
+            data_str = " ".join(f"{rng.randint(0, 255):02X}" for _ in range(dlc))
+            id_str = f"{can_id:X}x" if can_id > 0x7FF else f"{can_id:X}"
+            direction = "Tx" if i % 10 == 0 else "Rx"
+            if i % 5 == 0:
+                f.write(f"{timestamp:.6f} 1 {id_str} {direction} {dlc} {data_str}\n")
+            else:
+                f.write(f"   {timestamp:8.6f} 1  {id_str:<15} {direction}   d {dlc} {data_str}\n")
+            timestamp += 0.0005
+        f.write("End TriggerBlock\n")
+
+
+def _bench_lines(parse, lines):
+    """对预先读入的行调用解析函数，返回 (耗时, 帧数)"""
+    frames = 0
+    start = time.perf_counter()
+    for line_num, line in enumerate(lines, 1):
+        if parse(line.strip(), line_num):
+            frames += 1
+    return time.perf_counter() - start, frames
+
+
+def run_benchmark(file_path: str, repeat: int = 3, workers: int = 1):
+    """运行基准并打印结果"""
+    reader = SimpleASCReader()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    # 快速路径直接在原始字节行上解析
+    with open(file_path, 'rb') as f:
+        raw_lines = f.readlines()
+
+    print(f"📁 语料: {file_path} ({os.path.getsize(file_path) / (1024 * 1024):.1f}MB, {len(lines):,} 行)")
+    print(f"{'解析路径':<16}{'耗时(s)':>10}{'行/秒':>14}{'帧数':>12}")
+
+    cases = [
+        ("旧版逐行解析", legacy_parse_line, lines),
+        ("正则解析", reader._parse_can_message_regex, lines),
+        ("快速分词", reader._parse_can_message, raw_lines),
+    ]
+    results = {}
+    for name, parse, case_lines in cases:
+        best = min(_bench_lines(parse, case_lines) for _ in range(repeat))
+        elapsed, frames = best
+        results[name] = elapsed
+        print(f"{name:<16}{elapsed:>10.3f}{len(lines) / elapsed:>14,.0f}{frames:>12,}")
+
+    start = time.perf_counter()
+    reader.read_file(file_path)
+    elapsed = time.perf_counter() - start
+    print(f"{'read_file(完整)':<16}{elapsed:>10.3f}{len(lines) / elapsed:>14,.0f}{len(reader.messages):>12,}")
+
+    start = time.perf_counter()
+    reader.read_file(file_path, lazy_payload=True)
+    lazy_elapsed = time.perf_counter() - start
+    print(f"{'read_file(延迟)':<16}{lazy_elapsed:>10.3f}{len(lines) / lazy_elapsed:>14,.0f}{len(reader.messages):>12,}")
+    print(f"⚡ 延迟解码加速比: {elapsed / lazy_elapsed:.2f}x")
+
+    if workers > 1:
+        start = time.perf_counter()
+        reader.read_file(file_path, workers=workers)
+        parallel_elapsed = time.perf_counter() - start
+        name = f"read_file(x{workers})"
+        print(f"{name:<16}{parallel_elapsed:>10.3f}{len(lines) / parallel_elapsed:>14,.0f}{len(reader.messages):>12,}")
+        print(f"⚡ 并行加速比: {elapsed / parallel_elapsed:.2f}x ({workers} 进程)")
+
+    print(f"⚡ 快速分词加速比: 相对旧版 {results['旧版逐行解析'] / results['快速分词']:.2f}x, "
+          f"相对正则路径 {results['正则解析'] / results['快速分词']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASC解析性能基准")
+    parser.add_argument('--lines', type=int, default=500000, help="生成的数据行数")
+    parser.add_argument('--file', help="使用已有的ASC文件（不生成语料）")
+    parser.add_argument('--repeat', type=int, default=3, help="每个用例重复次数（取最优）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="并行read_file的进程数")
+    args = parser.parse_args()
+
+    if args.file:
+        run_benchmark(args.file, args.repeat, args.workers)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = os.path.join(tmp_dir, "benchmark.asc")
+        generate_corpus(corpus, args.lines)
+        run_benchmark(corpus, args.repeat, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
+import os
 import sys
 import re
+from pathlib import Path
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog, QComboBox, QMessageBox
+    QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog, QComboBox, QMessageBox,
+    QProgressBar
 )
 
 # BLF支持
@@ -12,17 +18,29 @@ except ImportError:
     BLF_AVAILABLE = False
 import python_can
 
+sys.path.insert(0, str(Path(__file__).parent))
+from simple_asc_reader import SimpleASCReader, DEFAULT_CHUNK_SIZE
+from compressed_io import (
+    COMPRESSED_PATTERNS, COMPRESSION_SUFFIXES, ZSTD_AVAILABLE, detect_compression, open_compressed
+)
+from progress import PROGRESS_LINES, CancelToken, OperationCancelled, ProgressReporter
+
 class ASCMessage:
     def __init__(self, timestamp, can_id, data):
         self.timestamp = timestamp
         self.can_id = can_id
         self.data = data
-def blf_to_asc(blf_path, asc_path):
+def blf_to_asc(blf_path, asc_path, compression='auto', progress=None):
+    """BLF转ASC，progress 按已转换帧数报告（BLF内部压缩，字节进度未知）"""
     if not BLF_AVAILABLE:
         raise RuntimeError('请先安装python-can库: pip install python-can')
-    with can.BLFReader(blf_path) as log, open(asc_path, 'w', encoding='utf-8') as f:
+    if progress:
+        progress.start(None, 'BLF转ASC')
+    with can.BLFReader(blf_path) as log, open_compressed(asc_path, 'w', compression) as f:
         f.write('// ASC log generated from BLF\n')
-        for msg in log:
+        for count, msg in enumerate(log, 1):
+            if progress and count % PROGRESS_LINES == 0:
+                progress.update(0, count)
             if hasattr(msg, 'timestamp') and hasattr(msg, 'arbitration_id') and hasattr(msg, 'data'):
                 # BLF时间戳为绝对秒
                 timestamp = msg.timestamp
@@ -31,6 +49,8 @@ def blf_to_asc(blf_path, asc_path):
                 dlc = len(msg.data)
                 # ASC格式：时间戳 1 CANID Rx d DLC DATA
                 f.write(f"{timestamp:.6f} 1 {can_id} Rx d {dlc} {data}\n")
+    if progress:
+        progress.finish()
 
 class TRCMessage:
     def __init__(self, timestamp, can_id, data):
@@ -38,22 +58,28 @@ class TRCMessage:
         self.can_id = can_id
         self.data = data
 
+def iter_asc(file_path, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """流式读取ASC文件中的Rx帧，按批次解析，不保留整个文件（支持gzip/xz/zstd压缩文件）"""
+    reader = SimpleASCReader()
+    if progress:
+        # 消费端逐帧写出较慢，缩小批次让取消检查点足够密集
+        chunk_size = min(chunk_size, PROGRESS_LINES)
+    for batch in reader.iter_messages(file_path, chunk_size, progress=progress):
+        rx_rows = np.flatnonzero(~batch.is_tx)
+        can_ids = batch.can_ids[rx_rows].tolist()
+        timestamps = batch.timestamps[rx_rows].tolist()
+        for row, timestamp, can_id in zip(rx_rows.tolist(), timestamps, can_ids):
+            data = [f"{b:02X}" for b in batch.payload(row)]
+            yield ASCMessage(timestamp, f"{can_id:X}", data)
+
 def parse_asc(file_path):
-    messages = []
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-                # 支持带通道号的ASC格式
-            m = re.match(r"(\d+\.\d+)\s+\d+\s+([\w]+)\s+Rx\s+d\s+(\d+)\s+([\dA-Fa-f ]+)", line)
-            if m:
-                timestamp = float(m.group(1))
-                can_id = m.group(2)
-                data = m.group(4).strip().split()
-                messages.append(ASCMessage(timestamp, can_id, data))
-    print('parse_asc:', messages)
+    messages = list(iter_asc(file_path))
+    print(f'parse_asc: {len(messages)} 条消息')
     return messages
 
-def write_trc(messages, file_path):
-    with open(file_path, 'w', encoding='utf-8') as f:
+def write_trc(messages, file_path, compression='auto'):
+    """写TRC文件，compression 为 'auto' 时按扩展名(.gz/.xz/.zst)压缩"""
+    with open_compressed(file_path, 'w', compression) as f:
         # 标准TRC头部
         f.write(";TRC log generated by ASC<->TRC Converter\n")
         f.write(";   Date: \n")
@@ -73,10 +99,17 @@ def write_trc(messages, file_path):
             # 字段顺序：时间戳  通道  方向  ID  DLC  数据
             f.write(f"{msg.timestamp:.6f}\t1\tRx\t{id_str}\t{len(msg.data)}\t{data_str}\n")
 
-def parse_trc(file_path):
-    messages = []
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
+def iter_trc(file_path, progress=None):
+    """流式读取TRC文件（支持gzip/xz/zstd压缩文件），progress 按已读字符数和帧数报告"""
+    if progress:
+        progress.start(None if detect_compression(file_path) else os.path.getsize(file_path), '解析TRC')
+    done = count = 0
+    with open_compressed(file_path, 'r', errors='ignore') as f:
+        for line_num, line in enumerate(f, 1):
+            if progress:
+                done += len(line)
+                if line_num % PROGRESS_LINES == 0:
+                    progress.update(done, count)
             if line.startswith(';') or not line.strip():
                 continue
             m = re.match(r"(\d+\.\d+)\t([\w]+)\tRx\td\t(\d+)\t([\dA-Fa-f ]+)", line)
@@ -84,16 +117,69 @@ def parse_trc(file_path):
                 timestamp = float(m.group(1))
                 can_id = m.group(2)
                 data = m.group(4).strip().split()
-                messages.append(TRCMessage(timestamp, can_id, data))
-    return messages
+                count += 1
+                yield TRCMessage(timestamp, can_id, data)
+    if progress:
+        progress.finish()
+
+def parse_trc(file_path):
+    return list(iter_trc(file_path))
 
-def write_asc(messages, file_path):
-    with open(file_path, 'w', encoding='utf-8') as f:
+def write_asc(messages, file_path, compression='auto'):
+    """写ASC文件，compression 为 'auto' 时按扩展名(.gz/.xz/.zst)压缩"""
+    with open_compressed(file_path, 'w', compression) as f:
         f.write("// ASC log generated by ASC<->TRC Converter\n")
         for msg in messages:
             data_str = ' '.join(msg.data)
             f.write(f"{msg.timestamp:.6f} {msg.can_id} Rx d {len(msg.data)} {data_str}\n")
 
+CONVERT_MODES = ("ASC转TRC", "TRC转ASC", "BLF转ASC")
+
+def convert_file(mode, input_path, output_path, compression='auto', progress=None):
+    """
+    按模式转换文件（流式，边读边写）
+    取消时抛出 OperationCancelled 并删除写了一半的输出文件
+    """
+    try:
+        if mode == 0:
+            write_trc(iter_asc(input_path, progress=progress), output_path, compression)
+        elif mode == 1:
+            write_asc(iter_trc(input_path, progress), output_path, compression)
+        elif mode == 2:
+            blf_to_asc(input_path, output_path, compression, progress)
+        else:
+            raise ValueError(f"未知的转换模式: {mode}")
+    except OperationCancelled:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+
+class ConvertWorker(QThread):
+    """后台转换线程，进度通过信号回到界面线程"""
+    progress = pyqtSignal(object)
+    succeeded = pyqtSignal()
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, mode, input_path, output_path, compression):
+        super().__init__()
+        self.mode = mode
+        self.input_path = input_path
+        self.output_path = output_path
+        self.compression = compression
+        self.cancel_token = CancelToken()
+
+    def run(self):
+        reporter = ProgressReporter(self.progress.emit, self.cancel_token)
+        try:
+            convert_file(self.mode, self.input_path, self.output_path, self.compression, reporter)
+        except OperationCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit()
+
 class ConverterUI(QWidget):
     def __init__(self):
         super().__init__()
@@ -110,17 +196,39 @@ class ConverterUI(QWidget):
         layout.addWidget(self.file_btn)
 
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["ASC转TRC", "TRC转ASC", "BLF转ASC"])
+        self.format_combo.addItems(CONVERT_MODES)
         layout.addWidget(self.format_combo)
 
+        # 输出压缩
+        self.compression_combo = QComboBox()
+        self.compression_combo.addItem("输出不压缩", None)
+        self.compression_combo.addItem("输出gzip压缩 (.gz)", 'gzip')
+        self.compression_combo.addItem("输出xz压缩 (.xz)", 'xz')
+        if ZSTD_AVAILABLE:
+            self.compression_combo.addItem("输出zstd压缩 (.zst)", 'zstd')
+        layout.addWidget(self.compression_combo)
+
         self.convert_btn = QPushButton("开始转换")
         self.convert_btn.clicked.connect(self.convert)
         layout.addWidget(self.convert_btn)
 
+        # 进度（吞吐量/剩余时间）与停止
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        layout.addWidget(self.progress_bar)
+        self.progress_label = QLabel("")
+        layout.addWidget(self.progress_label)
+        self.stop_btn = QPushButton("停止")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        layout.addWidget(self.stop_btn)
+
         self.input_path = None
+        self.worker = None
 
     def choose_file(self):
-        path, _ = QFileDialog.getOpenFileName(self, "选择文件", "", "ASC/TRC Files (*.asc *.trc);;All Files (*)")
+        patterns = ' '.join(('*.asc', '*.trc') + COMPRESSED_PATTERNS)
+        path, _ = QFileDialog.getOpenFileName(self, "选择文件", "", f"ASC/TRC Files ({patterns});;All Files (*)")
         if path:
             self.input_path = path
             self.label.setText(f"已选择文件: {path}")
@@ -132,22 +240,58 @@ class ConverterUI(QWidget):
         out_path, _ = QFileDialog.getSaveFileName(self, "保存为", "", "ASC/TRC Files (*.asc *.trc);;All Files (*)")
         if not out_path:
             return
-        try:
-            idx = self.format_combo.currentIndex()
-            if idx == 0:
-                # ASC转TRC
-                msgs = parse_asc(self.input_path)
-                write_trc(msgs, out_path)
-            elif idx == 1:
-                # TRC转ASC
-                msgs = parse_trc(self.input_path)
-                write_asc(msgs, out_path)
-            elif idx == 2:
-                # BLF转ASC
-                blf_to_asc(self.input_path, out_path)
-            QMessageBox.information(self, "成功", "转换完成！")
-        except Exception as e:
-            QMessageBox.critical(self, "转换失败", str(e))
+        # 选择了压缩格式时补上扩展名；未选择时仍按输出扩展名自动判断
+        compression = self.compression_combo.currentData()
+        if compression and not out_path.lower().endswith(COMPRESSION_SUFFIXES[compression]):
+            out_path += COMPRESSION_SUFFIXES[compression]
+        compression = compression or 'auto'
+
+        # 在后台线程中转换，界面保持响应
+        self.worker = ConvertWorker(self.format_combo.currentIndex(), self.input_path, out_path, compression)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.succeeded.connect(lambda: self.on_finished("转换完成！"))
+        self.worker.failed.connect(self.on_failed)
+        self.worker.cancelled.connect(lambda: self.on_finished(None))
+        self.convert_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.progress_bar.setValue(0)
+        self.progress_label.setText("转换中...")
+        self.worker.start()
+
+    def stop(self):
+        if self.worker:
+            self.worker.cancel_token.cancel()
+            self.stop_btn.setEnabled(False)
+
+    def on_progress(self, info):
+        fraction = info.fraction
+        if fraction is None:
+            # 总量未知（压缩文件/BLF）时显示忙碌状态
+            self.progress_bar.setRange(0, 0)
+        else:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(fraction * 1000))
+        self.progress_label.setText(info.format())
+
+    def _reset_controls(self):
+        self.worker = None
+        self.convert_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.progress_bar.setRange(0, 1000)
+
+    def on_finished(self, message):
+        self._reset_controls()
+        if message is None:
+            self.progress_bar.setValue(0)
+            self.progress_label.setText("已停止，未完成的输出文件已删除")
+            return
+        self.progress_bar.setValue(1000)
+        QMessageBox.information(self, "成功", message)
+
+    def on_failed(self, error):
+        self._reset_controls()
+        self.progress_label.setText("")
+        QMessageBox.critical(self, "转换失败", error)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -11,7 +11,17 @@ a = Analysis(
         ('help_texts', 'help_texts'),        # 包含帮助文本目录
         ('help_manager.py', '.'),           # 包含帮助管理器
         ('simple_asc_reader.py', '.'),      # ASC文件解析器
+        ('can_message_table.py', '.'),      # 列式CAN消息表
+        ('asc_parse_cache.py', '.'),        # ASC解析缓存
+        ('encoding_detector.py', '.'),      # 文件编码检测
+        ('compressed_io.py', '.'),          # 压缩日志读写
+        ('can_table_export.py', '.'),       # 消息/信号批量导出
+        ('progress.py', '.'),               # 进度报告与取消
+        ('asc_merge.py', '.'),              # 多日志按时间戳合并
+        ('asc_line_index.py', '.'),         # 原始日志行偏移索引
+        ('signal_decoder.py', '.'),         # 向量化信号解码
         ('dbc_parser.py', '.'),             # DBC文件解析器（新增）
+        ('dbc_cache.py', '.'),              # DBC解析缓存
         ('dbc_plugin.py', '.'),             # DBC插件（新增）
         ('README.md', '.'),                 # 项目说明文档
         ('requirements.txt', '.'),          # 依赖清单
@@ -65,7 +75,9 @@ a = Analysis(
         
         # 项目模块（显式导入）
         'simple_asc_reader',    # ASC文件解析器
+        'signal_decoder',       # 向量化信号解码
         'dbc_parser',           # DBC文件解析器
+        'dbc_cache',            # DBC解析缓存
         'dbc_plugin',           # DBC插件
         'help_manager',         # 帮助管理器
         
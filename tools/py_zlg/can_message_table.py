@@ -0,0 +1,766 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+列式CAN消息表
+用NumPy数组按列存储CAN帧，替代每帧一个字典的存储方式
+"""
+
+import mmap
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from encoding_detector import decode_line
+
+# 帧标志位（flags列）
+FLAG_EXTENDED = 0x01  # 扩展帧
+FLAG_TX = 0x02        # 发送方向（未置位表示Rx）
+FLAG_FD = 0x04        # CAN FD 帧
+FLAG_BRS = 0x08       # CAN FD 位速率切换(BRS)
+FLAG_ESI = 0x10       # CAN FD 错误状态指示(ESI)
+
+# 十六进制字符 -> 半字节值（非十六进制字符为 0xFF）
+HEX_NIBBLES = np.full(256, 0xFF, dtype=np.uint8)
+for _digit, _value in zip(b'0123456789abcdefABCDEF', list(range(16)) + list(range(10, 16))):
+    HEX_NIBBLES[_digit] = _value
+
+# bytes.split / bytes.strip / bytes.fromhex 视为空白的字符
+WHITESPACE = np.zeros(256, dtype=bool)
+WHITESPACE[list(b' \t\n\r\x0b\x0c')] = True
+
+
+def parse_hex_tokens(data_str: str) -> bytes:
+    """逐个解析数据字节，遇到无效字段停止（忽略超过2个字符的字段）"""
+    data_bytes = bytearray()
+    for hex_val in data_str.split():
+        if len(hex_val) <= 2:  # 确保是有效的十六进制
+            try:
+                data_bytes.append(int(hex_val, 16))
+            except ValueError:
+                break
+    return bytes(data_bytes)
+
+
+def decode_hex_fields(buffer: np.ndarray, offsets: np.ndarray, spans: np.ndarray,
+                      encoding: str, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量解码源文件中的数据字段（"XX XX XX" 文本）
+
+    标准格式（每字节2个十六进制字符、单个空白分隔）的字段一次性向量化解码；
+    其余字段逐个按 parse_hex_tokens 解析，结果与逐行解析一致。
+
+    Args:
+        buffer: 源文件内容（uint8，通常为内存映射）
+        offsets: 各数据字段的起始字节位置
+        spans: 各数据字段的字节长度
+        encoding: 源文件编码（非标准字段解码用）
+        width: 数据矩阵宽度（超出部分截断）
+
+    Returns:
+        (k×width 数据矩阵, 实际数据字节数)
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    spans = np.asarray(spans, dtype=np.int64)
+    count = len(offsets)
+    data = np.zeros((count, width), dtype=np.uint8)
+    lengths = np.zeros(count, dtype=np.uint8)
+    if not count:
+        return data, lengths
+
+    # 取每个字段开头的定宽窗口，按 3 字节一组拆出高/低半字节和分隔符
+    window = np.minimum(offsets[:, None] + np.arange(width * 3 - 1), len(buffer) - 1)
+    chars = buffer[window]
+    high = HEX_NIBBLES[chars[:, 0::3]]
+    low = HEX_NIBBLES[chars[:, 1::3]]
+    separators = WHITESPACE[chars[:, 2::3]]
+
+    field_lengths = (spans + 1) // 3
+    position = np.arange(width)
+    in_field = position < field_lengths[:, None]
+    canonical = (
+        (spans == field_lengths * 3 - 1) & (field_lengths <= width)
+        & np.all((high != 0xFF) & (low != 0xFF) | ~in_field, axis=1)
+        & np.all(separators | ~in_field[:, 1:], axis=1)
+    )
+
+    data[canonical] = np.where(in_field[canonical], (high[canonical] << 4) | low[canonical], 0)
+    lengths[canonical] = field_lengths[canonical]
+
+    for i in np.flatnonzero(~canonical).tolist():
+        start = int(offsets[i])
+        payload = parse_hex_tokens(decode_line(buffer[start:start + int(spans[i])].tobytes(), encoding))[:width]
+        data[i, :len(payload)] = np.frombuffer(payload, dtype=np.uint8)
+        lengths[i] = len(payload)
+
+    return data, lengths
+
+
+class GrowableArray:
+    """
+    可追加的NumPy数组
+    容量按倍数增长，追加的均摊开销与新增元素数成正比；view() 返回有效部分的视图
+    """
+
+    def __init__(self, initial):
+        # 初始数组可能是只读的（内存映射）或其他数组的视图，首次追加时会复制到新缓冲区
+        self._buffer = np.asarray(initial)
+        self._size = len(self._buffer)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def view(self) -> np.ndarray:
+        """有效数据的视图"""
+        return self._buffer[:self._size]
+
+    def extend(self, values):
+        """追加元素"""
+        values = np.asarray(values)
+        if not len(values):
+            return
+        needed = self._size + len(values)
+        if needed > len(self._buffer):
+            capacity = max(needed, len(self._buffer) * 2, 1024)
+            buffer = np.empty((capacity,) + self._buffer.shape[1:], dtype=self._buffer.dtype)
+            buffer[:self._size] = self._buffer[:self._size]
+            self._buffer = buffer
+        self._buffer[self._size:needed] = values
+        self._size = needed
+
+
+class TimeIndex:
+    """
+    时间戳的二分查找索引
+
+    时间戳单调不减时直接在原数组上 searchsorted，时间窗口是切片视图；
+    否则（多通道交错导致乱序）预先计算稳定 argsort，时间窗口返回按原顺序排列的行号。
+    """
+
+    def __init__(self, timestamps):
+        self._build(np.asarray(timestamps, dtype=np.float64))
+
+    def _build(self, timestamps: np.ndarray):
+        self.timestamps = timestamps
+        if len(timestamps) < 2 or not np.any(timestamps[1:] < timestamps[:-1]):
+            self.order = None
+            self.sorted_timestamps = timestamps
+        else:
+            self.order = np.argsort(timestamps, kind='stable')
+            self.sorted_timestamps = timestamps[self.order]
+
+    def extend(self, timestamps):
+        """
+        时间戳数组在末尾追加了新元素后更新索引
+
+        新时间戳仍有序地接在末尾时只检查新增部分；出现乱序时重建 argsort。
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        old_count = len(self.timestamps)
+        appended = timestamps[old_count:]
+        if (self.order is None and not np.any(appended[1:] < appended[:-1])
+                and (not old_count or not len(appended) or appended[0] >= self.timestamps[-1])):
+            self.timestamps = self.sorted_timestamps = timestamps
+        else:
+            self._build(timestamps)
+
+    @property
+    def is_monotonic(self) -> bool:
+        """时间戳是否单调不减"""
+        return self.order is None
+
+    def bounds(self) -> Tuple[float, float]:
+        """(最小时间, 最大时间)"""
+        return float(self.sorted_timestamps[0]), float(self.sorted_timestamps[-1])
+
+    def rows(self, start: Optional[float] = None, end: Optional[float] = None):
+        """
+        闭区间 [start, end] 内的行（None 表示不限）
+
+        Returns:
+            单调时为 slice（取值即视图），否则为升序行号数组
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.sorted_timestamps, start, side='left'))
+        hi = len(self.sorted_timestamps) if end is None else int(np.searchsorted(self.sorted_timestamps, end, side='right'))
+        hi = max(lo, hi)
+        if self.order is None:
+            return slice(lo, hi)
+        return np.sort(self.order[lo:hi])
+
+    def nearest(self, timestamp: float) -> int:
+        """时间戳最接近 timestamp 的行（相等时取靠前的），O(log N)"""
+        sorted_timestamps = self.sorted_timestamps
+        position = int(np.searchsorted(sorted_timestamps, timestamp, side='left'))
+        if position >= len(sorted_timestamps):
+            position = len(sorted_timestamps) - 1
+        elif position > 0 and timestamp - sorted_timestamps[position - 1] <= sorted_timestamps[position] - timestamp:
+            position -= 1
+        return position if self.order is None else int(self.order[position])
+
+
+class CANMessageTable:
+    """
+    列式CAN消息表
+
+    每一列是一个NumPy数组：
+        timestamps   float64  时间戳(秒)
+        can_ids      uint32   CAN ID
+        channels     uint8    通道号
+        dlcs         uint8    DLC（CAN FD 帧为DLC编码 0~15）
+        flags        uint8    标志位(FLAG_*)
+        lengths      uint8    实际数据字节数（CAN FD 帧最多64）
+        data         uint8    N×8 数据矩阵（不足8字节补0，超过8字节的帧只存前8字节）
+        line_numbers uint32   源文件行号
+
+    数据超过8字节的 CAN FD 帧另存一份完整数据：
+        fd_rows      uint32   这些帧的行号（升序）
+        fd_data      uint8    M×64 数据矩阵
+    只有经典帧的ID不占用64字节宽的存储；payload_matrix 合并两者按统一宽度取数据。
+
+    延迟解码模式（见 SimpleASCReader.read_file 的 lazy_payload）下还有：
+        payload_offsets  uint64  数据字段在源文件中的字节位置
+        payload_spans    uint16  数据字段的字节长度
+        payload_pending  bool    数据尚未解码的行（data/lengths 暂为0）
+    数据在按ID选择（select）或访问单帧时才从源文件批量解码（ensure_payloads）。
+
+    为兼容旧代码，按下标访问或迭代时返回与旧版 read_file 相同的消息字典。
+    """
+
+    PAYLOAD_WIDTH = 8
+    FD_PAYLOAD_WIDTH = 64
+
+    # 列名（也是二进制缓存中的文件名）
+    COLUMNS = ('timestamps', 'can_ids', 'channels', 'dlcs', 'flags',
+               'lengths', 'data', 'line_numbers')
+
+    # 延迟解码模式的附加列
+    LAZY_COLUMNS = ('payload_offsets', 'payload_spans', 'payload_pending')
+
+    # CAN FD 长帧的数据（行数与消息表不同）
+    FD_COLUMNS = ('fd_rows', 'fd_data')
+
+    def __init__(self, timestamps=None, can_ids=None, channels=None, dlcs=None,
+                 flags=None, lengths=None, data=None, line_numbers=None,
+                 payload_offsets=None, payload_spans=None, payload_pending=None,
+                 payload_source: Optional[Tuple[str, str]] = None,
+                 fd_rows=None, fd_data=None):
+        self.timestamps = np.asarray(timestamps if timestamps is not None else [], dtype=np.float64)
+        n = len(self.timestamps)
+        self.can_ids = self._column(can_ids, np.uint32, n)
+        self.channels = self._column(channels, np.uint8, n)
+        self.dlcs = self._column(dlcs, np.uint8, n)
+        self.flags = self._column(flags, np.uint8, n)
+        self.lengths = self._column(lengths, np.uint8, n)
+        self.line_numbers = self._column(line_numbers, np.uint32, n)
+        if data is None:
+            self.data = np.zeros((n, self.PAYLOAD_WIDTH), dtype=np.uint8)
+        else:
+            self.data = np.asarray(data, dtype=np.uint8).reshape(n, self.PAYLOAD_WIDTH)
+        self.fd_rows = np.asarray(fd_rows if fd_rows is not None else [], dtype=np.uint32)
+        if fd_data is None:
+            self.fd_data = np.zeros((0, self.FD_PAYLOAD_WIDTH), dtype=np.uint8)
+        else:
+            self.fd_data = np.asarray(fd_data, dtype=np.uint8).reshape(len(self.fd_rows), self.FD_PAYLOAD_WIDTH)
+        # 延迟解码：payload_source 为 (源文件路径, 编码)，非延迟模式下这些列为 None
+        self.payload_source = payload_source
+        if payload_pending is None:
+            self.payload_offsets = self.payload_spans = self.payload_pending = None
+        else:
+            self.payload_offsets = self._column(payload_offsets, np.uint64, n)
+            self.payload_spans = self._column(payload_spans, np.uint16, n)
+            self.payload_pending = self._column(payload_pending, np.bool_, n)
+        self._payload_buffer: Optional[np.ndarray] = None
+        self._index = None
+        self._indexed_rows = 0  # 行索引覆盖的行数（之后追加的行记录在 _rows_by_id 中）
+        self._rows_by_id: Dict[int, GrowableArray] = {}
+        self._time_index: Optional[TimeIndex] = None
+        self._buffers: Optional[Dict[str, GrowableArray]] = None
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray], index=None,
+                     payload_source: Optional[Tuple[str, str]] = None) -> 'CANMessageTable':
+        """
+        由列字典创建消息表（如内存映射的缓存列），可附带预先构建的行索引（见 build_index）；
+        列字典含延迟解码列时需同时给出 payload_source
+        """
+        names = cls.COLUMNS + cls.LAZY_COLUMNS + cls.FD_COLUMNS
+        table = cls(payload_source=payload_source, **{name: columns[name] for name in names if name in columns})
+        table._index = index
+        table._indexed_rows = len(table) if index is not None else 0
+        return table
+
+    @staticmethod
+    def _column(values, dtype, n: int) -> np.ndarray:
+        """创建列数组，缺省时填0"""
+        if values is None:
+            return np.zeros(n, dtype=dtype)
+        column = np.asarray(values, dtype=dtype)
+        if len(column) != n:
+            raise ValueError(f"列长度不一致: {len(column)} != {n}")
+        return column
+
+    @classmethod
+    def concat(cls, tables: Sequence['CANMessageTable']) -> 'CANMessageTable':
+        """按顺序拼接多个消息表"""
+        tables = [t for t in tables if t is not None and len(t)]
+        if not tables:
+            return cls()
+        if len(tables) == 1:
+            return tables[0]
+        lazy = {}
+        source = next((t.payload_source for t in tables if t.is_lazy), None)
+        if source is not None:
+            # 延迟解码的批次来自同一源文件；非延迟批次的数据视为已解码
+            lazy = {name: np.concatenate([t._lazy_column(name) for t in tables]) for name in cls.LAZY_COLUMNS}
+        row_offsets = np.cumsum([0] + [len(t) for t in tables[:-1]])
+        return cls(
+            timestamps=np.concatenate([t.timestamps for t in tables]),
+            can_ids=np.concatenate([t.can_ids for t in tables]),
+            channels=np.concatenate([t.channels for t in tables]),
+            dlcs=np.concatenate([t.dlcs for t in tables]),
+            flags=np.concatenate([t.flags for t in tables]),
+            lengths=np.concatenate([t.lengths for t in tables]),
+            data=np.concatenate([t.data for t in tables]),
+            line_numbers=np.concatenate([t.line_numbers for t in tables]),
+            payload_source=source,
+            fd_rows=np.concatenate([t.fd_rows.astype(np.int64) + offset for t, offset in zip(tables, row_offsets)]),
+            fd_data=np.concatenate([t.fd_data for t in tables]),
+            **lazy,
+        )
+
+    # ------------------------------------------------------------------
+    # 基本协议
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __getitem__(self, key):
+        """整数下标返回消息字典，切片/索引数组/布尔掩码返回新的消息表"""
+        if isinstance(key, (int, np.integer)):
+            index = int(key)
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("消息下标越界")
+            return self.row(index)
+        return self.take(key)
+
+    def take(self, rows) -> 'CANMessageTable':
+        """按行选择，返回新的消息表（切片时为视图；延迟解码的行在新表中仍为延迟状态）"""
+        lazy = {}
+        if self.is_lazy:
+            lazy = {name: getattr(self, name)[rows] for name in self.LAZY_COLUMNS}
+        fd = {}
+        if len(self.fd_rows):
+            # 选中的 CAN FD 长帧换算为新表中的行号
+            selected = np.arange(len(self))[rows]
+            positions, hits = self._fd_positions(selected)
+            fd = {'fd_rows': np.flatnonzero(hits), 'fd_data': self.fd_data[positions[hits]]}
+        return CANMessageTable(
+            timestamps=self.timestamps[rows],
+            can_ids=self.can_ids[rows],
+            channels=self.channels[rows],
+            dlcs=self.dlcs[rows],
+            flags=self.flags[rows],
+            lengths=self.lengths[rows],
+            data=self.data[rows],
+            line_numbers=self.line_numbers[rows],
+            payload_source=self.payload_source,
+            **lazy,
+            **fd,
+        )
+
+    # ------------------------------------------------------------------
+    # 派生列
+    # ------------------------------------------------------------------
+    @property
+    def is_extended(self) -> np.ndarray:
+        """扩展帧布尔数组"""
+        return (self.flags & FLAG_EXTENDED) != 0
+
+    @property
+    def is_tx(self) -> np.ndarray:
+        """发送方向布尔数组"""
+        return (self.flags & FLAG_TX) != 0
+
+    @property
+    def is_fd(self) -> np.ndarray:
+        """CAN FD 帧布尔数组"""
+        return (self.flags & FLAG_FD) != 0
+
+    def payload(self, index: int) -> List[int]:
+        """获取单帧的数据字节列表"""
+        if self.is_lazy and self.payload_pending[index]:
+            self.ensure_payloads(np.array([index]))
+        length = self.lengths[index]
+        if length > self.PAYLOAD_WIDTH:
+            positions, _ = self._fd_positions(np.array([index]))
+            return self.fd_data[positions[0], :length].tolist()
+        return self.data[index, :length].tolist()
+
+    def payload_matrix(self, rows=None, width: Optional[int] = None) -> np.ndarray:
+        """
+        指定行（默认全部）的数据矩阵，经典帧与 CAN FD 长帧合并为统一宽度
+
+        Args:
+            rows: 行号数组/切片/布尔掩码
+            width: 矩阵宽度，默认有 CAN FD 长帧时为64，否则为8
+
+        Returns:
+            k×width 的 uint8 矩阵（不足部分补0）
+        """
+        selected = np.arange(len(self)) if rows is None else np.arange(len(self))[rows]
+        self.ensure_payloads(selected)
+        if width is None:
+            width = self.FD_PAYLOAD_WIDTH if len(self.fd_rows) else self.PAYLOAD_WIDTH
+        matrix = np.zeros((len(selected), width), dtype=np.uint8)
+        matrix[:, :min(width, self.PAYLOAD_WIDTH)] = self.data[selected, :width]
+        if len(self.fd_rows) and width > self.PAYLOAD_WIDTH:
+            positions, hits = self._fd_positions(selected)
+            matrix[hits] = self.fd_data[positions[hits], :width]
+        return matrix
+
+    def _fd_positions(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """行号在 fd_rows 中的位置，以及哪些行是 CAN FD 长帧"""
+        if not len(self.fd_rows):
+            return np.zeros(len(rows), dtype=np.int64), np.zeros(len(rows), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.fd_rows, rows), len(self.fd_rows) - 1)
+        return positions, self.fd_rows[positions] == rows
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """列名到数组的字典（包含 CAN FD 长帧数据，延迟解码模式下包含延迟解码列）"""
+        names = self.COLUMNS + self.FD_COLUMNS
+        if self.is_lazy:
+            names += self.LAZY_COLUMNS
+        return {name: getattr(self, name) for name in names}
+
+    # ------------------------------------------------------------------
+    # 延迟解码
+    # ------------------------------------------------------------------
+    @property
+    def is_lazy(self) -> bool:
+        """是否为延迟解码模式（数据字段记录为源文件中的字节位置）"""
+        return self.payload_pending is not None
+
+    def _lazy_column(self, name: str) -> np.ndarray:
+        """延迟解码列；非延迟表返回等价的“已解码”列"""
+        if self.is_lazy:
+            return getattr(self, name)
+        dtype = {'payload_offsets': np.uint64, 'payload_spans': np.uint16, 'payload_pending': np.bool_}[name]
+        return np.zeros(len(self), dtype=dtype)
+
+    def ensure_payloads(self, rows=None):
+        """
+        解码指定行（默认全部）中尚未解码的数据
+
+        只读取这些行的数据字段，一次向量化批量解码后写回 data/lengths；
+        通常按ID调用（见 select），开销与该ID的帧数成正比。
+        """
+        if not self.is_lazy:
+            return
+        if rows is None:
+            rows = np.flatnonzero(self.payload_pending)
+        else:
+            rows = np.arange(len(self))[rows] if isinstance(rows, slice) else np.asarray(rows)
+            rows = rows[self.payload_pending[rows]]
+        if not len(rows):
+            return
+
+        if self._payload_buffer is None:
+            with open(self.payload_source[0], 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._payload_buffer = np.frombuffer(mapped, dtype=np.uint8)
+
+        data, lengths = decode_hex_fields(self._payload_buffer, self.payload_offsets[rows],
+                                          self.payload_spans[rows], self.payload_source[1], self.PAYLOAD_WIDTH)
+        self.data[rows] = data
+        self.lengths[rows] = lengths
+        self.payload_pending[rows] = False
+
+    # ------------------------------------------------------------------
+    # 行索引：(CAN ID, 通道) -> 升序行号
+    # ------------------------------------------------------------------
+    def build_index(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        构建 (CAN ID, 通道) 行索引（已构建时直接返回）
+
+        按 key = CAN ID << 8 | 通道 稳定排序，同一分组内的行号保持升序。
+
+        Returns:
+            (升序的分组key, 分组在行序中的起始位置(长度为分组数+1), 按分组排列的行号)
+        """
+        if self._index is None:
+            keys = (self.can_ids.astype(np.uint64) << np.uint64(8)) | self.channels
+            order = np.argsort(keys, kind='stable').astype(np.uint32)
+            sorted_keys = keys[order]
+            if len(keys):
+                starts = np.flatnonzero(np.diff(sorted_keys)) + 1
+                offsets = np.concatenate(([0], starts, [len(keys)])).astype(np.int64)
+            else:
+                offsets = np.zeros(1, dtype=np.int64)
+            group_keys = sorted_keys[offsets[:-1]]
+            self._index = (group_keys, offsets, order)
+            self._indexed_rows = len(keys)
+            self._rows_by_id.clear()
+        return self._index
+
+    def rows_for(self, can_id: int, channel: Optional[int] = None) -> np.ndarray:
+        """
+        指定CAN ID（可选通道）的升序行号
+
+        开销与该ID的帧数成正比；不指定通道时合并各通道分组并缓存结果
+        （extend 追加的行也记录在该缓存中）。
+        """
+        if channel is None:
+            rows = self._rows_by_id.get(can_id)
+            if rows is None:
+                rows = self._rows_by_id[can_id] = GrowableArray(self._indexed_rows_for(can_id, None))
+            return rows.view()
+
+        rows = self._indexed_rows_for(can_id, channel)
+        if len(self) > self._indexed_rows and can_id in self._rows_by_id:
+            # 加上建索引之后追加的该通道的行
+            merged = self._rows_by_id[can_id].view()
+            appended = merged[np.searchsorted(merged, self._indexed_rows):]
+            rows = np.concatenate((rows, appended[self.channels[appended] == channel]))
+        return rows
+
+    def _indexed_rows_for(self, can_id: int, channel: Optional[int]) -> np.ndarray:
+        """在行索引覆盖的行中查找"""
+        group_keys, offsets, order = self.build_index()
+        if channel is None:
+            lo = np.searchsorted(group_keys, np.uint64(can_id) << np.uint64(8))
+            hi = np.searchsorted(group_keys, np.uint64(can_id + 1) << np.uint64(8))
+        else:
+            lo = np.searchsorted(group_keys, (np.uint64(can_id) << np.uint64(8)) | np.uint64(channel))
+            hi = lo + 1 if lo < len(group_keys) and group_keys[lo] == (can_id << 8 | channel) else lo
+
+        rows = order[offsets[lo]:offsets[hi]]
+        if channel is None and hi - lo > 1:
+            rows = np.sort(rows)  # 多个通道分组合并为行号升序
+        return rows
+
+    def select(self, can_id: int, channel: Optional[int] = None) -> 'CANMessageTable':
+        """指定CAN ID（可选通道）的消息，保持原始行序（延迟解码模式下先批量解码这些行的数据）"""
+        rows = self.rows_for(can_id, channel)
+        self.ensure_payloads(rows)
+        return self.take(rows)
+
+    def time_index(self) -> TimeIndex:
+        """时间索引（首次调用时构建）"""
+        if self._time_index is None:
+            self._time_index = TimeIndex(self.timestamps)
+        return self._time_index
+
+    def time_slice(self, start: Optional[float] = None, end: Optional[float] = None) -> 'CANMessageTable':
+        """时间范围 [start, end] 内的消息（时间戳单调时为视图），O(log N) 定位"""
+        return self.take(self.time_index().rows(start, end))
+
+    def id_index(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        按ID汇总的索引（由行索引派生，extend 之后会重建行索引）
+
+        Returns:
+            (升序的唯一CAN ID, 每个ID首次出现的行号, 每个ID的帧数)
+        """
+        group_keys, offsets, order = self._current_index()
+        group_ids = group_keys >> np.uint64(8)
+        ids, id_starts = np.unique(group_ids, return_index=True)
+        if not len(ids):
+            return ids.astype(np.uint32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        first_rows = np.minimum.reduceat(order[offsets[:-1]], id_starts).astype(np.int64)
+        counts = np.add.reduceat(np.diff(offsets), id_starts)
+        return ids.astype(np.uint32), first_rows, counts
+
+    def group_summary(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        按 (CAN ID, 通道) 分组的帧数和时间范围（由行索引派生，一次向量化计算）
+
+        Returns:
+            (升序的分组key, 每组帧数, 每组最早时间戳, 每组最晚时间戳)
+        """
+        group_keys, offsets, order = self._current_index()
+        if not len(group_keys):
+            empty = np.zeros(0, dtype=np.float64)
+            return group_keys, np.zeros(0, dtype=np.int64), empty, empty
+        grouped = self.timestamps[order]
+        starts = offsets[:-1]
+        return (group_keys, np.diff(offsets),
+                np.minimum.reduceat(grouped, starts), np.maximum.reduceat(grouped, starts))
+
+    def _current_index(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """覆盖全部行的行索引（extend 之后重建）"""
+        if len(self) > self._indexed_rows:
+            self._index = None
+        return self.build_index()
+
+    def has_id(self, can_id: int) -> bool:
+        """是否包含指定CAN ID的消息"""
+        return len(self.rows_for(can_id)) > 0
+
+    # ------------------------------------------------------------------
+    # 追加（实时跟踪文件）
+    # ------------------------------------------------------------------
+    def extend(self, batch: 'CANMessageTable'):
+        """
+        在末尾追加一个批次
+
+        列数组按倍数扩容，行索引和时间索引增量更新，开销与批次大小成正比
+        （首次追加时复制一次已有列）。
+        """
+        if not len(batch):
+            return
+        if batch.is_lazy and not self.is_lazy:
+            batch.ensure_payloads()
+
+        base = len(self)
+        self.build_index()  # 追加前为已有的行建立索引
+        if self._buffers is None:
+            names = self.COLUMNS + self.FD_COLUMNS
+            if self.is_lazy:
+                names += self.LAZY_COLUMNS
+            self._buffers = {name: GrowableArray(getattr(self, name)) for name in names}
+        for name, buffer in self._buffers.items():
+            if name in self.LAZY_COLUMNS:
+                buffer.extend(batch._lazy_column(name))
+            elif name == 'fd_rows':
+                buffer.extend(batch.fd_rows.astype(np.int64) + base)
+            else:
+                buffer.extend(getattr(batch, name))
+            setattr(self, name, buffer.view())
+
+        batch_ids, _, _ = batch.id_index()
+        for can_id in batch_ids.tolist():
+            self.rows_for(can_id)  # 确保该ID的行号缓存存在
+            self._rows_by_id[can_id].extend(batch.rows_for(can_id) + base)
+
+        if self._time_index is not None:
+            self._time_index.extend(self.timestamps)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """生成与旧版兼容的消息字典"""
+        can_id = int(self.can_ids[index])
+        flags = int(self.flags[index])
+        is_extended = bool(flags & FLAG_EXTENDED)
+        data_bytes = self.payload(index)
+        line_number = int(self.line_numbers[index])
+        return {
+            'timestamp': float(self.timestamps[index]),
+            'channel': int(self.channels[index]),
+            'can_id': can_id,
+            'can_id_hex': f"{can_id:X}",
+            'is_extended': is_extended,
+            'frame_type': 'Extended' if is_extended else 'Standard',
+            'is_fd': bool(flags & FLAG_FD),
+            'direction': 'Tx' if flags & FLAG_TX else 'Rx',
+            'dlc': int(self.dlcs[index]),
+            'data': data_bytes,
+            'data_hex': ' '.join(f'{b:02X}' for b in data_bytes),
+            'line_number': line_number,
+            'raw_line': line_number
+        }
+
+    def nbytes(self) -> int:
+        """列数据占用的内存字节数"""
+        return sum(column.nbytes for column in self.columns().values())
+
+
+class CANMessageTableBuilder:
+    """
+    消息表构建器
+    解析时逐帧追加到紧凑的 array/bytearray 缓冲区，结束后一次性转换为NumPy列
+
+    给出 payload_source 时为延迟解码模式：append_deferred 只记录数据字段的字节位置。
+    数据超过8字节的 CAN FD 帧同时记入64字节宽的 FD 矩阵。
+    """
+
+    def __init__(self, payload_source: Optional[Tuple[str, str]] = None):
+        self.payload_source = payload_source
+        self._reset()
+
+    def _reset(self):
+        self._timestamps = array('d')
+        self._can_ids = array('I')
+        self._channels = bytearray()
+        self._dlcs = bytearray()
+        self._flags = bytearray()
+        self._lengths = bytearray()
+        self._data = bytearray()
+        self._line_numbers = array('I')
+        # CAN FD 长帧的行号和完整数据
+        self._fd_rows = array('I')
+        self._fd_data = bytearray()
+        # 延迟解码的行及其数据字段位置
+        self._deferred_rows = array('I')
+        self._deferred_offsets = array('Q')
+        self._deferred_spans = array('H')
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def append(self, timestamp: float, channel: int, can_id: int, flags: int,
+               dlc: int, payload: bytes, line_number: int):
+        """追加一帧，payload 为原始数据字节（经典帧最多保留8字节，CAN FD 帧最多64字节）"""
+        width = CANMessageTable.PAYLOAD_WIDTH
+        length = len(payload)
+        if length > width:
+            if flags & FLAG_FD:
+                fd_width = CANMessageTable.FD_PAYLOAD_WIDTH
+                length = min(length, fd_width)
+                self._fd_rows.append(len(self._timestamps))
+                self._fd_data += payload[:length]
+                self._fd_data += bytes(fd_width - length)
+            else:
+                length = width
+        self._timestamps.append(timestamp)
+        self._can_ids.append(can_id)
+        self._channels.append(channel & 0xFF)
+        self._dlcs.append(dlc & 0xFF)
+        self._flags.append(flags)
+        self._lengths.append(length)
+        self._data += payload[:width]
+        if length < width:
+            self._data += bytes(width - length)
+        self._line_numbers.append(line_number)
+
+    def append_deferred(self, timestamp: float, channel: int, can_id: int, flags: int,
+                        dlc: int, offset: int, span: int, line_number: int):
+        """追加一帧，数据暂不解码，只记录数据字段在源文件中的位置和长度"""
+        self._deferred_rows.append(len(self._timestamps))
+        self._deferred_offsets.append(offset)
+        self._deferred_spans.append(span)
+        self.append(timestamp, channel, can_id, flags, dlc, b'', line_number)
+
+    def build(self) -> CANMessageTable:
+        """生成消息表并清空缓冲区"""
+        table = CANMessageTable(
+            timestamps=np.array(self._timestamps, dtype=np.float64),
+            can_ids=np.array(self._can_ids, dtype=np.uint32),
+            channels=np.frombuffer(self._channels, dtype=np.uint8).copy(),
+            dlcs=np.frombuffer(self._dlcs, dtype=np.uint8).copy(),
+            flags=np.frombuffer(self._flags, dtype=np.uint8).copy(),
+            lengths=np.frombuffer(self._lengths, dtype=np.uint8).copy(),
+            data=np.frombuffer(self._data, dtype=np.uint8).copy(),
+            line_numbers=np.array(self._line_numbers, dtype=np.uint32),
+            fd_rows=np.array(self._fd_rows, dtype=np.uint32),
+            fd_data=np.frombuffer(self._fd_data, dtype=np.uint8).copy(),
+        )
+        if self.payload_source is not None:
+            n = len(table)
+            rows = np.array(self._deferred_rows, dtype=np.int64)
+            table.payload_source = self.payload_source
+            table.payload_offsets = np.zeros(n, dtype=np.uint64)
+            table.payload_spans = np.zeros(n, dtype=np.uint16)
+            table.payload_pending = np.zeros(n, dtype=np.bool_)
+            table.payload_offsets[rows] = np.array(self._deferred_offsets, dtype=np.uint64)
+            table.payload_spans[rows] = np.array(self._deferred_spans, dtype=np.uint16)
+            table.payload_pending[rows] = True
+        self._reset()
+        return table
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+列式消息表批量导出
+- CSV: 按块整体格式化（数据字节由查表矩阵一次生成，逐列在C层拼接），不再逐帧 writerow
+- ASC: 同样按块格式化，CAN FD 帧写为 CANFD 行，可按扩展名(.gz/.xz/.zst)压缩输出
+- Parquet / Arrow IPC（需要可选的 pyarrow 库）: CAN ID 与方向列字典编码，
+  默认 zstd 压缩，Parquet 按固定行数划分行组，pandas/polars 可直接加载
+
+解码后的信号同样可导出为长表（信号名, CAN ID, 时间戳, 物理值）。
+"""
+
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from can_message_table import FLAG_BRS, FLAG_ESI, CANMessageTable
+from compressed_io import open_compressed, strip_compression_suffix
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# CSV 每次整体格式化的行数
+CSV_BLOCK_ROWS = 65536
+
+# Parquet 行组大小（行数）与默认压缩
+DEFAULT_ROW_GROUP_SIZE = 1024 * 1024
+DEFAULT_COMPRESSION = 'zstd'
+
+# 导出格式对应的扩展名
+EXPORT_SUFFIXES = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet',
+                   '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow', '.asc': 'asc'}
+
+# 文件对话框使用的导出类型
+EXPORT_FILETYPES = [("Parquet files", "*.parquet"), ("Arrow IPC files", "*.arrow *.feather"),
+                    ("CSV files", "*.csv")]
+MESSAGE_EXPORT_FILETYPES = EXPORT_FILETYPES + [("ASC files", "*.asc")]
+
+# CSV 表头（与旧版逐行导出一致）
+CSV_FIELDNAMES = ['timestamp', 'channel', 'can_id_hex', 'direction', 'dlc', 'data_hex']
+SIGNAL_CSV_FIELDNAMES = ['signal', 'can_id_hex', 'timestamp', 'value']
+
+# 字节值 -> "XX " 三个字符
+_HEX_TRIPLETS = np.array([list(f'{value:02X} '.encode('ascii')) for value in range(256)], dtype=np.uint8)
+
+_DIRECTION_NAMES = ('Rx', 'Tx')
+
+# ASC 行中的CAN ID（扩展帧带 x 后缀）
+_ASC_ID_FORMATS = ('{:X}'.format, '{:X}x'.format)
+
+
+def export_format(output_path: str) -> str:
+    """按扩展名判断导出格式（csv/parquet/arrow/asc，ASC可带压缩扩展名），未知扩展名按CSV导出"""
+    return EXPORT_SUFFIXES.get(Path(strip_compression_suffix(output_path)).suffix.lower(), 'csv')
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError('请先安装pyarrow库: pip install pyarrow')
+
+
+def _blocks(batches: Iterable[CANMessageTable], block_rows: int) -> Iterator[CANMessageTable]:
+    """把批次（或单个完整消息表）切成不超过 block_rows 行的块（切片为视图）"""
+    if isinstance(batches, CANMessageTable):
+        batches = [batches]
+    for batch in batches:
+        for start in range(0, len(batch), block_rows):
+            yield batch.take(slice(start, start + block_rows))
+
+
+def _hex_strings(matrix: np.ndarray, lengths: np.ndarray) -> List[str]:
+    """数据矩阵 -> 每行 "XX XX ..." 字符串（查表生成字符矩阵，超出长度的部分置0后按定长字节串截断）"""
+    rows, width = matrix.shape
+    chars = _HEX_TRIPLETS[matrix].reshape(rows, width * 3)
+    chars[np.arange(width * 3) >= lengths[:, None].astype(np.int64) * 3 - 1] = 0
+    return chars.view(f'S{width * 3}').ravel().astype(f'U{width * 3}').tolist()
+
+
+def format_csv_block(batch: CANMessageTable) -> str:
+    """
+    整体格式化一个块的CSV行（不含表头）
+
+    各列在C层批量转换为字符串后按行拼接，输出与旧版 csv.writer 逐行写入一致。
+    """
+    batch.ensure_payloads()
+    lengths = batch.lengths
+    width = max(1, int(lengths.max()))
+    columns = (
+        map(repr, batch.timestamps.tolist()),
+        map(str, batch.channels.tolist()),
+        map('0x{:X}'.format, batch.can_ids.tolist()),
+        map(_DIRECTION_NAMES.__getitem__, batch.is_tx.tolist()),
+        map(str, batch.dlcs.tolist()),
+        _hex_strings(batch.payload_matrix(width=width), lengths),
+    )
+    return '\r\n'.join(map(','.join, zip(*columns))) + '\r\n'
+
+
+def write_csv(output_path: str, batches: Iterable[CANMessageTable], block_rows: int = CSV_BLOCK_ROWS) -> int:
+    """
+    按块导出CSV（UTF-8 BOM，便于Excel打开）
+
+    Returns:
+        导出的帧数
+    """
+    total = 0
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+        f.write(','.join(CSV_FIELDNAMES) + '\r\n')
+        for block in _blocks(batches, block_rows):
+            f.write(format_csv_block(block))
+            total += len(block)
+    return total
+
+
+# ----------------------------------------------------------------------
+# ASC
+# ----------------------------------------------------------------------
+def asc_header(date: Optional[datetime] = None) -> str:
+    """ASC文件头（日期行、时间戳格式、版本、触发块开始）"""
+    formatted_date = (date or datetime.now()).strftime('%a %b %d %H:%M:%S %Y')
+    return (f"date {formatted_date}\n"
+            "base hex timestamps absolute\n"
+            "// version 7.0.0\n"
+            f"Begin Triggerblock {formatted_date}\n")
+
+
+def format_asc_block(batch: CANMessageTable) -> str:
+    """
+    整体格式化一个块的ASC数据行
+
+    经典帧: 时间戳 通道 ID 方向 d DLC 数据
+    CAN FD: 时间戳 CANFD 通道 方向 ID BRS ESI DLC 数据长度 数据（逐帧格式化，通常为少数）
+    """
+    batch.ensure_payloads()
+    lengths = batch.lengths
+    width = max(1, int(lengths.max()))
+    timestamps = list(map('{:.6f}'.format, batch.timestamps.tolist()))
+    channels = list(map(str, batch.channels.tolist()))
+    can_ids = [_ASC_ID_FORMATS[extended](can_id)
+               for extended, can_id in zip(batch.is_extended.tolist(), batch.can_ids.tolist())]
+    directions = list(map(_DIRECTION_NAMES.__getitem__, batch.is_tx.tolist()))
+    data = _hex_strings(batch.payload_matrix(width=width), lengths)
+    lines = list(map(' '.join, zip(timestamps, channels, can_ids, directions, repeat('d'),
+                                   map(str, batch.dlcs.tolist()), data)))
+
+    flags = batch.flags
+    for row in np.flatnonzero(batch.is_fd).tolist():
+        lines[row] = (f"{timestamps[row]} CANFD {channels[row]} {directions[row]} {can_ids[row]} "
+                      f"{int(flags[row] & FLAG_BRS != 0)} {int(flags[row] & FLAG_ESI != 0)} "
+                      f"{batch.dlcs[row]:x} {lengths[row]} {data[row]}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_asc(output_path: str, batches: Iterable[CANMessageTable], compression: Optional[str] = 'auto',
+              block_rows: int = CSV_BLOCK_ROWS) -> int:
+    """
+    按块导出ASC文件
+
+    Args:
+        compression: 'auto' 按扩展名(.gz/.xz/.zst)压缩，None 不压缩
+
+    Returns:
+        导出的帧数
+    """
+    total = 0
+    with open_compressed(output_path, 'w', compression) as f:
+        f.write(asc_header())
+        for block in _blocks(batches, block_rows):
+            f.write(format_asc_block(block))
+            total += len(block)
+        f.write("End TriggerBlock\n")
+    return total
+
+
+# ----------------------------------------------------------------------
+# Parquet / Arrow IPC
+# ----------------------------------------------------------------------
+def message_schema() -> 'pa.Schema':
+    """导出消息表的 Arrow 模式（CAN ID 与方向字典编码）"""
+    _require_pyarrow()
+    return pa.schema([
+        ('timestamp', pa.float64()),
+        ('channel', pa.uint8()),
+        ('can_id', pa.dictionary(pa.int32(), pa.uint32())),
+        ('direction', pa.dictionary(pa.int8(), pa.string())),
+        ('is_extended', pa.bool_()),
+        ('is_fd', pa.bool_()),
+        ('dlc', pa.uint8()),
+        ('data', pa.binary()),
+        ('line_number', pa.uint32()),
+    ])
+
+
+def signal_schema() -> 'pa.Schema':
+    """导出信号长表的 Arrow 模式（信号名字典编码）"""
+    _require_pyarrow()
+    return pa.schema([
+        ('signal', pa.dictionary(pa.int32(), pa.string())),
+        ('can_id', pa.uint32()),
+        ('timestamp', pa.float64()),
+        ('value', pa.float64()),
+    ])
+
+
+class _IdDictionary:
+    """
+    跨批次共享的CAN ID字典
+
+    新出现的ID追加在末尾，已有ID的编码不变，
+    因此后续批次的字典总是前一批次的扩展（Arrow IPC 只需写入增量字典）。
+    """
+
+    def __init__(self, can_ids: Sequence[int] = ()):
+        self.values = np.unique(np.asarray(can_ids, dtype=np.uint32))
+        self._order = np.arange(len(self.values))
+
+    def encode(self, can_ids: np.ndarray) -> 'pa.DictionaryArray':
+        unique = np.unique(can_ids)
+        new = unique[~np.isin(unique, self.values)]
+        if len(new):
+            self.values = np.concatenate([self.values, new])
+            self._order = np.argsort(self.values, kind='stable')
+        indices = self._order[np.searchsorted(self.values, can_ids, sorter=self._order)]
+        return pa.DictionaryArray.from_arrays(pa.array(indices.astype(np.int32)), pa.array(self.values))
+
+
+def message_record_batch(batch: CANMessageTable, id_dictionary: Optional[_IdDictionary] = None) -> 'pa.RecordBatch':
+    """
+    消息表 -> Arrow RecordBatch（零逐行处理）
+
+    数据字段为变长二进制列：按长度掩码从数据矩阵取出有效字节作为值缓冲区，
+    长度的前缀和作为偏移缓冲区，经典帧和 CAN FD 长帧统一处理。
+    """
+    _require_pyarrow()
+    if id_dictionary is None:
+        id_dictionary = _IdDictionary(batch.can_ids)
+    n = len(batch)
+
+    lengths = batch.lengths.astype(np.int64)
+    width = max(CANMessageTable.PAYLOAD_WIDTH, int(lengths.max()) if n else 0)
+    matrix = batch.payload_matrix(width=width)
+    values = matrix[np.arange(width) < lengths[:, None]]
+    offsets = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    data = pa.Array.from_buffers(pa.binary(), n, [None, pa.py_buffer(offsets), pa.py_buffer(values.tobytes())])
+
+    direction = pa.DictionaryArray.from_arrays(pa.array(batch.is_tx.astype(np.int8)), pa.array(_DIRECTION_NAMES))
+    return pa.RecordBatch.from_arrays([
+        pa.array(batch.timestamps),
+        pa.array(batch.channels),
+        id_dictionary.encode(batch.can_ids),
+        direction,
+        pa.array(batch.is_extended),
+        pa.array(batch.is_fd),
+        pa.array(batch.dlcs),
+        data,
+        pa.array(batch.line_numbers),
+    ], schema=message_schema())
+
+
+def _record_batches(batches: Iterable[CANMessageTable], block_rows: int) -> Iterator['pa.RecordBatch']:
+    """按块转换为 RecordBatch；单个完整消息表时预先建好全部ID的字典（整个文件只有一份字典）"""
+    if isinstance(batches, CANMessageTable):
+        id_dictionary = _IdDictionary(batches.id_index()[0])
+    else:
+        id_dictionary = _IdDictionary()
+    for block in _blocks(batches, block_rows):
+        yield message_record_batch(block, id_dictionary)
+
+
+def _row_groups(record_batches: Iterable['pa.RecordBatch'], row_group_size: int) -> Iterator['pa.Table']:
+    """把 RecordBatch 流重新划分为恰好 row_group_size 行的表（最后一个可以不足）"""
+    pending, pending_rows = [], 0
+    for record_batch in record_batches:
+        start = 0
+        while start < record_batch.num_rows:
+            count = min(row_group_size - pending_rows, record_batch.num_rows - start)
+            pending.append(record_batch.slice(start, count))
+            pending_rows += count
+            start += count
+            if pending_rows == row_group_size:
+                yield pa.Table.from_batches(pending)
+                pending, pending_rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def write_parquet(output_path: str, batches: Iterable[CANMessageTable],
+                  compression: Optional[str] = DEFAULT_COMPRESSION, compression_level: Optional[int] = None,
+                  row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+    """
+    导出为 Parquet（CAN ID/方向列字典编码）
+
+    Args:
+        output_path: 输出路径
+        batches: 完整消息表，或消息批次的可迭代对象（流式导出）
+        compression: 列压缩算法（zstd/snappy/gzip/lz4/None）
+        compression_level: 压缩级别，None 使用默认值
+        row_group_size: 每个行组的行数
+
+    Returns:
+        导出的帧数
+    """
+    _require_pyarrow()
+    total = 0
+    with pq.ParquetWriter(output_path, message_schema(), compression=compression or 'none',
+                          compression_level=compression_level) as writer:
+        for table in _row_groups(_record_batches(batches, min(row_group_size, CSV_BLOCK_ROWS)), row_group_size):
+            writer.write_table(table, row_group_size=row_group_size)
+            total += table.num_rows
+    return total
+
+
+def write_arrow(output_path: str, batches: Iterable[CANMessageTable],
+                compression: Optional[str] = DEFAULT_COMPRESSION, block_rows: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+    """
+    导出为 Arrow IPC 文件（Feather v2，可内存映射读取）
+
+    Args:
+        compression: 缓冲区压缩（zstd/lz4/None）
+        block_rows: 每个 RecordBatch 的行数
+
+    Returns:
+        导出的帧数
+    """
+    _require_pyarrow()
+    options = pa.ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+    total = 0
+    with pa.OSFile(output_path, 'wb') as sink, pa.ipc.new_file(sink, message_schema(), options=options) as writer:
+        for record_batch in _record_batches(batches, block_rows):
+            writer.write_batch(record_batch)
+            total += record_batch.num_rows
+    return total
+
+
+def export_messages(output_path: str, batches: Iterable[CANMessageTable], fmt: Optional[str] = None, **options) -> int:
+    """按格式（默认由扩展名判断）导出消息，返回导出的帧数"""
+    fmt = fmt or export_format(output_path)
+    if fmt == 'parquet':
+        return write_parquet(output_path, batches, **options)
+    if fmt == 'arrow':
+        return write_arrow(output_path, batches, **options)
+    if fmt == 'asc':
+        return write_asc(output_path, batches, **options)
+    return write_csv(output_path, batches, **options)
+
+
+# ----------------------------------------------------------------------
+# 解码后的信号
+# ----------------------------------------------------------------------
+SignalSeries = Tuple[str, int, np.ndarray, np.ndarray]
+
+
+def export_signals(output_path: str, series: Sequence[SignalSeries], fmt: Optional[str] = None,
+                   compression: Optional[str] = DEFAULT_COMPRESSION) -> int:
+    """
+    导出解码后的信号（长表：每个采样点一行）
+
+    Args:
+        output_path: 输出路径
+        series: (信号名, CAN ID, 时间戳数组, 物理值数组) 列表
+        fmt: csv/parquet/arrow，默认由扩展名判断
+
+    Returns:
+        导出的采样点数
+    """
+    fmt = fmt or export_format(output_path)
+    if fmt == 'asc':
+        raise ValueError("信号数据不支持导出为ASC")
+    total = sum(len(timestamps) for _, _, timestamps, _ in series)
+
+    if fmt == 'csv':
+        with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+            f.write(','.join(SIGNAL_CSV_FIELDNAMES) + '\r\n')
+            for name, can_id, timestamps, values in series:
+                if not len(timestamps):
+                    continue
+                row_format = f'{name},0x{can_id:X},{{!r}},{{!r}}\r\n'.format
+                f.write(''.join(map(row_format, timestamps.tolist(), values.tolist())))
+        return total
+
+    _require_pyarrow()
+    names = [name for name, _, _, _ in series]
+    counts = np.array([len(timestamps) for _, _, timestamps, _ in series], dtype=np.int64)
+    table = pa.Table.from_arrays([
+        pa.DictionaryArray.from_arrays(pa.array(np.repeat(np.arange(len(series), dtype=np.int32), counts)),
+                                       pa.array(names, type=pa.string())),
+        pa.array(np.repeat(np.array([can_id for _, can_id, _, _ in series], dtype=np.uint32), counts)),
+        pa.array(np.concatenate([np.asarray(ts, dtype=np.float64) for _, _, ts, _ in series] or [np.zeros(0)])),
+        pa.array(np.concatenate([np.asarray(v, dtype=np.float64) for _, _, _, v in series] or [np.zeros(0)])),
+    ], schema=signal_schema())
+
+    if fmt == 'parquet':
+        pq.write_table(table, output_path, compression=compression or 'none', row_group_size=DEFAULT_ROW_GROUP_SIZE)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        with pa.OSFile(output_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+    return total
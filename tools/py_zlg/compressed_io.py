@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+压缩日志透明读写
+按文件头魔数识别 gzip / xz / zstd 压缩（zstd 需要可选的 zstandard 库），
+读取时在后台线程解压，与前台解析重叠进行；写入时按目标文件扩展名或指定格式压缩。
+"""
+
+import gzip
+import io
+import lzma
+import queue
+import threading
+from pathlib import Path
+from typing import IO, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# 后台解压线程每次产出的块大小，以及最多预先解压的块数（限制内存占用）
+DECOMPRESS_BLOCK_SIZE = 1024 * 1024
+DECOMPRESS_QUEUE_BLOCKS = 8
+
+# 压缩格式的文件头魔数
+_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+
+# 压缩格式对应的扩展名
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'xz': '.xz', 'zstd': '.zst'}
+
+# 文件选择对话框使用的扩展名模式
+COMPRESSED_PATTERNS = ('*.gz', '*.xz', '*.zst')
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """按文件头魔数判断压缩格式，未压缩返回 None"""
+    with open(file_path, 'rb') as f:
+        head = f.read(6)
+    for magic, name in _MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def compression_from_suffix(file_path: str) -> Optional[str]:
+    """按扩展名判断输出文件的压缩格式（.gz/.xz/.zst），其他扩展名返回 None"""
+    suffix = Path(file_path).suffix.lower()
+    for name, compression_suffix in COMPRESSION_SUFFIXES.items():
+        if suffix == compression_suffix:
+            return name
+    return None
+
+
+def strip_compression_suffix(file_path: str) -> str:
+    """去掉压缩扩展名：log.asc.gz -> log.asc"""
+    if compression_from_suffix(file_path):
+        return str(Path(file_path).with_suffix(''))
+    return file_path
+
+
+def _require_zstd():
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError('请先安装zstandard库: pip install zstandard')
+
+
+def _open_decompressor(file_path: str, compression: str) -> IO[bytes]:
+    """打开解压流（在后台线程中读取）"""
+    if compression == 'gzip':
+        return gzip.open(file_path, 'rb')
+    if compression == 'xz':
+        return lzma.open(file_path, 'rb')
+    if compression == 'zstd':
+        _require_zstd()
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(file_path, 'rb'), read_across_frames=True, closefd=True)
+    raise ValueError(f"不支持的压缩格式: {compression}")
+
+
+def _open_compressor(file_path: str, compression: str, level: Optional[int]) -> IO[bytes]:
+    """打开压缩写入流"""
+    if compression == 'gzip':
+        return gzip.open(file_path, 'wb', compresslevel=6 if level is None else level)
+    if compression == 'xz':
+        return lzma.open(file_path, 'wb', preset=level)
+    if compression == 'zstd':
+        _require_zstd()
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return compressor.stream_writer(open(file_path, 'wb'), closefd=True)
+    raise ValueError(f"不支持的压缩格式: {compression}")
+
+
+class ThreadedDecompressReader(io.RawIOBase):
+    """
+    后台线程解压的只读字节流
+
+    解压线程按块读取解压流放入有界队列，前台 readinto 从队列取块；
+    zlib/lzma/zstd 解压时释放GIL，因此解压与前台解析可以并行。
+    通常再包一层 io.BufferedReader 使用（readline 在C层完成）。
+    """
+
+    def __init__(self, source: IO[bytes], block_size: int = DECOMPRESS_BLOCK_SIZE):
+        super().__init__()
+        self._source = source
+        self._block_size = block_size
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=DECOMPRESS_QUEUE_BLOCKS)
+        self._stop = threading.Event()
+        self._pending = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def _worker(self):
+        """解压线程：读取解压块放入队列，结束时放入 None，出错时放入异常"""
+        try:
+            while not self._stop.is_set():
+                block = self._source.read(self._block_size)
+                if not block:
+                    break
+                self._put(block)
+            self._put(None)
+        except Exception as e:  # 解压错误交给前台线程抛出
+            self._put(e)
+
+    def _put(self, item):
+        # 前台已关闭时队列可能一直满，定期检查停止标志
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if item is None:
+                self._eof = True
+                return 0
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            self._pending = memoryview(item)
+
+        count = min(len(buffer), len(self._pending))
+        buffer[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        return count
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._source.close()
+        super().close()
+
+
+def open_compressed(file_path: str, mode: str = 'rb', compression: Optional[str] = 'auto',
+                    encoding: str = 'utf-8', errors: Optional[str] = None,
+                    level: Optional[int] = None) -> IO:
+    """
+    打开可能被压缩的文件
+
+    Args:
+        file_path: 文件路径
+        mode: 'rb'/'r' 读取，'wb'/'w' 写入
+        compression: 'auto' 读取时按魔数、写入时按扩展名判断；None 不压缩；
+                     或指定 'gzip'/'xz'/'zstd'
+        encoding: 文本模式的编码
+        errors: 文本模式的解码错误处理
+        level: 压缩级别（写入时），None 使用各格式的默认值
+
+    Returns:
+        文件对象（读取压缩文件时由后台线程解压）
+    """
+    if mode not in ('rb', 'r', 'wb', 'w'):
+        raise ValueError(f"不支持的打开模式: {mode}")
+    binary = mode.endswith('b')
+    writing = mode.startswith('w')
+
+    if compression == 'auto':
+        compression = compression_from_suffix(file_path) if writing else detect_compression(file_path)
+
+    if compression is None:
+        if binary:
+            return open(file_path, mode)
+        return open(file_path, mode, encoding=encoding, errors=errors)
+
+    if writing:
+        stream = _open_compressor(file_path, compression, level)
+    else:
+        stream = io.BufferedReader(ThreadedDecompressReader(_open_decompressor(file_path, compression)),
+                                   buffer_size=DECOMPRESS_BLOCK_SIZE)
+    if binary:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, errors=errors)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DBC解析结果缓存
+解析后把整个数据库（节点、消息、信号、值表、注释和查找索引）序列化为一个二进制文件，
+按DBC文件内容的哈希命中，再次加载同一数据库时直接反序列化，完全跳过文本解析。
+内容相同的文件（复制到别处、改名）共用一个条目；文件内容、缓存格式或解析器版本
+任一变化时条目自动失效。
+
+缓存目录可通过参数或环境变量 ZLG_DBC_CACHE_DIR 配置，
+总大小上限可通过参数或环境变量 ZLG_DBC_CACHE_MAX_MB 配置，超出时按最近使用时间淘汰。
+
+命令行:
+    python dbc_cache.py --list              列出缓存条目
+    python dbc_cache.py --clear             清空全部缓存
+    python dbc_cache.py --clear a.dbc b.dbc 只清除指定文件的缓存
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 缓存格式版本，文件布局变化时递增，旧版本条目自动失效
+CACHE_FORMAT_VERSION = 1
+
+# 默认缓存位置与大小上限
+DEFAULT_CACHE_DIR = Path.home() / '.zlg_offline_tools' / 'dbc_cache'
+DEFAULT_MAX_CACHE_MB = 256
+
+_ENTRY_SUFFIX = '.pkl'
+
+
+def content_hash(data: bytes) -> str:
+    """DBC文件内容的哈希（缓存键）"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class DBCCache:
+    """DBC解析结果的二进制缓存"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_mb: Optional[float] = None):
+        """
+        Args:
+            cache_dir: 缓存目录，默认取环境变量 ZLG_DBC_CACHE_DIR 或 ~/.zlg_offline_tools/dbc_cache
+            max_mb: 缓存总大小上限(MB)，默认取环境变量 ZLG_DBC_CACHE_MAX_MB 或 256
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get('ZLG_DBC_CACHE_DIR') or DEFAULT_CACHE_DIR
+        if max_mb is None:
+            max_mb = float(os.environ.get('ZLG_DBC_CACHE_MAX_MB') or DEFAULT_MAX_CACHE_MB)
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+    def _entry_path(self, digest: str) -> Path:
+        """每个内容哈希对应一个缓存文件"""
+        return self.cache_dir / f"{digest}{_ENTRY_SUFFIX}"
+
+    def load(self, digest: str, parser_version: int) -> Optional[Dict[str, Any]]:
+        """
+        查找缓存
+
+        Args:
+            digest: DBC文件内容的哈希
+            parser_version: 当前解析器版本
+
+        Returns:
+            命中时返回解析器状态字典，未命中或已过期返回 None
+        """
+        entry_path = self._entry_path(digest)
+        if not entry_path.exists():
+            return None
+
+        try:
+            with open(entry_path, 'rb') as f:
+                entry = pickle.load(f)
+            if (entry.get('version') != CACHE_FORMAT_VERSION or entry.get('parser_version') != parser_version
+                    or entry.get('content_hash') != digest):
+                # 缓存格式或解析器已更新
+                self._remove_entry(entry_path)
+                return None
+            state = entry['state']
+        except Exception as e:
+            # 数据类定义变化等原因导致无法反序列化时也按未命中处理
+            print(f"⚠️ 读取DBC缓存失败: {e}")
+            self._remove_entry(entry_path)
+            return None
+
+        # 更新访问时间，用于LRU淘汰
+        os.utime(entry_path)
+        return state
+
+    def store(self, digest: str, parser_version: int, state: Dict[str, Any], source: str = '') -> bool:
+        """写入缓存（先写临时文件再改名，避免留下半成品），写入后按大小上限淘汰"""
+        entry_path = self._entry_path(digest)
+        tmp_path = entry_path.with_name(f"{entry_path.name}.tmp{os.getpid()}")
+        entry = {
+            'version': CACHE_FORMAT_VERSION,
+            'parser_version': parser_version,
+            'content_hash': digest,
+            'source': os.path.abspath(source) if source else '',
+            'message_count': len(state.get('messages', ())),
+            'created': time.time(),
+            'state': state,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except (OSError, pickle.PicklingError) as e:
+            print(f"⚠️ 写入DBC缓存失败: {e}")
+            self._remove_entry(tmp_path)
+            return False
+
+        self.evict()
+        return True
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """列出缓存条目（按最近使用时间从新到旧）"""
+        if not self.cache_dir.exists():
+            return []
+
+        entries = []
+        for entry_path in self.cache_dir.glob(f'*{_ENTRY_SUFFIX}'):
+            try:
+                with open(entry_path, 'rb') as f:
+                    entry = pickle.load(f)
+                stat = entry_path.stat()
+            except Exception:
+                continue
+            entries.append({
+                'path': entry_path,
+                'source': entry.get('source', ''),
+                'message_count': entry.get('message_count', 0),
+                'size': stat.st_size,
+                'last_used': stat.st_mtime,
+            })
+
+        entries.sort(key=lambda e: e['last_used'], reverse=True)
+        return entries
+
+    def evict(self) -> int:
+        """淘汰最久未使用的条目，直到总大小不超过上限，返回淘汰数量"""
+        entries = self.entries()
+        total = sum(e['size'] for e in entries)
+        removed = 0
+        while entries and total > self.max_bytes:
+            entry = entries.pop()
+            if self._remove_entry(entry['path']):
+                total -= entry['size']
+                removed += 1
+        return removed
+
+    def invalidate(self, file_path: Optional[str] = None) -> int:
+        """
+        清除缓存
+
+        Args:
+            file_path: 只清除该DBC文件（按当前内容）的缓存，None 表示清空全部
+
+        Returns:
+            清除的条目数
+        """
+        if file_path is not None:
+            with open(file_path, 'rb') as f:
+                digest = content_hash(f.read())
+            return int(self._remove_entry(self._entry_path(digest)))
+
+        removed = sum(int(self._remove_entry(entry['path'])) for entry in self.entries())
+        # 无法读取的残留文件一并删除
+        if self.cache_dir.exists():
+            removed += sum(int(self._remove_entry(path)) for path in self.cache_dir.glob(f'*{_ENTRY_SUFFIX}*'))
+        return removed
+
+    @staticmethod
+    def _remove_entry(entry_path: Path) -> bool:
+        """删除缓存文件"""
+        if not entry_path.exists():
+            return False
+        try:
+            entry_path.unlink()
+            return True
+        except OSError as e:
+            print(f"⚠️ 无法删除缓存 {entry_path}: {e}")
+            return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DBC解析缓存管理")
+    parser.add_argument('files', nargs='*', help="指定DBC文件（配合 --clear）")
+    parser.add_argument('--dir', help="缓存目录")
+    parser.add_argument('--list', action='store_true', help="列出缓存条目")
+    parser.add_argument('--clear', action='store_true', help="清除缓存（未指定文件时清空全部）")
+    args = parser.parse_args()
+
+    cache = DBCCache(args.dir)
+
+    if args.clear:
+        if args.files:
+            removed = sum(cache.invalidate(file_path) for file_path in args.files)
+        else:
+            removed = cache.invalidate()
+        print(f"🗑️ 已清除 {removed} 个缓存条目")
+        return
+
+    entries = cache.entries()
+    print(f"📁 缓存目录: {cache.cache_dir}")
+    print(f"📊 {len(entries)} 个条目, 共 {sum(e['size'] for e in entries) / (1024 * 1024):.1f}MB "
+          f"(上限 {cache.max_bytes / (1024 * 1024):.0f}MB)")
+    if args.list:
+        for entry in entries:
+            last_used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))
+            print(f"   {last_used}  {entry['size'] / 1024:8.1f}KB  "
+                  f"{entry['message_count']:>8,} 条消息  {entry['source']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,58 @@ DBC文件解析器
 支持CAN数据库文件解析，提取信号定义信息
 """
 
+import gc
 import re
 import os
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, fields
+
+from dbc_cache import DBCCache, content_hash
+from encoding_detector import detect_encoding
+from progress import PROGRESS_LINES, OperationCancelled, ProgressReporter
+from signal_decoder import SignalDecodePlan, compile_plan
+
+# 解析器版本，解析结果（数据类字段、索引）变化时递增，DBC缓存中旧版本的条目自动失效
+DBC_PARSER_VERSION = 2
+
+# 解析器状态（加载新文件时清空）
+_STATE_FIELDS = ('nodes', 'messages', 'value_tables', 'attributes', 'comments', 'nodes_by_name',
+                 'messages_by_key', 'messages_by_id', 'messages_by_name', 'signals_by_key', 'decode_plans')
+
+# 可跨行的语句（引号内的换行、折行的值列表），累积到分号结束
+_MULTILINE_KEYWORDS = ('CM_', 'BA_', 'VAL_TABLE_', 'VAL_')
+
+# 行首的语句关键字（跨行语句未以分号结束时，遇到这些关键字即视为结束）
+_STATEMENT_KEYWORDS = frozenset(('VERSION', 'NS_', 'BS_', 'BU_:', 'BO_', 'SG_', 'BO_TX_BU_', 'EV_', 'ENVVAR_DATA_',
+                                 'SGTYPE_', 'SIG_GROUP_', 'SIG_VALTYPE_', 'CM_', 'BA_DEF_', 'BA_DEF_DEF_', 'BA_',
+                                 'BA_DEF_REL_', 'BA_REL_', 'VAL_TABLE_', 'VAL_', 'SG_MUL_VAL_'))
+
+# BO_ 123 MessageName: 8 NodeName
+_MESSAGE_PATTERN = re.compile(r'BO_\s+(\d+)\s+(\w+):\s*(\d+)\s+(\w+)')
+
+# SG_ SignalName : 0|8@1+ (1,0) [0|255] "unit" Receiver1,Receiver2
+_SIGNAL_PATTERN = re.compile(r'SG_\s+(\w+)\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*\(([^,]+),([^)]+)\)\s*'
+                             r'\[([^|]*)\|([^\]]*)\]\s*"([^"]*)"\s*([^\n]*)')
+
+_NODE_COMMENT_PATTERN = re.compile(r'CM_\s+BU_\s+(\w+)\s+"([^"]*)"\s*;')
+_MESSAGE_COMMENT_PATTERN = re.compile(r'CM_\s+BO_\s+(\d+)\s+"([^"]*)"\s*;')
+_SIGNAL_COMMENT_PATTERN = re.compile(r'CM_\s+SG_\s+(\d+)\s+(\w+)\s+"([^"]*)"\s*;')
+_MESSAGE_ATTRIBUTE_PATTERN = re.compile(r'BA_\s+"([^"]+)"\s+BO_\s+(\d+)\s+([^;]+);')
+_VALUE_TABLE_PATTERN = re.compile(r'VAL_TABLE_\s+(\w+)\s+((?:\d+\s+"[^"]*"\s*)*);')
+_VALUE_DESCRIPTION_PATTERN = re.compile(r'VAL_\s+(\d+)\s+(\w+)\s+((?:-?\d+\s+"[^"]*"\s*)*);')
+_VALUE_PAIR_PATTERN = re.compile(r'(-?\d+)\s+"([^"]*)"')
+
+
+def _first_token(line: str) -> str:
+    """行首的第一个字段（空行为空字符串）"""
+    parts = line.split(None, 1)
+    return parts[0] if parts else ''
+
+
+def _parse_value_pairs(text: str) -> Dict[int, str]:
+    """解析值描述列表 0 "Off" 1 "On" """
+    return {int(key): value for key, value in _VALUE_PAIR_PATTERN.findall(text)}
+
 
 @dataclass
 class DBCSignal:
@@ -45,6 +93,15 @@ class DBCNode:
     name: str
     comment: str = ""
 
+# 写入缓存时按字段顺序展开为元组（反序列化元组比逐个重建数据类对象快得多）
+_SIGNAL_FIELDS = tuple(f.name for f in fields(DBCSignal))
+_MESSAGE_FIELDS = tuple(f.name for f in fields(DBCMessage) if f.name != 'signals')
+
+def plan_for_signal(signal: DBCSignal) -> SignalDecodePlan:
+    """由DBC信号定义编译解码计划（长度无效时抛出 ValueError）"""
+    return compile_plan(signal.start_bit, signal.length, signal.byte_order == 'little_endian',
+                        signal.value_type == 'signed', signal.factor, signal.offset)
+
 class DBCParser:
     """DBC文件解析器"""
     
@@ -57,6 +114,17 @@ class DBCParser:
         self.value_tables: Dict[str, Dict[int, str]] = {}
         self.attributes: Dict[str, Any] = {}
         self.comments: Dict[str, str] = {}
+        # 查找索引（解析时维护，同一键有多个定义时保留第一个）
+        self.nodes_by_name: Dict[str, DBCNode] = {}
+        self.messages_by_key: Dict[Tuple[int, bool], DBCMessage] = {}  # (CAN ID, 是否扩展帧)
+        self.messages_by_id: Dict[int, DBCMessage] = {}                # 不区分帧类型
+        self.messages_by_name: Dict[str, DBCMessage] = {}
+        self.signals_by_key: Dict[Tuple[str, str], DBCSignal] = {}     # (消息名, 信号名)
+        # 编译好的信号解码计划，键与 signals_by_key 相同（长度无效的信号没有计划）
+        self.decode_plans: Dict[Tuple[str, str], SignalDecodePlan] = {}
+        # 最近一次加载的文件内容哈希，以及是否从缓存加载
+        self.content_hash: str = ""
+        self.loaded_from_cache = False
     
     @staticmethod
     def _convert_raw_can_id(raw_id: int) -> tuple:
@@ -91,12 +159,17 @@ class DBCParser:
         
         return actual_id, is_extended
     
-    def parse_file(self, file_path: str) -> bool:
+    def parse_file(self, file_path: str, progress: Optional[ProgressReporter] = None,
+                   cache: Optional[DBCCache] = None) -> bool:
         """
         解析DBC文件
         
         Args:
             file_path: DBC文件路径
+            progress: 进度报告器（按已解析的字符数和消息数报告，
+                取消时抛出 OperationCancelled）
+            cache: DBC解析缓存，按文件内容哈希命中时直接加载，跳过文本解析；
+                未命中时解析后写入
             
         Returns:
             解析是否成功
@@ -107,246 +180,328 @@ class DBCParser:
         print(f"📁 解析DBC文件: {file_path}")
         
         try:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            self.content_hash = content_hash(raw)
+            self.loaded_from_cache = False
+            
+            if cache is not None:
+                if self._load_from_cache(cache):
+                    self.loaded_from_cache = True
+                    print(f"⚡ DBC缓存命中: {len(self.messages)}个消息, "
+                          f"{sum(len(msg.signals) for msg in self.messages)}个信号")
+                    return True
+                print("📝 DBC缓存未命中，解析文本")
+            
             # 检测编码
-            encoding = self._detect_encoding(file_path)
+            encoding = detect_encoding(file_path)
             print(f"🔤 检测编码: {encoding}")
             
-            # 读取文件
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
+            # 解码（个别无法解码的字符用替换字符代替，换行统一为 \n）
+            content = raw.decode(encoding, errors='replace')
+            del raw
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
             
             # 清空之前的数据
-            self.nodes.clear()
-            self.messages.clear()
-            self.value_tables.clear()
-            self.attributes.clear()
-            self.comments.clear()
+            for name in _STATE_FIELDS:
+                getattr(self, name).clear()
+            
+            if progress:
+                progress.unit = '条消息'
+                progress.start(len(content), '解析DBC')
             
-            # 解析各个部分
-            self._parse_nodes(content)
-            self._parse_value_tables(content)
-            self._parse_messages(content)
-            self._parse_comments(content)
-            self._parse_attributes(content)
+            # 一次遍历解析所有语句，再编译解码计划
+            self._parse_content(content, progress)
+            self._compile_decode_plans()
+            if progress:
+                progress.finish()
             
             print(f"✅ DBC解析完成:")
             print(f"   节点数: {len(self.nodes)}")
             print(f"   消息数: {len(self.messages)}")
             print(f"   信号数: {sum(len(msg.signals) for msg in self.messages)}")
             
+            if cache is not None and cache.store(self.content_hash, DBC_PARSER_VERSION,
+                                                 self._state(), file_path):
+                print("💾 DBC解析结果已写入缓存")
+            
             return True
             
+        except OperationCancelled:
+            raise
         except Exception as e:
             print(f"❌ DBC解析失败: {e}")
             return False
     
-    def _detect_encoding(self, file_path: str) -> str:
-        """检测文件编码"""
-        encodings = ['utf-8', 'gbk', 'ascii', 'latin1']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    f.read()
-                return encoding
-            except UnicodeDecodeError:
-                continue
+    def _state(self) -> Dict[str, Any]:
+        """
+        写入缓存的解析器状态
         
-        return 'utf-8'  # 默认
+        消息和信号展开为按字段顺序的元组，查找索引不保存（恢复时按原顺序重新登记，
+        同一键有多个定义时仍保留第一个）；编译好的解码计划本身是元组，直接保存。
+        """
+        messages = []
+        for message in self.messages:
+            messages.append((tuple(getattr(message, name) for name in _MESSAGE_FIELDS),
+                             [tuple(getattr(signal, name) for name in _SIGNAL_FIELDS) for signal in message.signals]))
+        return {
+            'nodes': [(node.name, node.comment) for node in self.nodes],
+            'messages': messages,
+            'value_tables': self.value_tables,
+            'attributes': self.attributes,
+            'comments': self.comments,
+            'decode_plans': self.decode_plans,
+        }
     
-    def _parse_nodes(self, content: str):
-        """解析节点定义"""
-        # BU_: Node1 Node2 Node3
-        pattern = r'BU_:\s*(.*?)(?:\n|$)'
-        match = re.search(pattern, content, re.MULTILINE)
-        
-        if match:
-            nodes_line = match.group(1).strip()
-            if nodes_line:
-                node_names = nodes_line.split()
-                for name in node_names:
-                    self.nodes.append(DBCNode(name=name))
+    def _load_from_cache(self, cache: DBCCache) -> bool:
+        """按内容哈希从缓存加载，未命中返回 False"""
+        # 加载期间新建的对象全部存活，暂停分代回收避免反复扫描
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            state = cache.load(self.content_hash, DBC_PARSER_VERSION)
+            if state is None:
+                return False
+            self._restore_state(state)
+            return True
+        finally:
+            if gc_enabled:
+                gc.enable()
     
-    def _parse_value_tables(self, content: str):
-        """解析值表定义"""
-        # VAL_TABLE_ TableName 0 "Value0" 1 "Value1" ;
-        pattern = r'VAL_TABLE_\s+(\w+)\s+((?:\d+\s+"[^"]*"\s*)*);'
-        
-        for match in re.finditer(pattern, content, re.MULTILINE):
-            table_name = match.group(1)
-            values_str = match.group(2)
-            
-            # 解析值对
-            value_pattern = r'(\d+)\s+"([^"]*)"'
-            values = {}
-            for value_match in re.finditer(value_pattern, values_str):
-                key = int(value_match.group(1))
-                value = value_match.group(2)
-                values[key] = value
-            
-            self.value_tables[table_name] = values
+    def _restore_state(self, state: Dict[str, Any]):
+        """从缓存恢复解析器状态并重建查找索引"""
+        for name in _STATE_FIELDS:
+            getattr(self, name).clear()
+        for name, comment in state['nodes']:
+            node = DBCNode(name, comment)
+            self.nodes.append(node)
+            self.nodes_by_name.setdefault(name, node)
+        for message_row, signal_rows in state['messages']:
+            message = DBCMessage(signals=[], **dict(zip(_MESSAGE_FIELDS, message_row)))
+            self._add_message(message)
+            for signal_row in signal_rows:
+                self._add_signal(message, DBCSignal(*signal_row))
+        self.value_tables.update(state['value_tables'])
+        self.attributes.update(state['attributes'])
+        self.comments.update(state['comments'])
+        self.decode_plans.update(state['decode_plans'])
     
-    def _parse_messages(self, content: str):
-        """解析消息和信号定义"""
-        # BO_ 123 MessageName: 8 NodeName
-        message_pattern = r'BO_\s+(\d+)\s+(\w+):\s*(\d+)\s+(\w+)'
+    def _compile_decode_plans(self):
+        """为每个信号编译解码计划（同名信号取第一个定义，与 signals_by_key 一致）"""
+        for key, signal in self.signals_by_key.items():
+            try:
+                self.decode_plans[key] = plan_for_signal(signal)
+            except ValueError as e:
+                print(f"⚠️ 信号 {key[0]}.{key[1]} 无法解码: {e}")
+    
+    def _parse_content(self, content: str, progress: Optional[ProgressReporter] = None):
+        """
+        逐行遍历一次DBC文本，按行首关键字分派到各语句的解析
         
-        for msg_match in re.finditer(message_pattern, content, re.MULTILINE):
-            can_id_raw = int(msg_match.group(1))
-            msg_name = msg_match.group(2)
-            dlc = int(msg_match.group(3))
-            transmitter = msg_match.group(4)
+        BO_ 之后的 SG_ 行属于该消息；CM_/BA_/VAL_TABLE_/VAL_ 语句可跨行（引号内的换行、
+        折行的值列表），累积到以分号结束后整体解析。注释和属性先收集，
+        遍历结束后按查找索引关联到消息和信号，总耗时与文件大小成正比。
+        """
+        lines = content.split('\n')
+        line_count = len(lines)
+        position = 0
+        next_report = PROGRESS_LINES
+        message = None
+        statements = []
+        index = 0
+        while index < line_count:
+            line = lines[index]
+            position += len(line) + 1
+            index += 1
+            if progress and index >= next_report:
+                progress.update(position, len(self.messages))
+                next_report = index + PROGRESS_LINES
             
-            # 过滤特殊消息：VECTOR__INDEPENDENT_SIG_MSG (用于未绑定的独立信号)
-            # 这类消息的 ID 通常是 0xC0000000 (3221225472) 或其他超出范围的值
-            if 'INDEPENDENT_SIG_MSG' in msg_name or can_id_raw >= 0xC0000000:
+            stripped = line.strip()
+            keyword = _first_token(stripped)
+            if keyword == 'SG_':
+                if message is not None:
+                    signal = self._parse_signal_line(stripped)
+                    if signal:
+                        self._add_signal(message, signal)
                 continue
-            
-            # 判断是否为扩展帧并提取实际的 CAN ID
-            can_id, is_extended = self._convert_raw_can_id(can_id_raw)
-            
-            # 过滤无效的扩展帧 ID（超出扩展帧最大范围 0x1FFFFFFF）
-            if is_extended and can_id > 0x1FFFFFFF:
+            if keyword.startswith('BO_'):
+                # 新的消息定义（BO_TX_BU_ 等也结束上一条消息的信号列表）
+                message = self._parse_message_line(stripped) if keyword == 'BO_' else None
+                if message is not None:
+                    self._add_message(message)
                 continue
-            
-            # 查找该消息的所有信号
-            signals = self._parse_signals_for_message(content, msg_match.end())
-            
-            message = DBCMessage(
-                can_id=can_id,
-                name=msg_name,
-                dlc=dlc,
-                transmitter=transmitter,
-                signals=signals,
-                is_extended=is_extended
-            )
-            
-            self.messages.append(message)
-    
-    def _parse_signals_for_message(self, content: str, start_pos: int) -> List[DBCSignal]:
-        """解析消息的信号定义"""
-        signals = []
+            if keyword.startswith('BU_:') and not self.nodes:
+                for name in stripped[4:].split():
+                    node = DBCNode(name=name)
+                    self.nodes.append(node)
+                    self.nodes_by_name.setdefault(name, node)
+                continue
+            if keyword in _MULTILINE_KEYWORDS:
+                # 跨行语句：引号未闭合或未以分号结束时接上后续行（遇到下一个语句关键字为止）
+                statement = stripped
+                while index < line_count and (statement.count('"') % 2 or not statement.endswith(';')):
+                    next_line = lines[index]
+                    if not statement.count('"') % 2 and _first_token(next_line) in _STATEMENT_KEYWORDS:
+                        break
+                    statement = f"{statement}\n{next_line}".rstrip()
+                    position += len(next_line) + 1
+                    index += 1
+                if keyword == 'VAL_TABLE_':
+                    self._parse_value_table(statement)
+                else:
+                    statements.append((keyword, statement))
         
-        # 从消息定义后开始查找信号，直到下一个消息定义
-        remaining_content = content[start_pos:]
+        self._resolve_statements(statements)
+    
+    def _parse_message_line(self, line: str) -> Optional[DBCMessage]:
+        """解析消息定义行 BO_ 123 MessageName: 8 NodeName（特殊消息和无效ID返回 None）"""
+        msg_match = _MESSAGE_PATTERN.match(line)
+        if not msg_match:
+            return None
+        can_id_raw = int(msg_match.group(1))
+        msg_name = msg_match.group(2)
         
-        # 找到下一个BO_定义的位置，限制搜索范围
-        next_msg_match = re.search(r'\nBO_', remaining_content)
-        if next_msg_match:
-            search_content = remaining_content[:next_msg_match.start()]
-        else:
-            search_content = remaining_content
+        # 过滤特殊消息：VECTOR__INDEPENDENT_SIG_MSG (用于未绑定的独立信号)
+        # 这类消息的 ID 通常是 0xC0000000 (3221225472) 或其他超出范围的值
+        if 'INDEPENDENT_SIG_MSG' in msg_name or can_id_raw >= 0xC0000000:
+            return None
         
-        # SG_ SignalName : 0|8@1+ (1,0) [0|255] "unit" Receiver1,Receiver2
-        signal_pattern = r'SG_\s+(\w+)\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*\(([^,]+),([^)]+)\)\s*\[([^|]*)\|([^\]]*)\]\s*"([^"]*)"\s*([^\n]*)'
+        # 判断是否为扩展帧并提取实际的 CAN ID
+        can_id, is_extended = self._convert_raw_can_id(can_id_raw)
         
-        for signal_match in re.finditer(signal_pattern, search_content, re.MULTILINE):
-            signal_name = signal_match.group(1)
-            start_bit = int(signal_match.group(2))
-            length = int(signal_match.group(3))
-            byte_order = 'little_endian' if signal_match.group(4) == '1' else 'big_endian'
-            value_type = 'signed' if signal_match.group(5) == '-' else 'unsigned'
-            factor = float(signal_match.group(6))
-            offset = float(signal_match.group(7))
-            minimum = float(signal_match.group(8)) if signal_match.group(8).strip() else 0.0
-            maximum = float(signal_match.group(9)) if signal_match.group(9).strip() else 0.0
-            unit = signal_match.group(10)
-            receivers_str = signal_match.group(11).strip()
-            receivers = [r.strip() for r in receivers_str.split(',') if r.strip()]
-            
-            signal = DBCSignal(
-                name=signal_name,
-                start_bit=start_bit,
-                length=length,
-                byte_order=byte_order,
-                value_type=value_type,
-                factor=factor,
-                offset=offset,
-                minimum=minimum,
-                maximum=maximum,
-                unit=unit,
-                receivers=receivers
-            )
-            
-            signals.append(signal)
+        # 过滤无效的扩展帧 ID（超出扩展帧最大范围 0x1FFFFFFF）
+        if is_extended and can_id > 0x1FFFFFFF:
+            return None
         
-        return signals
+        return DBCMessage(
+            can_id=can_id,
+            name=msg_name,
+            dlc=int(msg_match.group(3)),
+            transmitter=msg_match.group(4),
+            signals=[],
+            is_extended=is_extended
+        )
     
-    def _parse_comments(self, content: str):
-        """解析注释"""
-        # CM_ "comment text";
-        # CM_ BU_ NodeName "comment text";
-        # CM_ BO_ 123 "comment text";
-        # CM_ SG_ 123 SignalName "comment text";
-        
-        comment_patterns = [
-            (r'CM_\s+BU_\s+(\w+)\s+"([^"]*)"\s*;', 'node'),
-            (r'CM_\s+BO_\s+(\d+)\s+"([^"]*)"\s*;', 'message'),
-            (r'CM_\s+SG_\s+(\d+)\s+(\w+)\s+"([^"]*)"\s*;', 'signal'),
-            (r'CM_\s+"([^"]*)"\s*;', 'general')
-        ]
-        
-        for pattern, comment_type in comment_patterns:
-            for match in re.finditer(pattern, content, re.MULTILINE):
-                if comment_type == 'node':
-                    node_name = match.group(1)
-                    comment = match.group(2)
-                    for node in self.nodes:
-                        if node.name == node_name:
-                            node.comment = comment
-                            break
-                elif comment_type == 'message':
-                    can_id_raw = int(match.group(1))
-                    can_id, _ = self._convert_raw_can_id(can_id_raw)
-                    comment = match.group(2)
-                    for message in self.messages:
-                        if message.can_id == can_id:
-                            message.comment = comment
-                            break
-                elif comment_type == 'signal':
-                    can_id_raw = int(match.group(1))
-                    can_id, _ = self._convert_raw_can_id(can_id_raw)
-                    signal_name = match.group(2)
-                    comment = match.group(3)
-                    for message in self.messages:
-                        if message.can_id == can_id:
-                            for signal in message.signals:
-                                if signal.name == signal_name:
-                                    signal.comment = comment
-                                    break
-                            break
+    @staticmethod
+    def _parse_signal_line(line: str) -> Optional[DBCSignal]:
+        """解析信号定义行（多路复用信号 SG_ Name M/m1 : ... 不支持，返回 None）"""
+        # SG_ SignalName : 0|8@1+ (1,0) [0|255] "unit" Receiver1,Receiver2
+        signal_match = _SIGNAL_PATTERN.match(line)
+        if not signal_match:
+            return None
+        (name, start_bit, length, byte_order, value_type, factor, offset,
+         minimum, maximum, unit, receivers) = signal_match.groups()
+        return DBCSignal(
+            name,
+            int(start_bit),
+            int(length),
+            'little_endian' if byte_order == '1' else 'big_endian',
+            'signed' if value_type == '-' else 'unsigned',
+            float(factor),
+            float(offset),
+            float(minimum) if minimum.strip() else 0.0,
+            float(maximum) if maximum.strip() else 0.0,
+            unit,
+            [r.strip() for r in receivers.split(',') if r.strip()]
+        )
     
-    def _parse_attributes(self, content: str):
-        """解析属性定义"""
-        # BA_ "GenMsgCycleTime" BO_ 123 1000;
-        attr_pattern = r'BA_\s+"([^"]+)"\s+BO_\s+(\d+)\s+([^;]+);'
+    def _parse_value_table(self, statement: str):
+        """解析值表定义 VAL_TABLE_ TableName 0 "Value0" 1 "Value1" ;"""
+        match = _VALUE_TABLE_PATTERN.match(statement)
+        if match:
+            self.value_tables[match.group(1)] = _parse_value_pairs(match.group(2))
+    
+    def _add_message(self, message: DBCMessage):
+        """添加消息并登记到查找索引"""
+        self.messages.append(message)
+        self.messages_by_key.setdefault((message.can_id, message.is_extended), message)
+        self.messages_by_id.setdefault(message.can_id, message)
+        self.messages_by_name.setdefault(message.name, message)
+    
+    def _add_signal(self, message: DBCMessage, signal: DBCSignal):
+        """向消息添加信号并登记到查找索引"""
+        message.signals.append(signal)
+        self.signals_by_key.setdefault((message.name, signal.name), signal)
+    
+    def _message_for_raw_id(self, can_id_raw: str) -> Optional[DBCMessage]:
+        """按DBC文件中的原始ID（含扩展帧标记）查找消息"""
+        return self.messages_by_key.get(self._convert_raw_can_id(int(can_id_raw)))
+    
+    def _resolve_statements(self, statements: List[tuple]):
+        """
+        把收集的注释、属性和信号值描述通过查找索引关联到节点、消息和信号
         
-        for match in re.finditer(attr_pattern, content, re.MULTILINE):
-            attr_name = match.group(1)
-            can_id_raw = int(match.group(2))
-            can_id, _ = self._convert_raw_can_id(can_id_raw)
-            attr_value = match.group(3).strip()
-            
-            if attr_name == "GenMsgCycleTime":
-                # 设置消息周期时间
-                for message in self.messages:
-                    if message.can_id == can_id:
+        每条语句一次字典查找，同一ID/名称有多个定义时取第一个。
+        """
+        def find_signal(can_id_raw: str, signal_name: str) -> Optional[DBCSignal]:
+            message = self._message_for_raw_id(can_id_raw)
+            return self.signals_by_key.get((message.name, signal_name)) if message else None
+        
+        for keyword, statement in statements:
+            if keyword == 'CM_':
+                # CM_ BU_ NodeName "..."; CM_ BO_ 123 "..."; CM_ SG_ 123 SignalName "...";
+                match = _SIGNAL_COMMENT_PATTERN.match(statement)
+                if match:
+                    signal = find_signal(match.group(1), match.group(2))
+                    if signal:
+                        signal.comment = match.group(3)
+                    continue
+                match = _MESSAGE_COMMENT_PATTERN.match(statement)
+                if match:
+                    message = self._message_for_raw_id(match.group(1))
+                    if message:
+                        message.comment = match.group(2)
+                    continue
+                match = _NODE_COMMENT_PATTERN.match(statement)
+                if match and match.group(1) in self.nodes_by_name:
+                    self.nodes_by_name[match.group(1)].comment = match.group(2)
+            elif keyword == 'BA_':
+                # BA_ "GenMsgCycleTime" BO_ 123 1000;
+                match = _MESSAGE_ATTRIBUTE_PATTERN.match(statement)
+                if match and match.group(1) == "GenMsgCycleTime":
+                    message = self._message_for_raw_id(match.group(2))
+                    if message:
                         try:
-                            message.cycle_time = int(attr_value)
+                            message.cycle_time = int(match.group(3).strip())
                         except ValueError:
                             pass
-                        break
+            elif keyword == 'VAL_':
+                # VAL_ 123 SignalName 0 "Off" 1 "On" ;
+                match = _VALUE_DESCRIPTION_PATTERN.match(statement)
+                if match:
+                    signal = find_signal(match.group(1), match.group(2))
+                    if signal:
+                        signal.value_table = _parse_value_pairs(match.group(3))
     
-    def get_message_by_id(self, can_id: int) -> Optional[DBCMessage]:
-        """根据CAN ID获取消息定义"""
-        for message in self.messages:
-            if message.can_id == can_id:
-                return message
-        return None
+    def get_message_by_id(self, can_id: int, is_extended: Optional[bool] = None) -> Optional[DBCMessage]:
+        """
+        根据CAN ID获取消息定义（字典查找）
+        
+        Args:
+            can_id: 实际CAN ID（不含扩展帧标记）
+            is_extended: 帧类型，None 表示不区分（同一ID有标准帧和扩展帧时取先定义的）
+        """
+        if is_extended is None:
+            return self.messages_by_id.get(can_id)
+        return self.messages_by_key.get((can_id, is_extended))
+    
+    def get_message_by_name(self, name: str) -> Optional[DBCMessage]:
+        """根据消息名获取消息定义"""
+        return self.messages_by_name.get(name)
+    
+    def get_signal(self, message_name: str, signal_name: str) -> Optional[DBCSignal]:
+        """根据消息名和信号名获取信号定义"""
+        return self.signals_by_key.get((message_name, signal_name))
+    
+    def get_decode_plan(self, message_name: str, signal_name: str) -> Optional[SignalDecodePlan]:
+        """按消息名和信号名取解码计划"""
+        return self.decode_plans.get((message_name, signal_name))
     
-    def get_signals_by_message_id(self, can_id: int) -> List[DBCSignal]:
+    def get_signals_by_message_id(self, can_id: int, is_extended: Optional[bool] = None) -> List[DBCSignal]:
         """根据CAN ID获取信号列表"""
-        message = self.get_message_by_id(can_id)
+        message = self.get_message_by_id(can_id, is_extended)
         return message.signals if message else []
     
     def search_signals_by_name(self, name_pattern: str) -> List[tuple]:
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DBC解析性能基准
+生成不同规模的合成DBC（消息、信号、跨行注释、周期属性、值表），
+对比旧版按消息切片+正则搜索的解析算法与单次遍历的 DBCParser，
+并按每条消息的耗时检查解析时间是否随文件大小线性增长；同时给出DBC缓存命中时的加载耗时
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import tempfile
+import time
+
+from dbc_cache import DBCCache
+from dbc_parser import DBCMessage, DBCParser, DBCSignal
+
+# 旧版解析器使用的正则
+_LEGACY_MESSAGE_PATTERN = r'BO_\s+(\d+)\s+(\w+):\s*(\d+)\s+(\w+)'
+_LEGACY_SIGNAL_PATTERN = (r'SG_\s+(\w+)\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*\(([^,]+),([^)]+)\)\s*'
+                          r'\[([^|]*)\|([^\]]*)\]\s*"([^"]*)"\s*([^\n]*)')
+
+
+def legacy_parse(content: str) -> int:
+    """
+    旧版解析算法（基准参照）：每条消息复制其后的全部文本再搜索下一个 BO_，
+    每条注释/属性线性查找消息和信号，返回解析出的信号数
+    """
+    messages = []
+    for msg_match in re.finditer(_LEGACY_MESSAGE_PATTERN, content, re.MULTILINE):
+        can_id, is_extended = DBCParser._convert_raw_can_id(int(msg_match.group(1)))
+        remaining_content = content[msg_match.end():]
+        next_msg_match = re.search(r'\nBO_', remaining_content)
+        search_content = remaining_content[:next_msg_match.start()] if next_msg_match else remaining_content
+        signals = []
+        for m in re.finditer(_LEGACY_SIGNAL_PATTERN, search_content, re.MULTILINE):
+            signals.append(DBCSignal(
+                name=m.group(1), start_bit=int(m.group(2)), length=int(m.group(3)),
+                byte_order='little_endian' if m.group(4) == '1' else 'big_endian',
+                value_type='signed' if m.group(5) == '-' else 'unsigned',
+                factor=float(m.group(6)), offset=float(m.group(7)),
+                minimum=float(m.group(8)) if m.group(8).strip() else 0.0,
+                maximum=float(m.group(9)) if m.group(9).strip() else 0.0,
+                unit=m.group(10), receivers=[r.strip() for r in m.group(11).strip().split(',') if r.strip()]))
+        messages.append(DBCMessage(can_id=can_id, name=msg_match.group(2), dlc=int(msg_match.group(3)),
+                                   transmitter=msg_match.group(4), signals=signals, is_extended=is_extended))
+
+    for match in re.finditer(r'CM_\s+BO_\s+(\d+)\s+"([^"]*)"\s*;', content, re.MULTILINE):
+        can_id, _ = DBCParser._convert_raw_can_id(int(match.group(1)))
+        for message in messages:
+            if message.can_id == can_id:
+                message.comment = match.group(2)
+                break
+    for match in re.finditer(r'CM_\s+SG_\s+(\d+)\s+(\w+)\s+"([^"]*)"\s*;', content, re.MULTILINE):
+        can_id, _ = DBCParser._convert_raw_can_id(int(match.group(1)))
+        for message in messages:
+            if message.can_id == can_id:
+                for signal in message.signals:
+                    if signal.name == match.group(2):
+                        signal.comment = match.group(3)
+                        break
+                break
+    for match in re.finditer(r'BA_\s+"([^"]+)"\s+BO_\s+(\d+)\s+([^;]+);', content, re.MULTILINE):
+        can_id, _ = DBCParser._convert_raw_can_id(int(match.group(2)))
+        for message in messages:
+            if message.can_id == can_id:
+                message.cycle_time = int(match.group(3).strip())
+                break
+    return sum(len(message.signals) for message in messages)
+
+
+def generate_dbc(file_path: str, message_count: int, signals_per_message: int = 12, seed: int = 0):
+    """生成合成DBC文件（标准帧/扩展帧混合，每条消息带注释和周期属性，部分注释跨行）"""
+    rng = random.Random(seed)
+    nodes = [f"ECU{i}" for i in range(16)]
+    raw_ids = []
+    for i in range(message_count):
+        raw_ids.append(0x100 + i if i < 0x600 else (0x18F00000 + i) | DBCParser.EXTENDED_FRAME_FLAG)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('VERSION "benchmark"\n\nNS_ :\n\tCM_\n\tBA_DEF_\n\tBA_\n\tVAL_\n\nBS_:\n\n')
+        f.write(f"BU_: {' '.join(nodes)}\n\n")
+        f.write('VAL_TABLE_ OnOff 1 "On" 0 "Off" ;\n\n')
+        for i, raw_id in enumerate(raw_ids):
+            f.write(f"BO_ {raw_id} Message_{i}: 8 {nodes[i % len(nodes)]}\n")
+            for j in range(signals_per_message):
+                start_bit = (j * 64 // signals_per_message)
+                length = max(1, 64 // signals_per_message)
+                order = '1' if j % 3 else '0'
+                sign = '-' if j % 4 == 0 else '+'
+                f.write(f' SG_ Signal_{i}_{j} : {start_bit}|{length}@{order}{sign} '
+                        f'({rng.choice([1, 0.1, 0.01, 0.5])},{rng.choice([0, -40, 100])}) '
+                        f'[0|{(1 << length) - 1}] "unit" {nodes[(i + j) % len(nodes)]}\n')
+            f.write("\n")
+
+        for i, raw_id in enumerate(raw_ids):
+            f.write(f'CM_ BO_ {raw_id} "Message {i} comment";\n')
+            for j in range(0, signals_per_message, 3):
+                if j % 2:
+                    f.write(f'CM_ SG_ {raw_id} Signal_{i}_{j} "Signal {j} of message {i}\nsecond line";\n')
+                else:
+                    f.write(f'CM_ SG_ {raw_id} Signal_{i}_{j} "Signal {j} of message {i}";\n')
+        f.write('BA_DEF_ BO_ "GenMsgCycleTime" INT 0 65535;\n')
+        for i, raw_id in enumerate(raw_ids):
+            f.write(f'BA_ "GenMsgCycleTime" BO_ {raw_id} {rng.choice([10, 20, 50, 100, 1000])};\n')
+        for i, raw_id in enumerate(raw_ids):
+            f.write(f'VAL_ {raw_id} Signal_{i}_1 1 "On" 0 "Off" ;\n')
+
+
+def _time(function, repeat: int) -> float:
+    """函数的最优耗时（屏蔽控制台输出）"""
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(file_path: str, repeat: int = 3, legacy: bool = True) -> float:
+    """对一个DBC文件运行基准，打印一行结果，返回新解析器的耗时"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    parser = DBCParser()
+    elapsed = _time(lambda: parser.parse_file(file_path), repeat)
+    message_count = len(parser.messages)
+    signal_count = sum(len(message.signals) for message in parser.messages)
+    size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DBCCache(cache_dir)
+        _time(lambda: DBCParser().parse_file(file_path, cache=cache), 1)
+        cached_elapsed = _time(lambda: DBCParser().parse_file(file_path, cache=cache), repeat)
+    line = (f"{message_count:>8,}{signal_count:>10,}{size_mb:>9.2f}{elapsed:>11.3f}"
+            f"{elapsed / max(message_count, 1) * 1e6:>12.1f}{cached_elapsed:>11.3f}")
+    if legacy:
+        legacy_elapsed = _time(lambda: legacy_parse(content), 1)
+        line += f"{legacy_elapsed:>11.3f}{legacy_elapsed / elapsed:>9.1f}x"
+    print(line)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DBC解析性能基准")
+    parser.add_argument('--messages', type=int, nargs='+', default=[250, 500, 1000, 2000, 4000],
+                        help="生成的DBC消息数（可给多个规模）")
+    parser.add_argument('--signals', type=int, default=12, help="每条消息的信号数")
+    parser.add_argument('--file', help="使用已有的DBC文件（不生成语料）")
+    parser.add_argument('--repeat', type=int, default=3, help="每个用例重复次数（取最优）")
+    parser.add_argument('--no-legacy', action='store_true', help="不运行旧版算法（规模大时很慢）")
+    args = parser.parse_args()
+
+    header = f"{'消息数':>6}{'信号数':>7}{'MB':>9}{'耗时(s)':>9}{'μs/消息':>9}{'缓存(s)':>9}"
+    if not args.no_legacy:
+        header += f"{'旧版(s)':>9}{'加速比':>7}"
+    print(header)
+
+    if args.file:
+        run_benchmark(args.file, args.repeat, not args.no_legacy)
+        return
+
+    per_message = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for message_count in args.messages:
+            corpus = os.path.join(tmp_dir, f"benchmark_{message_count}.dbc")
+            generate_dbc(corpus, message_count, args.signals)
+            per_message.append(run_benchmark(corpus, args.repeat, not args.no_legacy) / message_count)
+
+    if len(per_message) > 1:
+        # 线性增长时每条消息的耗时基本不变
+        print(f"📈 每条消息耗时: 最大规模/最小规模 = {per_message[-1] / per_message[0]:.2f} (线性增长约为1)")
+
+
+if __name__ == "__main__":
+    main()
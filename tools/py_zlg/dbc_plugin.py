@@ -6,8 +6,9 @@ DBC插件 - 为CAN信号分析器添加DBC文件支持
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import random
+from dbc_cache import DBCCache
 from dbc_parser import DBCParser, DBCMessage, DBCSignal
 
 class DBCPlugin:
@@ -16,8 +17,12 @@ class DBCPlugin:
     def __init__(self, parent_app):
         self.parent_app = parent_app
         self.dbc_parser = DBCParser()
+        # 编译后的DBC缓存（同一数据库再次加载时跳过文本解析）
+        self.dbc_cache = DBCCache()
         self.dbc_loaded = False
         self.dbc_file_path = ""
+        # 信号下拉框选项 -> (消息, 信号)
+        self.signal_options: Dict[str, Tuple[DBCMessage, DBCSignal]] = {}
         
     def create_dbc_ui(self, parent_frame):
         """创建DBC相关UI"""
@@ -70,6 +75,8 @@ class DBCPlugin:
         
         ttk.Button(signal_select_frame, text="添加到列表", 
                   command=self.apply_dbc_signal).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(signal_select_frame, text="添加整条消息", 
+                  command=self.apply_dbc_message).pack(side=tk.RIGHT, padx=(5, 0))
         
         # DBC信息显示
         info_frame = ttk.Frame(self.dbc_controls_frame)
@@ -230,7 +237,7 @@ class DBCPlugin:
         
         try:
             # 解析DBC文件
-            success = self.dbc_parser.parse_file(file_path)
+            success = self.dbc_parser.parse_file(file_path, cache=self.dbc_cache)
             
             if success:
                 self.dbc_loaded = True
@@ -247,7 +254,8 @@ class DBCPlugin:
                 
                 # 更新信息显示
                 total_signals = sum(len(msg.signals) for msg in self.dbc_parser.messages)
-                self.dbc_info_var.set(f"已加载: {len(self.dbc_parser.messages)}个消息, {total_signals}个信号")
+                source = "（缓存）" if self.dbc_parser.loaded_from_cache else ""
+                self.dbc_info_var.set(f"已加载{source}: {len(self.dbc_parser.messages)}个消息, {total_signals}个信号")
                 
                 # 更新模式状态显示
                 if self.config_mode_var.get() == "dbc":
@@ -266,8 +274,9 @@ class DBCPlugin:
         if not self.dbc_loaded:
             return
         
-        # 构建信号列表
+        # 构建信号列表（同时记录选项到消息/信号的映射，选择时直接查找）
         signal_options = []
+        self.signal_options = {}
         for message in self.dbc_parser.messages:
             for signal in message.signals:
                 # 格式: "信号名 (0x123)" 或 "信号名 (0x123 Ext)"
@@ -276,6 +285,7 @@ class DBCPlugin:
                     can_id_str += " Ext"
                 option = f"{signal.name} ({can_id_str})"
                 signal_options.append(option)
+                self.signal_options.setdefault(option, (message, signal))
         
         # 更新下拉框
         self.dbc_signal_combo['values'] = signal_options
@@ -303,7 +313,9 @@ class DBCPlugin:
             self.dbc_info_var.set(info)
     
     def parse_signal_selection(self, selection: str):
-        """解析信号选择字符串"""
+        """解析信号选择字符串（下拉框选项直接查表，其余按字符串中的ID和信号名查找）"""
+        if selection in self.signal_options:
+            return self.signal_options[selection]
         try:
             # 格式: "信号名 (0x123) - 单位" 或 "信号名 (0x123 Ext) - 单位"
             parts = selection.split('(')
@@ -316,17 +328,16 @@ class DBCPlugin:
             # 提取CAN ID（可能包含 "Ext" 标记）
             can_id_part = parts[1].split(')')[0].strip()
             # 移除 "Ext" 标记（如果存在）
-            can_id_hex = can_id_part.split()[0]  # 取第一部分，例如 "0x123" 或 "0x123 Ext" 中的 "0x123"
-            can_id = int(can_id_hex, 16)
+            can_id_fields = can_id_part.split()
+            can_id = int(can_id_fields[0], 16)  # 取第一部分，例如 "0x123" 或 "0x123 Ext" 中的 "0x123"
+            is_extended = 'Ext' in can_id_fields[1:]
             
             # 查找对应的消息和信号
-            for message in self.dbc_parser.messages:
-                if message.can_id == can_id:
-                    for signal in message.signals:
-                        if signal.name == signal_name:
-                            return message, signal
-            
-            return None, None
+            message = self.dbc_parser.get_message_by_id(can_id, is_extended)
+            signal = self.dbc_parser.get_signal(message.name, signal_name) if message else None
+            if signal is None:
+                return None, None
+            return message, signal
             
         except Exception as e:
             print(f"解析信号选择失败: {e}")
@@ -371,6 +382,64 @@ class DBCPlugin:
         except Exception as e:
             messagebox.showerror("错误", f"应用信号失败: {e}")
     
+    def apply_dbc_message(self):
+        """把选中信号所在消息的全部信号添加到信号列表（整条消息的信号一次解码）"""
+        if not self.dbc_loaded:
+            messagebox.showwarning("警告", "请先加载DBC文件")
+            return
+        
+        selected = self.dbc_signal_var.get()
+        if not selected:
+            messagebox.showwarning("警告", "请选择消息中的一个信号")
+            return
+        
+        message, _ = self.parse_signal_selection(selected)
+        if not message:
+            messagebox.showerror("错误", "无法解析选中的信号")
+            return
+        if not message.signals:
+            messagebox.showwarning("警告", f"消息 {message.name} 没有信号")
+            return
+        if not self.check_message_loaded(message):
+            return
+        
+        try:
+            # 已在列表中的同名信号：一次询问替换还是跳过
+            existing_signals = {config['name'] for config in self.parent_app.signal_configs}
+            duplicates = [signal.name for signal in message.signals if signal.name in existing_signals]
+            replace = False
+            if duplicates:
+                replace = messagebox.askyesnocancel("信号已存在",
+                    f"消息 {message.name} 中有 {len(duplicates)} 个信号已在列表中。\n"
+                    f"是: 替换这些信号  否: 跳过这些信号")
+                if replace is None:
+                    return
+            
+            # 帧统计对整条消息只计算一次
+            frame_stats = self.parent_app.calculate_frame_stats(message.can_id)
+            added_configs = []
+            for signal in message.signals:
+                if signal.name in existing_signals:
+                    if not replace:
+                        continue
+                    self.remove_existing_signal(signal.name)
+                added_configs.append(self.append_signal_config(message, signal, signal.name, frame_stats))
+            
+            if not added_configs:
+                messagebox.showinfo("提示", f"消息 {message.name} 的信号都已在列表中")
+                return
+            
+            # 同一CAN ID的全部信号一起解码并缓存，之后刷新图表直接使用缓存
+            self.parent_app.get_message_series(message.can_id, added_configs)
+            
+            if hasattr(self.parent_app, 'status_label'):
+                self.parent_app.status_label.config(
+                    text=f"已添加消息 {message.name} 的 {len(added_configs)} 个信号")
+            self.parent_app.update_chart()
+            
+        except Exception as e:
+            messagebox.showerror("错误", f"添加消息信号失败: {e}")
+    
     def remove_existing_signal(self, signal_name: str):
         """删除已存在的信号"""
         try:
@@ -389,62 +458,29 @@ class DBCPlugin:
         except Exception as e:
             print(f"删除现有信号失败: {e}")
     
+    def check_message_loaded(self, message: DBCMessage) -> bool:
+        """检查已加载的ASC文件中是否有该消息的帧（没有时提示）"""
+        # 检查是否已加载ASC文件
+        if not self.parent_app.messages:
+            messagebox.showwarning("警告", "请先加载ASC文件")
+            return False
+        
+        # 检查CAN ID是否存在于ASC文件中
+        if not self.parent_app.messages.has_id(message.can_id):
+            messagebox.showwarning("警告", 
+                f"当前ASC文件中未找到CAN ID 0x{message.can_id:X}\n请确保已加载包含该消息的ASC文件")
+            return False
+        return True
+    
     def add_dbc_signal_to_list(self, message, signal, signal_display_name):
         """将DBC信号直接添加到信号列表"""
         try:
-            # 检查是否已加载ASC文件
-            if not self.parent_app.messages:
-                messagebox.showwarning("警告", "请先加载ASC文件")
+            if not self.check_message_loaded(message):
                 return
             
-            # 检查CAN ID是否存在于ASC文件中
-            can_id = message.can_id
-            test_messages = [msg for msg in self.parent_app.messages if msg['can_id'] == can_id]
-            if not test_messages:
-                messagebox.showwarning("警告", 
-                    f"当前ASC文件中未找到CAN ID 0x{can_id:X}\n请确保已加载包含该消息的ASC文件")
-                return
-            
-            # 创建信号配置（格式必须与主程序add_signal一致）
-            # 信号显示名称已经在调用前生成，直接使用
-            signal_config = {
-                'name': signal_display_name,
-                'can_id': can_id,  # 使用整数格式，不是字符串
-                'start_bit': signal.start_bit,
-                'length': signal.length,
-                'factor': signal.factor,
-                'offset': signal.offset,
-                'signed': signal.value_type == 'signed',
-                'endian': 'little' if signal.byte_order == 'little_endian' else 'big',
-                'color': self.parent_app.colors[len(self.parent_app.signal_configs) % len(self.parent_app.colors)]
-            }
-            
-            # 添加到信号配置列表
-            self.parent_app.signal_configs.append(signal_config)
-            
             # 计算帧统计信息（与主程序保持一致）
-            frame_stats = self.parent_app.calculate_frame_stats(can_id)
-            
-            # 更新界面显示（格式与主程序保持一致）
-            can_id_str = f"0x{can_id:X}"
-            endian_text = "大端" if signal_config['endian'] == "big" else "小端"
-            start_bit = signal.start_bit
-            length = signal.length
-            
-            # 格式化位置信息
-            if signal_config['endian'] == "big":
-                position_text = f"起始位:{start_bit}(MSB) | 长度:{length}位"
-            else:
-                position_text = f"起始位:{start_bit}(LSB) | 长度:{length}位"
-            
-            if frame_stats:
-                period_text = f"{frame_stats['period_ms']:.1f}ms"
-                drop_text = f"{frame_stats['dropped_frames']}帧({frame_stats['drop_rate']:.1f}%)"
-                display_text = f"{signal_display_name} | {can_id_str} | {position_text} | {endian_text} | 周期:{period_text} | 丢帧:{drop_text}"
-            else:
-                display_text = f"{signal_display_name} | {can_id_str} | {position_text} | {endian_text} | 统计:计算失败"
-            
-            self.parent_app.signal_listbox.insert(tk.END, display_text)
+            frame_stats = self.parent_app.calculate_frame_stats(message.can_id)
+            self.append_signal_config(message, signal, signal_display_name, frame_stats)
             
             # 更新状态
             if hasattr(self.parent_app, 'status_label'):
@@ -457,6 +493,49 @@ class DBCPlugin:
             print(f"添加DBC信号到列表失败: {e}")
             raise
     
+    def append_signal_config(self, message, signal, signal_display_name, frame_stats) -> Dict[str, Any]:
+        """创建DBC信号的配置并加入信号配置列表和界面列表（不刷新图表），返回配置"""
+        can_id = message.can_id
+        
+        # 创建信号配置（格式必须与主程序add_signal一致）
+        # 信号显示名称已经在调用前生成，直接使用
+        signal_config = {
+            'name': signal_display_name,
+            'can_id': can_id,  # 使用整数格式，不是字符串
+            'start_bit': signal.start_bit,
+            'length': signal.length,
+            'factor': signal.factor,
+            'offset': signal.offset,
+            'signed': signal.value_type == 'signed',
+            'endian': 'little' if signal.byte_order == 'little_endian' else 'big',
+            'color': self.parent_app.colors[len(self.parent_app.signal_configs) % len(self.parent_app.colors)]
+        }
+        
+        # 添加到信号配置列表
+        self.parent_app.signal_configs.append(signal_config)
+        
+        # 更新界面显示（格式与主程序保持一致）
+        can_id_str = f"0x{can_id:X}"
+        endian_text = "大端" if signal_config['endian'] == "big" else "小端"
+        start_bit = signal.start_bit
+        length = signal.length
+        
+        # 格式化位置信息
+        if signal_config['endian'] == "big":
+            position_text = f"起始位:{start_bit}(MSB) | 长度:{length}位"
+        else:
+            position_text = f"起始位:{start_bit}(LSB) | 长度:{length}位"
+        
+        if frame_stats:
+            period_text = f"{frame_stats['period_ms']:.1f}ms"
+            drop_text = f"{frame_stats['dropped_frames']}帧({frame_stats['drop_rate']:.1f}%)"
+            display_text = f"{signal_display_name} | {can_id_str} | {position_text} | {endian_text} | 周期:{period_text} | 丢帧:{drop_text}"
+        else:
+            display_text = f"{signal_display_name} | {can_id_str} | {position_text} | {endian_text} | 统计:计算失败"
+        
+        self.parent_app.signal_listbox.insert(tk.END, display_text)
+        return signal_config
+    
     def get_next_color(self):
         """获取下一个可用颜色"""
         if hasattr(self.parent_app, 'colors'):
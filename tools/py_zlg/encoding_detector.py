@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+文件编码检测
+只读取文件头、中间、尾部三个有限大小的采样窗口判断编码，与文件大小无关；
+检测结果按文件（路径、大小、修改时间）缓存。个别无法按检测结果解码的行
+再逐行宽松解码，不影响整个文件。压缩文件只采样解压后的开头部分。
+"""
+
+import codecs
+import os
+from typing import Dict, Tuple
+
+from compressed_io import detect_compression, open_compressed
+
+try:
+    import chardet
+    CHARDET_AVAILABLE = True
+except ImportError:
+    CHARDET_AVAILABLE = False
+
+# 每个采样窗口的大小
+SAMPLE_WINDOW_SIZE = 64 * 1024
+
+# chardet 结果低于该置信度时不采用
+CHARDET_MIN_CONFIDENCE = 0.5
+
+# chardet 返回的中文编码统一为 gbk（GB2312 是 GBK 的子集）
+_ENCODING_ALIASES = {'gb2312': 'gbk', 'ascii': 'utf-8'}
+
+# 检测结果缓存: (绝对路径, 大小, 修改时间) -> 编码
+_verdict_cache: Dict[Tuple[str, int, int], str] = {}
+
+
+def read_samples(file_path: str, window_size: int = SAMPLE_WINDOW_SIZE) -> bytes:
+    """
+    读取头/中/尾采样窗口并拼接
+
+    中间和尾部窗口去掉首尾不完整的行，避免从多字节字符中间截断造成误判。
+    压缩文件无法随机访问，改为读取解压后开头的三个窗口大小。
+    """
+    compression = detect_compression(file_path)
+    if compression:
+        with open_compressed(file_path, 'rb', compression) as f:
+            sample = f.read(window_size * 3)
+        if len(sample) < window_size * 3:
+            return sample
+        return sample[:sample.rfind(b'\n') + 1] or sample
+
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        if size <= window_size * 3:
+            return f.read()
+
+        samples = [f.read(window_size)]
+        samples[0] = samples[0][:samples[0].rfind(b'\n') + 1] or samples[0]
+        for offset in (size // 2 - window_size // 2, size - window_size):
+            f.seek(offset)
+            window = f.read(window_size)
+            start = window.find(b'\n') + 1
+            end = len(window) if offset + window_size >= size else window.rfind(b'\n') + 1
+            samples.append(window[start:end] if start < end else b'')
+    return b'\n'.join(samples)
+
+
+def detect_encoding_from_bytes(sample: bytes) -> str:
+    """根据采样字节判断编码：UTF-8 -> chardet(可选) -> GBK -> latin1"""
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    candidates = []
+    if CHARDET_AVAILABLE:
+        result = chardet.detect(sample)
+        if result.get('encoding') and (result.get('confidence') or 0) >= CHARDET_MIN_CONFIDENCE:
+            encoding = result['encoding'].lower()
+            candidates.append(_ENCODING_ALIASES.get(encoding, encoding))
+    candidates.append('gbk')
+
+    for encoding in candidates:
+        try:
+            codecs.lookup(encoding)
+            sample.decode(encoding)
+            return encoding
+        except (LookupError, UnicodeDecodeError):
+            continue
+
+    return 'latin1'  # 任意字节都能解码
+
+
+def detect_encoding(file_path: str) -> str:
+    """检测文件编码（按文件缓存结果）"""
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    encoding = _verdict_cache.get(key)
+    if encoding is None:
+        encoding = detect_encoding_from_bytes(read_samples(file_path))
+        _verdict_cache[key] = encoding
+    return encoding
+
+
+def decode_line(line: bytes, encoding: str) -> str:
+    """按检测出的编码解码一行，个别无法解码的行用替换字符宽松解码"""
+    try:
+        return line.decode(encoding)
+    except UnicodeDecodeError:
+        return line.decode(encoding, errors='replace')
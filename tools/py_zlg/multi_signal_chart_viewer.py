@@ -7,6 +7,8 @@ CAN多信号曲线图查看器
 
 import sys
 import os
+import multiprocessing
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import matplotlib.pyplot as plt
@@ -23,6 +25,13 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from simple_asc_reader import SimpleASCReader
+from can_message_table import CANMessageTable, GrowableArray, TimeIndex
+from asc_parse_cache import ASCParseCache
+from asc_merge import ASCMergeReader
+from compressed_io import COMPRESSED_PATTERNS
+from can_table_export import EXPORT_FILETYPES, MESSAGE_EXPORT_FILETYPES, export_format, export_signals
+from progress import CancelToken, OperationCancelled, ProgressReporter
+from signal_decoder import compile_plan, decode_signals, plan_from_config
 from help_manager import HelpTextManager
 from dbc_plugin import DBCPlugin
 
@@ -30,6 +39,15 @@ from dbc_plugin import DBCPlugin
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
 plt.rcParams['axes.unicode_minus'] = False
 
+# 实时跟踪文件的刷新间隔(毫秒)
+FOLLOW_REFRESH_MS = 1000
+
+# 后台加载文件时界面轮询进度的间隔(毫秒)
+LOAD_POLL_MS = 50
+
+# 原始日志窗口显示的目标帧前后行数
+RAW_CONTEXT_LINES = 50
+
 class MultiSignalChartViewer:
     def __init__(self, root):
         self.root = root
@@ -38,8 +56,8 @@ class MultiSignalChartViewer:
         # 设置窗口全屏
         self.setup_window()
         
-        # 数据存储
-        self.messages = []
+        # 数据存储（列式消息表）
+        self.messages = CANMessageTable()
         self.signal_configs = []  # 存储多个信号配置
         self.colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
         
@@ -62,6 +80,25 @@ class MultiSignalChartViewer:
         self.signal_data_cache = {}  # 缓存信号数据
         self.dropped_frames_cache = {}  # 缓存丢帧检测结果
         
+        # ASC解析结果的二进制缓存（再次打开同一文件时直接内存映射加载）
+        self.parse_cache = ASCParseCache()
+        
+        # 实时跟踪文件（文件仍在写入时只解析新追加的行）
+        self.reader = None
+        self.current_file_path = None
+        self.can_id_labels = {}  # CAN ID -> 下拉框显示文本
+        self.follow_var = tk.BooleanVar(value=False)
+        self.follow_job = None
+        
+        # 后台加载（工作线程只写入下面几个属性，界面线程轮询）
+        self.load_thread = None
+        self.load_cancel_token = None
+        self.load_progress = None  # 最新的 ProgressInfo
+        self.load_result = None    # (文件路径, reader, messages) 或异常，合并加载时文件路径为 None
+        self.signal_lines = {}  # 信号序号 -> 已绘制的曲线
+        self.data_start_time = 0.0  # 已加载数据的时间范围
+        self.data_end_time = 0.0
+        
         # 帮助文本管理器
         self.help_manager = HelpTextManager()
         
@@ -119,6 +156,12 @@ class MultiSignalChartViewer:
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="文件", menu=file_menu)
         file_menu.add_command(label="打开ASC文件", command=self.load_file, accelerator="Ctrl+O")
+        file_menu.add_command(label="合并打开多个ASC文件...", command=self.merge_files)
+        file_menu.add_checkbutton(label="实时跟踪文件", variable=self.follow_var, command=self.toggle_follow)
+        file_menu.add_command(label="导出消息...", command=self.export_messages)
+        file_menu.add_command(label="导出信号数据...", command=self.export_signal_data)
+        file_menu.add_command(label="导出当前时间范围原始日志...", command=self.export_raw_clip)
+        file_menu.add_command(label="清除解析缓存", command=self.clear_parse_cache)
         file_menu.add_separator()
         file_menu.add_command(label="退出", command=self.root.quit, accelerator="Ctrl+Q")
         
@@ -128,6 +171,7 @@ class MultiSignalChartViewer:
         view_menu.add_checkbutton(label="显示网格", variable=self.show_grid_var, command=self.update_chart)
         view_menu.add_checkbutton(label="子图模式", variable=self.subplot_mode_var, command=self.update_chart)
         view_menu.add_checkbutton(label="显示丢帧点", variable=self.show_dropped_frames_var, command=self.update_chart)
+        view_menu.add_command(label="原始日志...", command=self.show_raw_trace)
         view_menu.add_separator()
         view_menu.add_command(label="切换全屏", command=self.toggle_fullscreen, accelerator="F11")
         view_menu.add_separator()
@@ -389,9 +433,12 @@ class MultiSignalChartViewer:
         self.vlines = {}  # 存储每个子图的垂直线
         self.data_annotations = {}  # 存储数据标注
         
-        # 状态栏
-        self.status_label = ttk.Label(self.root, text="请选择ASC文件并添加信号", relief=tk.SUNKEN)
-        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+        # 状态栏（加载文件时显示吞吐量和停止按钮）
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.cancel_load_button = ttk.Button(status_frame, text="⏹ 停止加载", command=self.cancel_load)
+        self.status_label = ttk.Label(status_frame, text="请选择ASC文件并添加信号", relief=tk.SUNKEN)
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         # 绑定控制面板的鼠标滚轮事件
         self.bind_mousewheel_to_control_panel()
@@ -424,44 +471,33 @@ class MultiSignalChartViewer:
             return self.frame_stats_cache[can_id]
         
         try:
-            # 优化：使用列表推导式，一次性过滤和提取
-            message_data = [(msg['timestamp']) for msg in self.messages if msg['can_id'] == can_id]
+            # 按行索引只取该ID的帧的时间戳
+            message_data = self.messages.timestamps[self.messages.rows_for(can_id)]
             if len(message_data) < 3:
                 return None
             
-            # 优化：使用numpy排序（如果可用），否则使用内置sort
-            timestamps = sorted(message_data)
+            timestamps = np.sort(message_data)
             
-            # 优化：向量化计算间隔
-            intervals = [timestamps[i] - timestamps[i-1] for i in range(1, len(timestamps))]
+            # 向量化计算间隔
+            intervals = np.diff(timestamps)
             
-            if not intervals:
+            if not len(intervals):
                 return None
             
-            # 优化：使用更快的统计方法
-            intervals_array = np.array(intervals) if 'np' in globals() else intervals
-            
-            if isinstance(intervals_array, np.ndarray):
-                estimated_period = float(np.median(intervals_array))
-                avg_period = float(np.mean(intervals_array))
-            else:
-                estimated_period = statistics.median(intervals)
-                avg_period = statistics.mean(intervals)
+            estimated_period = float(np.median(intervals))
+            avg_period = float(np.mean(intervals))
             
             # 众数计算优化：只在必要时执行
             if abs(estimated_period - avg_period) > estimated_period * 0.5:
-                # 优化的众数计算
+                # 按1ms分箱统计众数
                 bin_size = 0.001
-                interval_counts = {}
-                for interval in intervals:
-                    bin_key = round(interval / bin_size) * bin_size
-                    interval_counts[bin_key] = interval_counts.get(bin_key, 0) + 1
-                
-                if interval_counts:
-                    estimated_period = max(interval_counts, key=interval_counts.get)
+                bins = np.round(intervals / bin_size).astype(np.int64)
+                values, counts = np.unique(bins, return_counts=True)
+                if len(values):
+                    estimated_period = float(values[np.argmax(counts)] * bin_size)
             
             # 优化：预计算常用值
-            total_time = timestamps[-1] - timestamps[0]
+            total_time = float(timestamps[-1] - timestamps[0])
             expected_frames = int(total_time / estimated_period) + 1
             actual_frames = len(message_data)
             dropped_frames = max(0, expected_frames - actual_frames)
@@ -494,7 +530,7 @@ class MultiSignalChartViewer:
         
         try:
             # 优化：一次性获取并排序时间戳
-            timestamps = sorted([msg['timestamp'] for msg in self.messages if msg['can_id'] == can_id])
+            timestamps = np.sort(self.messages.timestamps[self.messages.rows_for(can_id)]).tolist()
             
             if len(timestamps) < 2:
                 return []
@@ -529,41 +565,37 @@ class MultiSignalChartViewer:
             return []
     
     def interpolate_signal_at_dropped_frames(self, timestamps, values, dropped_times):
-        """在丢帧位置插值估算信号值"""
-        interpolated_values = []
-        
-        for drop_time in dropped_times:
-            # 找到最近的两个数据点进行线性插值
-            before_idx = -1
-            after_idx = -1
-            
-            for i, ts in enumerate(timestamps):
-                if ts <= drop_time:
-                    before_idx = i
-                if ts > drop_time and after_idx == -1:
-                    after_idx = i
-                    break
-            
-            # 执行线性插值
-            if before_idx >= 0 and after_idx >= 0:
-                t1, v1 = timestamps[before_idx], values[before_idx]
-                t2, v2 = timestamps[after_idx], values[after_idx]
-                
-                # 线性插值公式
-                ratio = (drop_time - t1) / (t2 - t1) if t2 != t1 else 0
-                interpolated_value = v1 + ratio * (v2 - v1)
-                interpolated_values.append(interpolated_value)
-            elif before_idx >= 0:
-                # 只有前面的点，使用最近值
-                interpolated_values.append(values[before_idx])
-            elif after_idx >= 0:
-                # 只有后面的点，使用最近值
-                interpolated_values.append(values[after_idx])
-            else:
-                # 无法插值，使用0
-                interpolated_values.append(0)
-        
-        return interpolated_values
+        """在丢帧位置插值估算信号值（按时间索引二分查找相邻数据点）"""
+        if not len(dropped_times):
+            return []
+        if not len(timestamps):
+            # 无法插值，使用0
+            return [0] * len(dropped_times)
+        
+        # 按时间顺序的数据点
+        time_index = TimeIndex(timestamps)
+        ts = time_index.sorted_timestamps
+        vals = np.asarray(values, dtype=np.float64)
+        if not time_index.is_monotonic:
+            vals = vals[time_index.order]
+        drops = np.asarray(dropped_times, dtype=np.float64)
+        
+        # 找到最近的两个数据点：before 为最后一个 <= 丢帧时间的点，after 为其后一个点
+        after_idx = np.searchsorted(ts, drops, side='right')
+        before_idx = after_idx - 1
+        has_before = before_idx >= 0
+        has_after = after_idx < len(ts)
+        t1 = ts[np.maximum(before_idx, 0)]
+        v1 = vals[np.maximum(before_idx, 0)]
+        t2 = ts[np.minimum(after_idx, len(ts) - 1)]
+        v2 = vals[np.minimum(after_idx, len(ts) - 1)]
+        
+        # 线性插值公式；只有一侧有数据点时使用最近值
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(t2 != t1, (drops - t1) / (t2 - t1), 0.0)
+        interpolated = np.where(has_before & has_after, v1 + ratio * (v2 - v1),
+                                np.where(has_before, v1, v2))
+        return interpolated.tolist()
     
     def show_user_guide(self):
         """显示用户指南"""
@@ -693,64 +725,155 @@ class MultiSignalChartViewer:
         """加载ASC文件"""
         file_path = filedialog.askopenfilename(
             title="选择ASC文件",
-            filetypes=[("ASC files", "*.asc"), ("All files", "*.*")]
+            filetypes=[("ASC files", "*.asc"), ("Compressed ASC files", " ".join(COMPRESSED_PATTERNS)),
+                       ("All files", "*.*")]
         )
         
         if not file_path:
             return
         
+        self.start_background_load(self.load_file_worker, file_path, os.path.basename(file_path))
+    
+    def merge_files(self):
+        """按时间戳合并打开多个ASC文件（通道重映射、时间偏移和去重见 asc_merge.py 命令行）"""
+        file_paths = filedialog.askopenfilenames(
+            title="选择要合并的ASC文件",
+            filetypes=[("ASC files", "*.asc"), ("Compressed ASC files", " ".join(COMPRESSED_PATTERNS)),
+                       ("All files", "*.*")]
+        )
+        if not file_paths:
+            return
+        if len(file_paths) < 2:
+            messagebox.showwarning("警告", "请选择至少两个文件进行合并")
+            return
+        
+        self.start_background_load(self.merge_files_worker, list(file_paths), f"合并 {len(file_paths)} 个文件")
+    
+    def start_background_load(self, worker, source, name):
+        """在后台线程中解析，界面保持响应并显示进度"""
+        if self.load_thread is not None:
+            messagebox.showwarning("警告", "正在加载文件，请稍候或先停止加载")
+            return
+        
+        # 加载新文件前停止实时跟踪
+        if self.follow_var.get():
+            self.follow_var.set(False)
+            self.toggle_follow()
+        
+        self.status_label.config(text="正在加载文件...")
+        self.cancel_load_button.pack(side=tk.RIGHT)
+        self.load_cancel_token = CancelToken()
+        self.load_progress = None
+        self.load_result = None
+        progress = ProgressReporter(self.set_load_progress, self.load_cancel_token)
+        self.load_thread = threading.Thread(target=worker, args=(source, progress), daemon=True)
+        self.load_thread.start()
+        self.root.after(LOAD_POLL_MS, lambda: self.poll_load(name))
+    
+    def set_load_progress(self, info):
+        """进度回调（工作线程中调用，只记录最新进度）"""
+        self.load_progress = info
+    
+    def load_file_worker(self, file_path, progress):
+        """后台加载线程：命中缓存直接映射，否则解析并写入缓存"""
         try:
-            self.status_label.config(text="正在加载文件...")
-            self.root.update()
-            
             reader = SimpleASCReader()
-            self.messages = reader.read_file(file_path)
+            cached = self.parse_cache.load(file_path)
+            if cached:
+                messages, file_info = cached
+                reader.attach(file_path, messages, file_info)
+                print(f"⚡ 解析缓存命中: {len(messages)} 条CAN消息")
+            else:
+                # 大文件按CPU核数多进程并行解析（小文件内部自动走单进程）；
+                # 只解析完整行，文件仍在写入时末尾未写完的行留给实时跟踪；
+                # 数据字段延迟解码，添加信号时才按CAN ID批量解码
+                messages = reader.read_file(file_path, workers=os.cpu_count() or 1,
+                                            complete_lines_only=True, lazy_payload=True, progress=progress)
+                if messages:
+                    self.parse_cache.store(file_path, messages, reader.file_info)
+            self.load_result = (file_path, reader, messages)
+        except Exception as e:
+            self.load_result = e
+    
+    def merge_files_worker(self, file_paths, progress):
+        """后台合并线程：K路归并为一个消息表（合并结果不写入解析缓存）"""
+        try:
+            messages = ASCMergeReader(file_paths).read(progress)
+            reader = SimpleASCReader()
+            reader.messages = messages
+            self.load_result = (None, reader, messages)
+        except Exception as e:
+            self.load_result = e
+    
+    def cancel_load(self):
+        """停止后台加载（解析在下一个检查点停止，保留当前已加载的数据）"""
+        if self.load_cancel_token:
+            self.load_cancel_token.cancel()
+            self.status_label.config(text="正在停止加载...")
+    
+    def poll_load(self, name):
+        """轮询后台加载：显示吞吐量和剩余时间，完成后在界面线程中更新显示"""
+        if self.load_thread.is_alive():
+            info = self.load_progress
+            if info is not None and not self.load_cancel_token.cancelled:
+                self.status_label.config(text=f"正在加载 {name}: {info.format()}")
+            self.root.after(LOAD_POLL_MS, lambda: self.poll_load(name))
+            return
+        
+        result = self.load_result
+        self.load_thread = None
+        self.load_cancel_token = None
+        self.cancel_load_button.pack_forget()
+        if isinstance(result, OperationCancelled):
+            self.status_label.config(text="已停止加载")
+        elif isinstance(result, Exception):
+            messagebox.showerror("错误", f"加载文件失败: {result}")
+            self.status_label.config(text="加载文件失败")
+        else:
+            self.finish_load(*result, name)
+    
+    def finish_load(self, file_path, reader, messages, name):
+        """加载完成后更新界面（界面线程）；file_path 为 None 表示合并加载的数据"""
+        try:
+            self.messages = messages
+            self.reader = reader
+            self.current_file_path = file_path
             
             if not self.messages:
                 messagebox.showerror("错误", "未找到CAN消息")
                 return
             
             # 更新文件标签
-            self.file_label.config(text=f"已加载: {os.path.basename(file_path)}")
+            self.file_label.config(text=f"已加载: {name}")
             
-            # 统计CAN ID
-            can_id_stats = defaultdict(int)
-            for msg in self.messages:
-                can_id_stats[msg['can_id']] += 1
+            # 统计CAN ID（由行索引汇总，含每个ID首次出现的行，用于判断帧类型）
+            unique_ids, first_rows, _ = self.messages.id_index()
+            is_extended_flags = self.messages.is_extended[first_rows]
             
             # 清理缓存（数据变化了）
             self.frame_stats_cache.clear()
             self.signal_data_cache.clear()
             self.dropped_frames_cache.clear()
             
-            # 统计扩展帧信息
-            frame_type_info = {}
-            for msg in self.messages:
-                can_id = msg['can_id']
-                if can_id not in frame_type_info:
-                    is_extended = msg.get('is_extended', can_id > 0x7FF)
-                    frame_type_info[can_id] = is_extended
-            
             # 更新CAN ID选择框（显示帧类型）
-            can_ids = []
-            for can_id in sorted(can_id_stats.keys()):
-                is_extended = frame_type_info.get(can_id, can_id > 0x7FF)
-                if is_extended:
-                    can_ids.append(f"0x{can_id:X} (扩展帧)")
-                else:
-                    can_ids.append(f"0x{can_id:X} (标准帧)")
-            
-            self.can_id_combo['values'] = can_ids
+            self.can_id_labels = {}
+            self.update_can_id_labels(unique_ids, is_extended_flags)
+            can_ids = list(self.can_id_combo['values'])
             
             if can_ids:
                 self.can_id_combo.current(0)
             
-            self.status_label.config(text=f"已加载 {len(self.messages)} 条消息，{len(can_id_stats)} 个CAN ID")
+            # 加载摘要（由行索引一次汇总，与文件大小无关）
+            stats = reader.get_statistics()
+            channels = ", ".join(f"CH{ch}" for ch in stats['channel_counts'])
+            self.status_label.config(text=f"已加载 {stats['total_messages']} 条消息，{stats['unique_can_ids']} 个CAN ID，"
+                                          f"通道 {channels}，时长 {stats['duration_seconds']:.1f}s "
+                                          f"(Rx {stats['rx_messages']} / Tx {stats['tx_messages']})")
             
             # 更新时间范围显示
             if self.messages:
-                min_time = min(msg['timestamp'] for msg in self.messages)
-                max_time = max(msg['timestamp'] for msg in self.messages)
+                min_time, max_time = stats['time_start'], stats['time_end']
+                self.data_start_time, self.data_end_time = min_time, max_time
                 self.time_start_var.set(f"{min_time:.3f}")
                 self.time_end_var.set(f"{max_time:.3f}")
                 self.current_time_range = (min_time, max_time)
@@ -763,6 +886,308 @@ class MultiSignalChartViewer:
             messagebox.showerror("错误", f"加载文件失败: {e}")
             self.status_label.config(text="加载文件失败")
     
+    def update_can_id_labels(self, can_ids, is_extended_flags):
+        """把CAN ID加入选择框（显示帧类型，按ID排序）"""
+        for can_id, is_extended in zip(can_ids.tolist(), is_extended_flags.tolist()):
+            if can_id not in self.can_id_labels:
+                frame_type = "扩展帧" if is_extended else "标准帧"
+                self.can_id_labels[can_id] = f"0x{can_id:X} ({frame_type})"
+        self.can_id_combo['values'] = [self.can_id_labels[can_id] for can_id in sorted(self.can_id_labels)]
+    
+    def toggle_follow(self):
+        """开启/关闭实时跟踪文件"""
+        if self.follow_job is not None:
+            self.root.after_cancel(self.follow_job)
+            self.follow_job = None
+        
+        if not self.follow_var.get():
+            self.status_label.config(text="已停止实时跟踪")
+            return
+        
+        if self.reader is None:
+            messagebox.showwarning("警告", "请先加载ASC文件")
+            self.follow_var.set(False)
+            return
+        if self.current_file_path is None:
+            messagebox.showwarning("警告", "合并加载的数据不支持实时跟踪")
+            self.follow_var.set(False)
+            return
+        
+        self.status_label.config(text=f"实时跟踪: {os.path.basename(self.current_file_path)}")
+        self.follow_job = self.root.after(FOLLOW_REFRESH_MS, self.follow_tick)
+    
+    def follow_tick(self):
+        """实时跟踪：解析新追加的行并增量刷新（每 FOLLOW_REFRESH_MS 执行一次）"""
+        self.follow_job = None
+        if not self.follow_var.get():
+            return
+        
+        try:
+            batch = self.reader.read_appended()
+        except OSError as e:
+            self.follow_var.set(False)
+            messagebox.showerror("错误", f"实时跟踪失败: {e}")
+            return
+        
+        if batch is None:
+            self.follow_var.set(False)
+            messagebox.showwarning("警告", "文件已被截断或替换，请重新加载")
+            return
+        
+        if len(batch):
+            self.on_messages_appended(batch)
+        
+        self.follow_job = self.root.after(FOLLOW_REFRESH_MS, self.follow_tick)
+    
+    def on_messages_appended(self, batch):
+        """
+        新消息已追加到 self.messages 后增量更新
+        
+        只处理新批次：更新CAN ID列表、让受影响ID的统计缓存失效、
+        只对新帧提取信号值追加到信号缓存，然后刷新曲线。
+        """
+        previous_end = self.data_end_time
+        batch_ids, first_rows, _ = batch.id_index()
+        self.update_can_id_labels(batch_ids, batch.is_extended[first_rows])
+        
+        # 受影响ID的帧统计和丢帧检测缓存失效（下次使用时重新计算）
+        affected_ids = set(batch_ids.tolist())
+        for can_id in affected_ids:
+            self.frame_stats_cache.pop(can_id, None)
+        for cache_key in [key for key in self.dropped_frames_cache if int(key.split('_')[0]) in affected_ids]:
+            del self.dropped_frames_cache[cache_key]
+        
+        # 已提取的信号只解码新帧并追加（同一CAN ID的信号一次解码）
+        pending = defaultdict(dict)
+        for config in self.signal_configs:
+            signal_cache_key = self.signal_cache_key(config)
+            if config['can_id'] in affected_ids and signal_cache_key in self.signal_data_cache:
+                pending[config['can_id']].setdefault(signal_cache_key, config)
+        for can_id, configs in pending.items():
+            series = self.extract_message_series(batch.select(can_id), list(configs.values()))
+            for signal_cache_key, (timestamps, values) in zip(configs, series):
+                ts_buffer, value_buffer, time_index = self.signal_data_cache[signal_cache_key]
+                ts_buffer.extend(timestamps)
+                value_buffer.extend(values)
+                time_index.extend(ts_buffer.view())
+        
+        # 正在查看文件末尾时，时间窗口随新数据向后滚动
+        self.data_end_time = self.messages.time_index().bounds()[1]
+        if self.current_time_range and self.current_time_range[1] >= previous_end:
+            start, end = self.current_time_range
+            if start > self.data_start_time:
+                start += self.data_end_time - end  # 保持窗口宽度
+            self.current_time_range = (start, self.data_end_time)
+            self.time_start_var.set(f"{start:.3f}")
+            self.time_end_var.set(f"{self.data_end_time:.3f}")
+        
+        self.refresh_plotted_lines()
+        self.status_label.config(text=f"实时跟踪: +{len(batch)} 条消息，共 {len(self.messages)} 条")
+    
+    def refresh_plotted_lines(self):
+        """只更新已绘制曲线的数据，不重建图表（实时跟踪时使用）"""
+        needs_rebuild = (
+            self.show_dropped_frames_var.get()  # 丢帧点需要重新检测
+            or len(self.signal_lines) != len(self.signal_configs)
+        )
+        if not needs_rebuild:
+            for i, line in self.signal_lines.items():
+                config = self.signal_configs[i]
+                signal_cache_key = self.signal_cache_key(config)
+                if signal_cache_key not in self.signal_data_cache:
+                    needs_rebuild = True
+                    break
+        
+        if needs_rebuild:
+            self.last_update_time = 0
+            self.update_chart()
+            return
+        
+        time_start, time_end = self.current_time_range if self.current_time_range else (None, None)
+        for i, line in self.signal_lines.items():
+            config = self.signal_configs[i]
+            signal_cache_key = self.signal_cache_key(config)
+            ts_buffer, value_buffer, time_index = self.signal_data_cache[signal_cache_key]
+            visible_rows = time_index.rows(time_start, time_end)
+            line.set_data(ts_buffer.view()[visible_rows], value_buffer.view()[visible_rows])
+        
+        for ax in self.axes_list:
+            ax.relim()
+            ax.autoscale_view()
+            if time_start is not None and time_end is not None:
+                ax.set_xlim(time_start, time_end)
+        self.canvas.draw_idle()
+    
+    def export_messages(self):
+        """导出已加载的全部消息（Parquet/Arrow需要pyarrow，按扩展名选择格式）"""
+        if not self.messages:
+            messagebox.showwarning("警告", "请先加载ASC文件")
+            return
+        output_path = filedialog.asksaveasfilename(title="导出消息", defaultextension=".parquet",
+                                                   filetypes=MESSAGE_EXPORT_FILETYPES)
+        if not output_path:
+            return
+        
+        self.status_label.config(text="正在导出消息...")
+        self.root.update()
+        fmt = export_format(output_path)
+        if fmt == 'parquet':
+            ok = self.reader.export_to_parquet(output_path)
+        elif fmt == 'arrow':
+            ok = self.reader.export_to_arrow(output_path)
+        elif fmt == 'asc':
+            ok = self.reader.export_to_asc(output_path)
+        else:
+            ok = self.reader.export_to_csv(output_path)
+        if ok:
+            self.status_label.config(text=f"已导出 {len(self.messages)} 条消息: {os.path.basename(output_path)}")
+        else:
+            self.status_label.config(text="导出消息失败")
+            messagebox.showerror("错误", "导出消息失败，详见控制台输出")
+    
+    def export_signal_data(self):
+        """导出已添加信号在当前时间范围内的解码值（长表：信号名, CAN ID, 时间戳, 物理值）"""
+        if not self.signal_configs:
+            messagebox.showwarning("警告", "请先添加信号")
+            return
+        output_path = filedialog.asksaveasfilename(title="导出信号数据", defaultextension=".parquet",
+                                                   filetypes=EXPORT_FILETYPES)
+        if not output_path:
+            return
+        
+        time_start, time_end = self.current_time_range or (None, None)
+        series = []
+        for config in self.signal_configs:
+            ts_buffer, value_buffer, time_index = self.get_signal_series(config)
+            rows = time_index.rows(time_start, time_end)
+            series.append((config['name'], config['can_id'], ts_buffer.view()[rows], value_buffer.view()[rows]))
+        
+        try:
+            total = export_signals(output_path, series)
+        except Exception as e:
+            messagebox.showerror("错误", f"导出信号数据失败: {e}")
+            return
+        self.status_label.config(text=f"已导出 {len(series)} 个信号 {total} 个采样点: {os.path.basename(output_path)}")
+    
+    @staticmethod
+    def signal_cache_key(config):
+        """信号缓存键（CAN ID和全部解码参数，参数相同的信号共用解码结果）"""
+        return (f"{config['can_id']}_{config['start_bit']}_{config['length']}_{config['endian']}"
+                f"_{bool(config.get('signed', False))}_{config.get('factor', 1.0)}_{config.get('offset', 0.0)}")
+    
+    def get_signal_series(self, config):
+        """
+        信号的 (时间戳缓冲, 物理值缓冲, 时间索引)，首次访问时按行索引提取并缓存
+        （可追加，缩放/平移时在时间索引上二分定位可见窗口）
+        """
+        return self.get_message_series(config['can_id'], [config])[0]
+    
+    def get_message_series(self, can_id, configs):
+        """
+        同一CAN ID的多个信号的 (时间戳缓冲, 物理值缓冲, 时间索引) 列表
+        
+        未缓存的信号一起解码：按行索引取该ID的消息、构建数据矩阵各一次，
+        添加整条消息的几十个信号与添加一个信号的开销相当。
+        """
+        pending = {}
+        for config in configs:
+            signal_cache_key = self.signal_cache_key(config)
+            if signal_cache_key not in self.signal_data_cache:
+                pending.setdefault(signal_cache_key, config)
+        
+        if pending:
+            # 按行索引取对应CAN ID的消息
+            filtered_messages = self.messages.select(can_id)
+            series = self.extract_message_series(filtered_messages, list(pending.values()))
+            for signal_cache_key, (timestamps, values) in zip(pending, series):
+                ts_buffer, value_buffer = GrowableArray(timestamps), GrowableArray(values)
+                self.signal_data_cache[signal_cache_key] = (ts_buffer, value_buffer, TimeIndex(ts_buffer.view()))
+        return [self.signal_data_cache[self.signal_cache_key(config)] for config in configs]
+    
+    def get_raw_source_reader(self):
+        """可按行号读取原始日志的读取器（未加载、合并数据或压缩文件时提示并返回 None）"""
+        if not self.messages:
+            messagebox.showwarning("警告", "请先加载ASC文件")
+            return None
+        if self.current_file_path is None:
+            messagebox.showwarning("警告", "合并加载的数据没有单一的原始日志")
+            return None
+        if self.reader.compression:
+            messagebox.showwarning("警告", "压缩文件不支持查看原始日志")
+            return None
+        return self.reader
+    
+    def show_raw_trace(self, timestamp=None):
+        """
+        显示某一时刻附近的原始日志行（默认当前时间范围的起点）
+        
+        由行偏移索引定位，只读取显示的几十行，与文件大小无关。
+        """
+        reader = self.get_raw_source_reader()
+        if reader is None:
+            return
+        if timestamp is None:
+            timestamp = self.current_time_range[0] if self.current_time_range else self.data_start_time
+        
+        try:
+            line_number, lines = reader.raw_context_at_time(timestamp, RAW_CONTEXT_LINES, RAW_CONTEXT_LINES)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"读取原始日志失败: {e}")
+            return
+        
+        raw_window = tk.Toplevel(self.root)
+        raw_window.title(f"原始日志 - {os.path.basename(self.current_file_path)} 第{line_number}行 ({timestamp:.6f}s)")
+        raw_window.geometry("900x600")
+        
+        text_frame = ttk.Frame(raw_window)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        text_widget = tk.Text(text_frame, wrap=tk.NONE, font=("Consolas", 10))
+        y_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=text_widget.yview)
+        x_scrollbar = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=text_widget.xview)
+        text_widget.config(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        text_widget.pack(fill=tk.BOTH, expand=True)
+        
+        # 左侧显示行号，高亮目标帧所在行
+        width = len(str(lines[-1][0])) if lines else 1
+        text_widget.tag_config('target', background='#FFF2A8')
+        for number, line in lines:
+            text_widget.insert(tk.END, f"{number:>{width}} | {line}\n", 'target' if number == line_number else ())
+        text_widget.config(state=tk.DISABLED)
+        target_row = next((i for i, (number, _) in enumerate(lines) if number == line_number), 0)
+        text_widget.see(f"{target_row + 1}.0")
+        
+        ttk.Button(raw_window, text="关闭", command=raw_window.destroy).pack(pady=(0, 10))
+    
+    def export_raw_clip(self):
+        """导出当前时间范围内的原始日志片段（文件头 + 范围内的原始行，逐字节复制）"""
+        reader = self.get_raw_source_reader()
+        if reader is None:
+            return
+        output_path = filedialog.asksaveasfilename(title="导出原始日志片段", defaultextension=".asc",
+                                                   filetypes=[("ASC文件", "*.asc"), ("所有文件", "*.*")])
+        if not output_path:
+            return
+        
+        time_start, time_end = self.current_time_range or (None, None)
+        try:
+            total = reader.export_raw_clip(output_path, time_start, time_end)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"导出原始日志失败: {e}")
+            return
+        if not total:
+            messagebox.showwarning("警告", "当前时间范围内没有消息")
+            return
+        self.status_label.config(text=f"已导出 {total} 帧的原始日志: {os.path.basename(output_path)}")
+    
+    def clear_parse_cache(self):
+        """清空ASC解析缓存"""
+        if not messagebox.askyesno("确认", f"确定要清空解析缓存吗？\n缓存目录: {self.parse_cache.cache_dir}"):
+            return
+        removed = self.parse_cache.invalidate()
+        self.status_label.config(text=f"已清除 {removed} 个解析缓存")
+    
     def add_signal(self):
         """添加信号到列表"""
         if not self.messages:
@@ -792,23 +1217,25 @@ class MultiSignalChartViewer:
             name = self.signal_name_var.get() or f"信号{len(self.signal_configs)+1}"
             
             # 检查信号是否有效
-            test_messages = [msg for msg in self.messages if msg['can_id'] == can_id]
-            if not test_messages:
+            if not self.messages.has_id(can_id):
                 messagebox.showwarning("警告", f"没有找到CAN ID {can_id_str}的消息")
                 return
             
-            # 检查信号是否有效（根据字节序不同规则）
+            # 检查信号是否有效（根据字节序不同规则），范围取该ID的最大数据长度（CAN FD 最多64字节）
+            id_rows = self.messages.rows_for(can_id)
+            self.messages.ensure_payloads(id_rows)
+            max_bytes = max(8, int(self.messages.lengths[id_rows].max()))
             if endian == "big":
                 # 大端序：检查起始字节和长度
                 start_byte = start_bit // 8
                 num_bytes = (length + 7) // 8
-                if start_byte + num_bytes > 8:
+                if start_byte + num_bytes > max_bytes:
                     messagebox.showwarning("警告", f"大端序信号超出范围: 从byte{start_byte}开始需要{num_bytes}字节")
                     return
             else:
-                # 小端序：start_bit + length不能超过64
-                if start_bit + length > 64:
-                    messagebox.showwarning("警告", "小端序信号位置超出CAN数据范围(64位)")
+                # 小端序：start_bit + length不能超过数据位数
+                if start_bit + length > max_bytes * 8:
+                    messagebox.showwarning("警告", f"小端序信号位置超出CAN数据范围({max_bytes * 8}位)")
                     return
             
             # 添加信号配置
@@ -897,13 +1324,9 @@ class MultiSignalChartViewer:
         stats_window = tk.Toplevel(self.root)
         # 获取帧类型信息
         frame_type = "未知"
-        for msg in self.messages:
-            if msg['can_id'] == can_id:
-                if 'is_extended' in msg:
-                    frame_type = "扩展帧" if msg['is_extended'] else "标准帧"
-                else:
-                    frame_type = "扩展帧" if can_id > 0x7FF else "标准帧"
-                break
+        id_rows = self.messages.rows_for(can_id)
+        if len(id_rows):
+            frame_type = "扩展帧" if self.messages.is_extended[id_rows[0]] else "标准帧"
         
         stats_window.title(f"信号统计 - {config['name']} (0x{can_id:X})")
         stats_window.geometry("400x300")
@@ -964,83 +1387,68 @@ class MultiSignalChartViewer:
         self.canvas.draw()
         self.status_label.config(text="已清除所有信号")
     
+    def extract_signal_series(self, messages, config):
+        """对一组消息整列解码信号值，返回 (时间戳数组, 物理值数组)，跳过数据长度不足以覆盖信号的帧"""
+        return self.extract_message_series(messages, [config])[0]
+    
+    def extract_message_series(self, messages, configs):
+        """
+        对同一组消息一次解码多个信号，返回与 configs 对应的 (时间戳数组, 物理值数组) 列表
+        
+        信号配置编译为解码计划，数据矩阵和时间戳只取一次，各信号共享转换好的 uint64 列；
+        每个信号跳过数据长度不足以覆盖它的帧，配置无效的信号返回空数组。
+        """
+        plans = []
+        for config in configs:
+            try:
+                plans.append(plan_from_config(config))
+            except ValueError as e:
+                print(f"⚠️ 信号 {config.get('name', '')} 配置无效: {e}")
+                plans.append(None)
+        
+        valid_plans = [plan for plan in plans if plan is not None]
+        decoded = iter(decode_signals(messages.payload_matrix(), messages.lengths, valid_plans)
+                       if valid_plans else [])
+        timestamps = np.asarray(messages.timestamps, dtype=np.float64)
+        
+        series = []
+        for plan in plans:
+            if plan is None:
+                series.append((np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)))
+                continue
+            valid, values = next(decoded)
+            if valid.all():
+                series.append((timestamps, values))
+            else:
+                series.append((timestamps[valid], values[valid]))
+        return series
+    
     def extract_signal_value(self, data_bytes, start_bit, length, factor=1.0, offset=0.0, signed=False, endian="big"):
         """
-        提取信号值 - 支持大端序(Motorola)和小端序(Intel)
+        提取单帧的信号值 - 支持大端序(Motorola)和小端序(Intel)，返回 (原始值, 物理值)
         
         DBC大端序(Motorola @0+): 
-            - start_bit指示MSB所在字节
-            - 信号跨字节时，按字节边界向后扩展
-            - 提取的字节按大端序组合
-            示例1: start_bit=4, length=2 → 从bit4开始，MSB=bit4, LSB=bit5
-            示例2: start_bit=15, length=16 → 从byte1开始，取byte1+byte2大端序组合
+            - start_bit 是 MSB 的位置（字节k的第b位编号为 8k+b）
+            - 信号从 MSB 向低位延伸，到字节的第0位后接下一字节的第7位
+            示例1: start_bit=4, length=2 → MSB=bit4, LSB=bit3
+            示例2: start_bit=15, length=16 → 取byte1+byte2大端序组合
+        
+        小端序(Intel @1+): start_bit是LSB位置，向高位/高字节延伸
         
-        小端序(Intel @1+): start_bit是LSB位置，位操作提取
+        批量解码请用 extract_signal_series（整列解码），数据不足或配置无效时返回 (None, None)
         """
         try:
-            total_bits = len(data_bytes) * 8
-            
-            if endian == "big":
-                # 大端序处理
-                # 对于跨字节信号：start_bit指示起始字节，按字节对齐提取
-                # 对于字节内信号：需要按位精确提取
-                
-                start_byte = start_bit // 8
-                start_bit_in_byte = start_bit % 8
-                
-                # 计算需要多少字节
-                # 从start_bit_in_byte开始，需要length位
-                bits_in_first_byte = start_bit_in_byte + 1  # 第一个字节能提供的位数
-                
-                if length <= bits_in_first_byte:
-                    # 信号在单字节内
-                    byte_val = data_bytes[start_byte]
-                    #从start_bit_in_byte位置开始，向后取length位
-                    # bit编号从高到低：start_bit_in_byte...0
-                    lsb_pos = start_bit_in_byte - length + 1
-                    raw_value = (byte_val >> lsb_pos) & ((1 << length) - 1)
-                else:
-                    # 信号跨多个字节：按字节对齐，直接提取
-                    num_bytes = (length + 7) // 8
-                    
-                    if start_byte + num_bytes > len(data_bytes):
-                        return None, None
-                    
-                    # 按大端序组合字节
-                    raw_value = 0
-                    for i in range(num_bytes):
-                        raw_value = (raw_value << 8) | data_bytes[start_byte + i]
-                    
-                    # 如果长度不是8的倍数，右移去掉多余位
-                    extra_bits = num_bytes * 8 - length
-                    if extra_bits > 0:
-                        raw_value = raw_value >> extra_bits
-                
-            else:
-                # 小端序：转为整数后位操作
-                data_int = 0
-                for i, byte in enumerate(data_bytes):
-                    data_int |= byte << (i * 8)
-                
-                # start_bit是LSB位置
-                mask = (1 << length) - 1
-                raw_value = (data_int >> start_bit) & mask
-            
-            # 有符号数处理
-            if signed and length < 32:
-                sign_bit = 1 << (length - 1)
-                if raw_value & sign_bit:
-                    raw_value -= 1 << length
-            
-            # 应用系数和偏移
-            if factor == 1.0 and offset == 0.0:
-                physical_value = float(raw_value)
-            else:
-                physical_value = raw_value * factor + offset
-            
-            return raw_value, physical_value
-            
-        except Exception as e:
+            plan = compile_plan(start_bit, length, endian == "little", signed, factor, offset)
+            payload = np.zeros((1, max(CANMessageTable.PAYLOAD_WIDTH, len(data_bytes))), dtype=np.uint8)
+            payload[0, :len(data_bytes)] = data_bytes
+            valid, raw = plan.decode_raw(payload, np.array([len(data_bytes)]))
+            if not valid[0]:
+                return None, None
+            raw_value = int(raw[0])
+            if plan.is_identity:
+                return raw_value, float(raw_value)
+            return raw_value, raw_value * plan.factor + plan.offset
+        except (ValueError, TypeError):
             return None, None
     
     def apply_time_range(self):
@@ -1063,8 +1471,7 @@ class MultiSignalChartViewer:
     def reset_time_range(self):
         """重置时间范围"""
         if self.messages:
-            min_time = min(msg['timestamp'] for msg in self.messages)
-            max_time = max(msg['timestamp'] for msg in self.messages)
+            min_time, max_time = self.messages.time_index().bounds()
             self.time_start_var.set(f"{min_time:.3f}")
             self.time_end_var.set(f"{max_time:.3f}")
             self.current_time_range = (min_time, max_time)
@@ -1517,6 +1924,11 @@ class MultiSignalChartViewer:
             self.clear_measurement()
             return
         
+        # 非测量模式下右键查看该时刻附近的原始日志
+        if event.button == 3 and event.inaxes and event.xdata is not None:
+            self.show_raw_trace(event.xdata)
+            return
+        
         # 处理子图x轴同步（原有逻辑）
         if not self.subplot_mode_active or not self.axes_list or len(self.axes_list) <= 1:
             return
@@ -1589,6 +2001,7 @@ class MultiSignalChartViewer:
             # 更新子图模式状态
             self.subplot_mode_active = subplot_mode
             self.axes_list = []
+            self.signal_lines = {}
             
             if subplot_mode and n_signals > 1:
                 # 创建多个子图，共享x轴
@@ -1616,55 +2029,29 @@ class MultiSignalChartViewer:
             total_points = 0
             all_timestamps = []
             
+            # 同一CAN ID的未缓存信号一次解码
+            configs_by_id = defaultdict(list)
+            for config in self.signal_configs:
+                if self.messages.has_id(config['can_id']):
+                    configs_by_id[config['can_id']].append(config)
+            for can_id, configs in configs_by_id.items():
+                self.get_message_series(can_id, configs)
+            
             for i, config in enumerate(self.signal_configs):
                 # 优化：使用缓存的信号数据
-                signal_cache_key = f"{config['can_id']}_{config['start_bit']}_{config['length']}_{config['endian']}"
-                
-                if signal_cache_key in self.signal_data_cache:
-                    timestamps, values = self.signal_data_cache[signal_cache_key]
-                else:
-                    # 过滤对应CAN ID的消息（优化：一次性过滤）
-                    filtered_messages = [msg for msg in self.messages if msg['can_id'] == config['can_id']]
-                    
-                    if not filtered_messages:
-                        continue
-                    
-                    # 优化：批量提取信号数据
-                    timestamps = []
-                    values = []
-                    
-                    for msg in filtered_messages:
-                        raw, physical = self.extract_signal_value(
-                            msg['data'], 
-                            config['start_bit'], 
-                            config['length'], 
-                            config['factor'], 
-                            config['offset'], 
-                            config['signed'],
-                            config['endian']
-                        )
-                        if physical is not None:
-                            timestamps.append(msg['timestamp'])
-                            values.append(physical)
-                    
-                    # 缓存信号数据
-                    self.signal_data_cache[signal_cache_key] = (timestamps, values)
+                if not self.messages.has_id(config['can_id']):
+                    continue
+                ts_buffer, value_buffer, time_index = self.get_signal_series(config)
+                timestamps, values = ts_buffer.view(), value_buffer.view()
                 
-                # 应用时间范围过滤（优化：使用列表推导式）
+                # 应用时间范围过滤（二分查找，时间戳有序时为视图）
                 if time_start is not None or time_end is not None:
-                    filtered_data = [
-                        (ts, val) for ts, val in zip(timestamps, values)
-                        if (time_start is None or ts >= time_start) and 
-                           (time_end is None or ts <= time_end)
-                    ]
-                    if filtered_data:
-                        plot_timestamps, plot_values = zip(*filtered_data)
-                    else:
-                        plot_timestamps, plot_values = [], []
+                    visible_rows = time_index.rows(time_start, time_end)
+                    plot_timestamps, plot_values = timestamps[visible_rows], values[visible_rows]
                 else:
                     plot_timestamps, plot_values = timestamps, values
                 
-                if plot_timestamps:
+                if len(plot_timestamps):
                     current_ax = axes[i if subplot_mode else 0]
                     
                     # 绘制正常数据曲线
@@ -1674,6 +2061,7 @@ class MultiSignalChartViewer:
                            marker='o', 
                            markersize=2,
                            label=f"{config['name']} (0x{config['can_id']:X})")
+                    self.signal_lines[i] = line[0]
                     
                     # 添加丢帧点显示（优化：只在需要时计算）
                     if self.show_dropped_frames_var.get():
@@ -1687,17 +2075,14 @@ class MultiSignalChartViewer:
                                 config['can_id'], period_seconds, use_cache=True)
                             
                             if dropped_times:
-                                # 优化：时间范围过滤
+                                # 时间范围过滤（丢帧位置按时间升序，二分查找切片）
                                 if time_start is not None or time_end is not None:
-                                    filtered_dropped_times = [
-                                        dt for dt in dropped_times
-                                        if (time_start is None or dt >= time_start) and 
-                                           (time_end is None or dt <= time_end)
-                                    ]
+                                    dropped_index = TimeIndex(dropped_times)
+                                    filtered_dropped_times = dropped_index.timestamps[dropped_index.rows(time_start, time_end)]
                                 else:
                                     filtered_dropped_times = dropped_times
                                 
-                                if filtered_dropped_times:
+                                if len(filtered_dropped_times):
                                     # 优化：批量插值计算
                                     interpolated_values = self.interpolate_signal_at_dropped_frames(
                                         timestamps, values, filtered_dropped_times)
@@ -1719,7 +2104,7 @@ class MultiSignalChartViewer:
                                                          label=f'丢帧点(约{len(filtered_dropped_times)}个)')
                     
                     total_points += len(plot_timestamps)
-                    all_timestamps.extend(plot_timestamps)
+                    all_timestamps.append(plot_timestamps)
                     
                     # 子图模式下的标题和标签
                     if subplot_mode:
@@ -1733,16 +2118,16 @@ class MultiSignalChartViewer:
                             current_ax.set_xticklabels([])
                         
                         # 添加统计信息到标题
-                        if values:
-                            min_val = min(values)
-                            max_val = max(values)
-                            avg_val = sum(values) / len(values)
+                        if len(values):
+                            min_val = float(values.min())
+                            max_val = float(values.max())
+                            avg_val = float(values.sum()) / len(values)
                             current_ax.text(0.02, 0.98, f'范围: {min_val:.2f}~{max_val:.2f}, 均值: {avg_val:.2f}',
                                           transform=current_ax.transAxes, fontsize=8, verticalalignment='top',
                                           bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8))
                     
                     total_points += len(timestamps)
-                    all_timestamps.extend(timestamps)
+                    all_timestamps.append(timestamps)
                     
                     # 网格
                     if self.show_grid_var.get():
@@ -1766,8 +2151,8 @@ class MultiSignalChartViewer:
                 if time_start is not None and time_end is not None:
                     min_time, max_time = time_start, time_end
                 else:
-                    min_time = min(all_timestamps)
-                    max_time = max(all_timestamps)
+                    min_time = min(float(ts.min()) for ts in all_timestamps if len(ts))
+                    max_time = max(float(ts.max()) for ts in all_timestamps if len(ts))
                 
                 # 同步所有子图的x轴
                 for ax in self.axes_list:
@@ -1829,6 +2214,8 @@ class MultiSignalChartViewer:
 
 def main():
     """主函数"""
+    # 打包为exe后多进程解析需要
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = MultiSignalChartViewer(root)
     
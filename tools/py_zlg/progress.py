@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+长时间操作的进度报告与协作式取消
+
+耗时操作（解析ASC/DBC、格式转换、文件分割）接受一个可选的 ProgressReporter：
+- 操作定期调用 update()/advance() 报告已处理的字节数和帧数，
+  两次调用之间的工作量保持在几十毫秒以内；
+- 每次调用都检查 CancelToken，已取消时抛出 OperationCancelled，
+  操作在下一个检查点停止（GUI 点击停止后 100ms 内生效）；
+- 距上次回调超过 interval 时调用 callback(ProgressInfo)，回调在工作线程中执行，
+  GUI 需自行切回主线程（Tk 用 after 轮询，Qt 用信号）。
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+# 进度回调的最小间隔（秒）
+PROGRESS_INTERVAL = 0.1
+
+# 逐行处理的操作每处理这么多行报告一次进度（约几毫秒的工作量）
+PROGRESS_LINES = 8192
+
+
+class OperationCancelled(Exception):
+    """操作已被取消"""
+
+
+class CancelToken:
+    """取消令牌（线程安全，GUI线程调用 cancel，工作线程检查）"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled("操作已取消")
+
+
+class ProgressInfo:
+    """某一时刻的进度快照"""
+
+    __slots__ = ('stage', 'done_bytes', 'total_bytes', 'count', 'unit', 'elapsed')
+
+    def __init__(self, stage: str, done_bytes: int, total_bytes: Optional[int],
+                 count: int, unit: str, elapsed: float):
+        self.stage = stage
+        self.done_bytes = done_bytes
+        self.total_bytes = total_bytes
+        self.count = count
+        self.unit = unit
+        self.elapsed = elapsed
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """完成比例 0~1，总量未知时为 None"""
+        if not self.total_bytes:
+            return None
+        return min(1.0, self.done_bytes / self.total_bytes)
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.done_bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def count_per_second(self) -> float:
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """按当前平均速度估算的剩余时间，无法估算时为 None"""
+        if not self.total_bytes or self.done_bytes <= 0:
+            return None
+        return max(0.0, (self.total_bytes - self.done_bytes) / self.bytes_per_second)
+
+    def format(self) -> str:
+        """进度文本，例如: 解析 45.2% | 120.5 MB/s | 1,234,567 帧/s | 剩余 12s"""
+        parts = []
+        fraction = self.fraction
+        head = self.stage
+        if fraction is not None:
+            head = f"{head} {fraction * 100:.1f}%".strip()
+        if head:
+            parts.append(head)
+        parts.append(f"{self.bytes_per_second / (1024 * 1024):.1f} MB/s")
+        if self.count:
+            parts.append(f"{self.count_per_second:,.0f} {self.unit}/s")
+        eta = self.eta_seconds
+        if eta is not None:
+            parts.append(f"剩余 {eta:.0f}s")
+        return " | ".join(parts)
+
+
+class ProgressReporter:
+    """
+    进度报告器
+
+    Args:
+        callback: 进度回调 callback(ProgressInfo)，None 表示只用于取消
+        cancel_token: 取消令牌
+        unit: 计数单位（帧/行/条消息）
+        interval: 回调的最小间隔（秒）
+    """
+
+    def __init__(self, callback: Optional[Callable[[ProgressInfo], None]] = None,
+                 cancel_token: Optional[CancelToken] = None, unit: str = '帧',
+                 interval: float = PROGRESS_INTERVAL):
+        self.callback = callback
+        self.cancel_token = cancel_token
+        self.unit = unit
+        self.interval = interval
+        self.stage = ''
+        self.total_bytes: Optional[int] = None
+        self.done_bytes = 0
+        self.count = 0
+        self._start_time = time.perf_counter()
+        self._last_report = 0.0
+
+    def start(self, total_bytes: Optional[int] = None, stage: str = ''):
+        """开始一个阶段（重新计时，总量未知时为 None）"""
+        self.check()
+        self.stage = stage
+        self.total_bytes = total_bytes
+        self.done_bytes = 0
+        self.count = 0
+        self._start_time = time.perf_counter()
+        self._last_report = 0.0
+        self._report(force=True)
+
+    def update(self, done_bytes: int, count: Optional[int] = None):
+        """报告累计处理量（检查取消，按间隔回调）"""
+        self.check()
+        self.done_bytes = done_bytes
+        if count is not None:
+            self.count = count
+        self._report()
+
+    def advance(self, nbytes: int, count: int = 0):
+        """报告增量处理量"""
+        self.update(self.done_bytes + nbytes, self.count + count)
+
+    def finish(self):
+        """阶段结束（总量已知时补满进度并立即回调）"""
+        if self.total_bytes:
+            self.done_bytes = max(self.done_bytes, self.total_bytes)
+        self._report(force=True)
+
+    def check(self):
+        """检查取消，已取消时抛出 OperationCancelled"""
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
+    @property
+    def info(self) -> ProgressInfo:
+        return ProgressInfo(self.stage, self.done_bytes, self.total_bytes, self.count, self.unit,
+                            time.perf_counter() - self._start_time)
+
+    def _report(self, force: bool = False):
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        if force or now - self._last_report >= self.interval:
+            self._last_report = now
+            self.callback(self.info)
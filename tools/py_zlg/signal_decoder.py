@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+向量化信号解码
+每个信号（DBC信号或手动配置的信号）编译为一个解码计划：占用的字节范围、LSB所在位置、
+掩码、字节序、符号扩展、系数和偏移。解码时把 N×W 数据矩阵中覆盖信号的8个字节
+一次性视为 uint64 列（Intel 按小端、Motorola 按大端字节交换），移位、掩码、
+符号扩展和换算都是整列运算，百万帧的信号解码在毫秒级完成。
+同一消息的多个信号用 decode_signals 一次解码，各信号共享转换好的 uint64 列。
+
+位编号与DBC一致：
+    Intel(@1): start_bit 为 LSB，字节 k 的第 b 位编号为 8k+b，向高字节延伸
+    Motorola(@0): start_bit 为 MSB，同样按 8k+b 编号，信号从 MSB 向低位延伸，
+        到字节的第0位后接下一字节的第7位
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 单个信号的最大长度（位）
+MAX_SIGNAL_LENGTH = 64
+
+
+class SignalDecodePlan(NamedTuple):
+    """信号解码计划（不可变，可直接序列化）"""
+    start_bit: int
+    length: int
+    little_endian: bool
+    signed: bool
+    factor: float
+    offset: float
+    first_byte: int   # 信号占用的第一个字节
+    last_byte: int    # 信号占用的最后一个字节
+    lsb_byte: int     # LSB所在字节
+    lsb_bit: int      # LSB在该字节中的位（0为最低位）
+    mask: int
+
+    @property
+    def required_length(self) -> int:
+        """帧数据至少需要的字节数"""
+        return self.last_byte + 1
+
+    @property
+    def is_identity(self) -> bool:
+        """物理值等于原始值（系数1、偏移0）"""
+        return self.factor == 1.0 and self.offset == 0.0
+
+    @property
+    def raw_dtype(self) -> np.dtype:
+        """能容纳原始值的最小整数类型"""
+        bits = next(size for size in (8, 16, 32, 64) if self.length <= size)
+        return np.dtype(f"{'i' if self.signed else 'u'}{bits // 8}")
+
+    def decode_raw(self, payload: np.ndarray, lengths: np.ndarray = None,
+                   shared: Optional[Dict[tuple, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        解码原始值
+
+        Args:
+            payload: N×W 的 uint8 数据矩阵（W不小于8，不足部分补0）
+            lengths: 每帧的实际数据长度，None 表示都完整
+            shared: 同一矩阵上解码多个信号时共享的中间结果（uint64 列、有效帧掩码），
+                由 decode_signals 传入
+
+        Returns:
+            (有效帧掩码, 原始值)：原始值为 int64（有符号）或 uint64（无符号）；
+            数据长度不足以覆盖信号的帧在掩码中为 False，其原始值无意义
+        """
+        count, width = payload.shape
+        if self.last_byte >= width:
+            return np.zeros(count, dtype=bool), np.zeros(count, dtype=np.int64 if self.signed else np.uint64)
+        valid = _shared(shared, ('valid', self.required_length),
+                        lambda: np.ones(count, dtype=bool) if lengths is None else lengths >= self.required_length)
+
+        span = self.last_byte - self.first_byte + 1
+        if span <= 8:
+            # 取包含整个信号的8字节窗口（不越过矩阵右边界）
+            window_start = max(0, min(self.first_byte, width - 8))
+            extra_byte = None
+        elif self.little_endian:
+            # 9字节的信号：窗口从第一个字节开始，最高的几位来自最后一个字节
+            window_start, extra_byte = self.first_byte, self.last_byte
+        else:
+            window_start, extra_byte = self.last_byte - 7, self.first_byte
+
+        words = _shared(shared, ('words', window_start, self.little_endian),
+                        lambda: _window_words(payload, window_start, self.little_endian))
+        if self.little_endian:
+            shift = (self.lsb_byte - window_start) * 8 + self.lsb_bit
+        else:
+            shift = (7 - (self.lsb_byte - window_start)) * 8 + self.lsb_bit
+
+        raw = words >> np.uint64(shift) if shift else words.copy()
+        if extra_byte is not None:
+            raw |= payload[:, extra_byte].astype(np.uint64) << np.uint64(64 - shift)
+        raw &= np.uint64(self.mask)
+
+        if self.signed:
+            # 把符号位移到最高位，再算术右移完成符号扩展
+            unused = np.uint64(MAX_SIGNAL_LENGTH - self.length)
+            raw = (raw << unused).view(np.int64) >> np.int64(unused)
+        return valid, raw
+
+    def decode(self, payload: np.ndarray, lengths: np.ndarray = None,
+               shared: Optional[Dict[tuple, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """解码物理值，返回 (有效帧掩码, float64 物理值)"""
+        valid, raw = self.decode_raw(payload, lengths, shared)
+        physical = raw.astype(np.float64)
+        if not self.is_identity:
+            physical *= self.factor
+            physical += self.offset
+        return valid, physical
+
+
+def _shared(shared: Optional[Dict[tuple, np.ndarray]], key: tuple, compute) -> np.ndarray:
+    """取共享的中间结果，没有时计算并登记（调用方不得原地修改）"""
+    if shared is None:
+        return compute()
+    value = shared.get(key)
+    if value is None:
+        value = shared[key] = compute()
+    return value
+
+
+def _window_words(payload: np.ndarray, window_start: int, little_endian: bool) -> np.ndarray:
+    """数据矩阵中从 window_start 开始的8个字节按字节序组成的 uint64 列（超出右边界的部分补0）"""
+    window = np.ascontiguousarray(payload[:, window_start:window_start + 8])
+    if window.shape[1] < 8:
+        window = np.pad(window, ((0, 0), (0, 8 - window.shape[1])))
+    return window.view('<u8' if little_endian else '>u8').ravel().astype(np.uint64, copy=False)
+
+
+def decode_signals(payload: np.ndarray, lengths: Optional[np.ndarray], plans: Sequence[SignalDecodePlan],
+                   raw: bool = False) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    在同一组帧上一次解码多个信号（通常是同一消息的全部信号）
+
+    覆盖信号的8字节窗口按 (起始字节, 字节序) 只转换一次，有效帧掩码按所需长度只计算一次，
+    各信号只做各自的移位、掩码和换算。
+
+    Args:
+        payload: N×W 的 uint8 数据矩阵
+        lengths: 每帧的实际数据长度，None 表示都完整
+        plans: 解码计划
+        raw: True 时返回原始值（按 raw_dtype 收窄的整数列），否则返回 float64 物理值
+
+    Returns:
+        与 plans 一一对应的 (有效帧掩码, 值) 列表
+    """
+    shared = {}
+    if raw:
+        results = []
+        for plan in plans:
+            valid, values = plan.decode_raw(payload, lengths, shared)
+            results.append((valid, values.astype(plan.raw_dtype)))
+        return results
+    return [plan.decode(payload, lengths, shared) for plan in plans]
+
+
+def compile_plan(start_bit: int, length: int, little_endian: bool, signed: bool = False,
+                 factor: float = 1.0, offset: float = 0.0) -> SignalDecodePlan:
+    """
+    编译解码计划
+
+    Args:
+        start_bit: 起始位（Intel为LSB，Motorola为MSB，DBC编号）
+        length: 长度（1-64位）
+        little_endian: True 为 Intel(@1)，False 为 Motorola(@0)
+
+    Raises:
+        ValueError: 长度或起始位无效
+    """
+    if not 1 <= length <= MAX_SIGNAL_LENGTH:
+        raise ValueError(f"信号长度必须在1-{MAX_SIGNAL_LENGTH}之间: {length}")
+    if start_bit < 0:
+        raise ValueError(f"起始位不能为负: {start_bit}")
+
+    if little_endian:
+        first_byte = lsb_byte = start_bit // 8
+        lsb_bit = start_bit % 8
+        last_byte = (start_bit + length - 1) // 8
+    else:
+        # 按“字节内从高位到低位、字节间从前到后”的顺序编号，MSB之后的 length-1 位是LSB
+        msb_index = (start_bit // 8) * 8 + 7 - start_bit % 8
+        lsb_index = msb_index + length - 1
+        first_byte = start_bit // 8
+        last_byte = lsb_byte = lsb_index // 8
+        lsb_bit = 7 - lsb_index % 8
+
+    return SignalDecodePlan(start_bit, length, little_endian, signed, float(factor), float(offset),
+                            first_byte, last_byte, lsb_byte, lsb_bit, (1 << length) - 1)
+
+
+def plan_from_config(config: Dict[str, Any]) -> SignalDecodePlan:
+    """由查看器的信号配置（start_bit/length/factor/offset/signed/endian）编译解码计划"""
+    return compile_plan(int(config['start_bit']), int(config['length']), config.get('endian') == 'little',
+                        bool(config.get('signed', False)), config.get('factor', 1.0), config.get('offset', 0.0))
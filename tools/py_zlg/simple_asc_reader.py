@@ -2,104 +2,747 @@
 # -*- coding: utf-8 -*-
 """
 简单的ASC文件读取器
-适用于不同格式的ASC文件
+适用于不同格式的ASC文件（经典CAN帧和CAN FD帧），支持直接读取 gzip/xz/zstd 压缩的ASC文件
 """
 
 import re
 import os
+import mmap
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from can_message_table import (CANMessageTable, CANMessageTableBuilder, FLAG_EXTENDED, FLAG_TX,
+                               FLAG_FD, FLAG_BRS, FLAG_ESI, HEX_NIBBLES, WHITESPACE, parse_hex_tokens)
+from encoding_detector import detect_encoding, decode_line
+from compressed_io import detect_compression, open_compressed
+from can_table_export import DEFAULT_COMPRESSION, DEFAULT_ROW_GROUP_SIZE, export_messages
+from progress import PROGRESS_INTERVAL, PROGRESS_LINES, ProgressReporter
+from asc_line_index import LineOffsetIndex
+
+# 流式读取时每个批次的默认帧数
+DEFAULT_CHUNK_SIZE = 65536
+
+# 并行解析：小于该大小的文件直接单进程解析（进程启动开销大于收益）
+PARALLEL_MIN_FILE_SIZE = 8 * 1024 * 1024
+# 并行解析：每个进程分到的字节范围数（分块更细，负载更均衡）
+PARALLEL_RANGES_PER_WORKER = 4
+
+# 实时跟踪：read_appended 单次最多处理的字节数
+FOLLOW_MAX_BYTES = 32 * 1024 * 1024
+
+# 延迟解码：向量化扫描的块大小（按换行对齐）
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+# 报告进度时的扫描块大小（每块几十毫秒，保证及时响应取消）
+PROGRESS_SCAN_BLOCK_SIZE = 4 * 1024 * 1024
+
+# 解析结果记录: (timestamp, channel, can_id, flags, dlc, payload)
+MessageRecord = Tuple[float, int, int, int, int, bytes]
+
+_HEX_DIGITS = b'0123456789abcdefABCDEF'
+
+
+# 方向字段（大小写不敏感）到标志位的映射
+_DIRECTION_FLAGS = {d: (FLAG_TX if d[:1] in b'Tt' else 0)
+                    for d in (b'Rx', b'RX', b'rx', b'rX', b'Tx', b'TX', b'tx', b'tX')}
+
+# 文件头信息行前缀 -> file_info 键
+_HEADER_PREFIXES = ((b'date', 'date'), (b'base', 'base'), (b'// version', 'version'))
+
+# 字节值查找表（向量化扫描用）
+_IS_DIGIT = np.zeros(256, dtype=bool)
+_IS_DIGIT[list(b'0123456789')] = True
+_IS_HEADER_START = np.zeros(256, dtype=bool)
+_IS_HEADER_START[[prefix[0] for prefix, _ in _HEADER_PREFIXES]] = True
+
+# 格式1: 时间戳 通道 CAN_ID Rx/Tx d DLC 数据字节
+# 例: 0.000000 1  123             Rx   d 8 01 02 03 04 05 06 07 08
+# 扩展帧例: 0.000000 1  18FEF100x        Rx   d 8 01 02 03 04 05 06 07 08
+_PATTERN_FORMAT1 = re.compile(r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]+)x?\s+(Rx|Tx)\s+d\s+(\d+)\s+(.*)$', re.IGNORECASE)
+
+# 格式2: 时间戳 通道 CAN_ID Rx/Tx DLC 数据字节
+# 例: 0.100000 1 123 Rx 8 AA BB CC DD EE FF 00 11
+# 扩展帧例: 0.100000 1 18FEF100x Rx 8 AA BB CC DD EE FF 00 11
+_PATTERN_FORMAT2 = re.compile(r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]+)x?\s+(Rx|Tx)\s+(\d+)\s+(.*)$', re.IGNORECASE)
+
+# CAN FD: 时间戳 CANFD 通道 Rx/Tx CAN_ID [符号名] BRS ESI DLC 数据长度 数据字节 [附加字段...]
+# 例: 0.200000 CANFD 1 Rx 18FEF100x  1 0 9 12 00 11 22 33 44 55 66 77 88 99 AA BB 130000 272
+# DLC 为十六进制编码(0~F)，数据长度为十进制字节数(最多64)
+
+# 格式3: CANoe格式 - 扩展帧有特殊标记
+# 例: 0.000000 1  18FEF100         Rx   d 8 01 02 03 04 05 06 07 08
+_PATTERN_FORMAT3 = re.compile(r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]{8})\s+(Rx|Tx)\s+d\s+(\d+)\s+(.*)$', re.IGNORECASE)
 
 class SimpleASCReader:
     """简单的ASC文件读取器"""
     
     def __init__(self):
-        self.messages = []
+        self.messages = CANMessageTable()
         self.file_info = {}
+        self.encoding = 'utf-8'
+        # 实时跟踪：当前文件和已解析到的字节位置
+        self.file_path = None
+        self.file_offset = 0
+        # 当前文件的压缩格式（None 表示未压缩）
+        self.compression = None
+        # self.messages 的统计累加器（首次 get_statistics 时创建，read_appended 增量更新）
+        self._statistics: Optional['MessageStatistics'] = None
+        # 当前文件的行偏移索引（首次按行号取原始文本时构建）
+        self._line_index: Optional[LineOffsetIndex] = None
+        # 读取时的帧过滤条件（read_appended 沿用）
+        self.message_filter: Optional['MessageFilter'] = None
     
-    def read_file(self, file_path: str) -> List[Dict[str, Any]]:
+    def read_file(self, file_path: str, workers: int = 1,
+                  complete_lines_only: bool = False, lazy_payload: bool = False,
+                  progress: Optional[ProgressReporter] = None,
+                  ids: Optional[Iterable[int]] = None, channels: Optional[Iterable[int]] = None,
+                  time_range: Optional[Tuple[Optional[float], Optional[float]]] = None) -> CANMessageTable:
         """
         读取ASC文件
         
         Args:
             file_path: ASC文件路径
+            workers: 并行解析的进程数，大于1时按字节范围分块多进程解析
+                （压缩文件无法按字节范围切分，总是单进程流式解析）
+            complete_lines_only: 只解析以换行结尾的完整行（文件仍在写入时，
+                末尾未写完的行留给 read_appended）
+            lazy_payload: 延迟解码数据字段，解析时只记录时间戳、ID、DLC和数据字段的字节位置，
+                数据在按ID选择时才批量解码（见 CANMessageTable.ensure_payloads）
+            progress: 进度报告器（已处理字节数、帧数；取消时抛出 OperationCancelled，
+                self.messages 保持不变）
+            ids: 只保留这些CAN ID的帧（None 表示不限）
+            channels: 只保留这些通道的帧
+            time_range: 只保留时间范围 (start, end) 内的帧，任一端为 None 表示不限
+                （过滤条件下推到分词阶段，不符合的行不解码数据，见 MessageFilter）
             
         Returns:
-            消息列表
+            列式消息表（迭代/下标访问时兼容旧版消息字典）
+        """
+        print(f"📁 读取文件: {file_path}")
+        message_filter = MessageFilter.create(ids, channels, time_range)
+        
+        if (workers > 1 and os.path.exists(file_path) and os.path.getsize(file_path) >= PARALLEL_MIN_FILE_SIZE
+                and not detect_compression(file_path)):
+            self.messages = self._read_file_parallel(file_path, workers, complete_lines_only, lazy_payload,
+                                                     progress, message_filter)
+        else:
+            # 整个文件作为一个批次解析
+            self.messages = CANMessageTable.concat(list(
+                self.iter_messages(file_path, chunk_size=None, complete_lines_only=complete_lines_only,
+                                   lazy_payload=lazy_payload, progress=progress, ids=ids, channels=channels,
+                                   time_range=time_range)))
+        
+        # 解析完成时构建 (CAN ID, 通道) 行索引，后续按ID查询只访问该ID的帧
+        self.messages.build_index()
+        
+        print(f"📊 文件行数: {self.file_info.get('line_count', 0)}")
+        print(f"✅ 解析完成: {len(self.messages)} 条CAN消息")
+        return self.messages
+    
+    def iter_messages(self, file_path: str,
+                      chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+                      complete_lines_only: bool = False,
+                      lazy_payload: bool = False,
+                      progress: Optional[ProgressReporter] = None,
+                      ids: Optional[Iterable[int]] = None, channels: Optional[Iterable[int]] = None,
+                      time_range: Optional[Tuple[Optional[float], Optional[float]]] = None
+                      ) -> Iterator[CANMessageTable]:
+        """
+        流式读取ASC文件
+        
+        以内存映射方式按字节逐行扫描，每积累 chunk_size 帧输出一个列式批次，
+        内存占用与文件大小无关。文件头信息写入 self.file_info，
+        解析到的字节位置写入 file_info['parsed_bytes']（供 read_appended 继续）。
+        
+        gzip/xz/zstd 压缩文件按魔数识别，由后台线程解压后流式解析（不解压到磁盘）；
+        压缩文件视为已写完的归档，complete_lines_only 不起作用。
+        
+        Args:
+            file_path: ASC文件路径
+            chunk_size: 每批帧数，None 表示整个文件一个批次
+            complete_lines_only: 只解析以换行结尾的完整行
+            lazy_payload: 延迟解码数据字段，按块向量化扫描，批次大小由块大小决定
+                （压缩文件无法随机访问，总是立即解码）
+            progress: 进度报告器（压缩文件按解压后的字节数报告，总量未知）
+            ids, channels, time_range: 帧过滤条件（同 read_file），条件记录在 file_info['filter']
+            
+        Yields:
+            列式消息表批次
         """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"文件不存在: {file_path}")
         
-        print(f"📁 读取文件: {file_path}")
+        # 检测编码（只采样文件头/中/尾，只有文件头行和少数回退行需要解码）
+        self.encoding = detect_encoding(file_path)
+        print(f"🔤 检测编码: {self.encoding}")
         
-        # 检测编码
-        encoding = self._detect_encoding(file_path)
-        print(f"🔤 检测编码: {encoding}")
+        self.file_info = {}
+        self.file_path = file_path
+        self.file_offset = 0
+        self.compression = None
+        self._statistics = None
+        self._line_index = None
+        self.message_filter = message_filter = MessageFilter.create(ids, channels, time_range)
+        if message_filter:
+            self.file_info['filter'] = message_filter.describe()
+        file_size = os.path.getsize(file_path)
+        if file_size == 0:
+            self.file_info['line_count'] = 0
+            self.file_info['parsed_bytes'] = 0
+            return
         
-        # 读取文件
-        with open(file_path, 'r', encoding=encoding) as f:
-            lines = f.readlines()
+        self.compression = detect_compression(file_path)
+        if self.compression:
+            print(f"🗜️ 压缩格式: {self.compression}（后台线程解压）")
+            self.file_info['compression'] = self.compression
+            if progress:
+                progress.start(None, '解析')
+            with open_compressed(file_path, 'rb', self.compression) as stream:
+                yield from self._iter_lines(stream, 0, None, chunk_size, progress=progress,
+                                            message_filter=message_filter)
+            # 压缩文件不支持跟踪追加内容，记录为已读到压缩文件末尾
+            self.file_offset = self.file_info['parsed_bytes'] = file_size
+            if progress:
+                progress.finish()
+            return
         
-        print(f"📊 文件行数: {len(lines)}")
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = mm.rfind(b'\n') + 1 if complete_lines_only else len(mm)
+            if progress:
+                progress.start(end, '解析')
+            if lazy_payload:
+                yield from self._scan_deferred(mm, 0, end, 1, (os.path.abspath(file_path), self.encoding), progress,
+                                               message_filter)
+            else:
+                yield from self._iter_lines(mm, 0, end, chunk_size, progress=progress,
+                                            message_filter=message_filter)
+        self.file_offset = self.file_info['parsed_bytes'] = end
+        if progress:
+            progress.finish()
+    
+    def attach(self, file_path: str, messages: CANMessageTable, file_info: Dict[str, Any]):
+        """
+        接管已加载的消息表（如来自解析缓存），之后可用 read_appended 跟踪文件新追加的内容
         
-        # 解析文件
-        self.messages = []
-        self.file_info = {}
+        file_info 须含 read_file/iter_messages 记录的 line_count 和 parsed_bytes。
+        """
+        self.file_path = file_path
+        self.messages = messages
+        self.file_info = dict(file_info)
+        self.file_offset = self.file_info.get('parsed_bytes', 0)
+        self.compression = self.file_info.get('compression')
+        self.encoding = detect_encoding(file_path)
+        self._statistics = None
+        self._line_index = None
+        self.message_filter = MessageFilter.create(**self.file_info['filter']) if self.file_info.get('filter') else None
+    
+    def read_appended(self, max_bytes: Optional[int] = FOLLOW_MAX_BYTES) -> Optional[CANMessageTable]:
+        """
+        解析文件自上次读取以来新追加的完整行（实时跟踪正在写入的文件）
+        
+        新消息追加到 self.messages（行索引、时间索引增量更新），开销与新数据量成正比。
         
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
+        Args:
+            max_bytes: 单次最多处理的字节数（积压较多时分多次处理，保持界面响应），None 不限
             
-            # 解析文件头信息
-            if line.startswith('date'):
-                self.file_info['date'] = line
-            elif line.startswith('base'):
-                self.file_info['base'] = line
-            elif line.startswith('// version'):
-                self.file_info['version'] = line
+        Returns:
+            新解析的消息批次（可能为空）；文件变短（被截断或替换）时返回 None，需要重新加载；
+            压缩文件不支持跟踪，总是返回空批次
+        """
+        if self.compression:
+            return CANMessageTable()
+        
+        size = os.path.getsize(self.file_path)
+        if size < self.file_offset:
+            return None
+        
+        end = size if max_bytes is None else min(size, self.file_offset + max_bytes)
+        if end <= self.file_offset:
+            return CANMessageTable()
+        
+        with open(self.file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # 只处理完整行；限制字节数后一行都不完整时放宽到下一个换行
+            end = mm.rfind(b'\n', self.file_offset, end) + 1 or mm.find(b'\n', end) + 1
+            if end <= self.file_offset:
+                return CANMessageTable()
+            first_line = self.file_info.get('line_count', 0) + 1
+            batch = CANMessageTable.concat(list(self._iter_lines(mm, self.file_offset, end, None, first_line,
+                                                                 message_filter=self.message_filter)))
+        
+        self.file_offset = self.file_info['parsed_bytes'] = end
+        self.messages.extend(batch)
+        if self._statistics is not None:
+            self._statistics.update(batch)
+        return batch
+    
+    def _iter_lines(self, stream, start: int, end: Optional[int],
+                    chunk_size: Optional[int], first_line: int = 1,
+                    progress: Optional[ProgressReporter] = None,
+                    message_filter: Optional['MessageFilter'] = None) -> Iterator[CANMessageTable]:
+        """
+        扫描字节流中 [start, end) 字节范围内的行（start 须为行首）
+        
+        stream 为内存映射文件或解压流（任何带 readline 的字节流），end 为 None 时读到流末尾；
+        数据行直接在字节上分词解析，只有文件头行才解码为字符串；
+        start 处的行号为 first_line，最后一行的行号写入 file_info['line_count']；
+        给出 progress 时每 PROGRESS_LINES 行报告一次字节位置和帧数；
+        给出 message_filter 时先按时间戳/通道/ID字段预筛选，不符合的行不完整解析。
+        """
+        builder = CANMessageTableBuilder()
+        parse = self._parse_can_message
+        append = builder.append
+        accept_line = message_filter.accepts_line if message_filter else None
+        readline = stream.readline
+        
+        if start:
+            stream.seek(start)
+        if end is None:
+            end = float('inf')
+        position = start
+        line_num = first_line - 1
+        emitted = unparsed = 0
+        next_report = line_num + PROGRESS_LINES if progress else float('inf')
+        while position < end:
+            raw = readline()
+            if not raw:
+                break
+            position += len(raw)
+            line_num += 1
+            if line_num >= next_report:
+                progress.update(position, emitted + len(builder))
+                next_report = line_num + PROGRESS_LINES
+            line = raw.strip()
+            
+            # 数据行必须以时间戳开头，其余行检查文件头信息
+            if not line[:1].isdigit():
+                self._parse_header_line(line)
+                continue
+            
+            if accept_line is not None and not accept_line(line):
+                continue
             
             # 解析CAN消息
-            message = self._parse_can_message(line, line_num)
-            if message:
-                self.messages.append(message)
+            record = parse(line, line_num)
+            if record:
+                if accept_line is not None and not message_filter.accepts(record[0], record[1], record[2]):
+                    continue
+                append(*record, line_num)
+                if chunk_size and len(builder) >= chunk_size:
+                    emitted += len(builder)
+                    yield builder.build()
+            else:
+                unparsed += 1
         
-        print(f"✅ 解析完成: {len(self.messages)} 条CAN消息")
-        return self.messages
+        self.file_info['line_count'] = line_num
+        self._count_unparsed(unparsed)
+        if progress:
+            progress.update(position, emitted + len(builder))
+        if len(builder):
+            yield builder.build()
+    
+    def _scan_deferred(self, mm: mmap.mmap, start: int, end: int, first_line: int,
+                       payload_source: Tuple[str, str],
+                       progress: Optional[ProgressReporter] = None,
+                       message_filter: Optional['MessageFilter'] = None) -> Iterator[CANMessageTable]:
+        """
+        延迟解码模式：按块向量化扫描 [start, end) 字节范围（start 须为行首）
+        
+        每块按换行对齐，块内所有行一次性分词、校验并转换时间戳/通道/ID/方向/DLC，
+        数据字段只记录字节位置；不符合标准格式的行逐行交给 _parse_can_message。
+        给出 progress 时改用较小的块，每块报告一次进度。
+        """
+        block_size = PROGRESS_SCAN_BLOCK_SIZE if progress else SCAN_BLOCK_SIZE
+        line_num = first_line - 1
+        position = start
+        frames = 0
+        while position < end:
+            block_end = min(end, position + block_size)
+            if block_end < end:
+                # 块尾对齐到换行（单行超过块大小时延伸到该行结尾）
+                newline = mm.rfind(b'\n', position, block_end)
+                block_end = newline + 1 if newline >= 0 else (mm.find(b'\n', block_end, end) + 1 or end)
+            block = np.frombuffer(mm[position:block_end], dtype=np.uint8)
+            table, line_count = self._scan_block(block, position, line_num + 1, payload_source, message_filter)
+            line_num += line_count
+            position = block_end
+            frames += len(table)
+            if progress:
+                progress.update(position, frames)
+            if len(table):
+                yield table
+        self.file_info['line_count'] = line_num
     
-    def _detect_encoding(self, file_path: str) -> str:
-        """检测文件编码"""
-        encodings = ['utf-8', 'gbk', 'ascii', 'latin1']
+    def _scan_block(self, block: np.ndarray, base: int, first_line: int,
+                    payload_source: Tuple[str, str],
+                    message_filter: Optional['MessageFilter'] = None) -> Tuple[CANMessageTable, int]:
+        """
+        向量化解析一块完整的行
+        
+        按空白切分出所有字段的起止位置，数据行取前7个字段，
+        与快速路径相同的校验全部通过的行直接转换为列；
+        其余以数字开头的行逐行解析，文件头行逐行检查。
+        
+        Args:
+            block: 块内容（uint8）
+            base: 块在文件中的字节位置
+            first_line: 块首行的行号
+            payload_source: (源文件路径, 编码)
+            message_filter: 帧过滤条件（转换出时间戳/通道/ID列后筛选，逐行解析的行先预筛选）
+            
+        Returns:
+            (按行序排列的延迟解码消息表, 块内行数)
+        """
+        size = len(block)
+        newlines = np.flatnonzero(block == 0x0A)
+        line_starts = np.concatenate(([0], newlines + 1))
+        line_ends = np.concatenate((newlines, [size]))
+        if line_starts[-1] == size:
+            # 块以换行结尾，没有剩余的不完整行
+            line_starts, line_ends = line_starts[:-1], line_ends[:-1]
+        line_count = len(line_starts)
         
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    f.read()
-                return encoding
-            except UnicodeDecodeError:
+        # 字段（连续非空白字节）的起止位置；换行也是空白，字段不会跨行
+        space = WHITESPACE[block]
+        solid = ~space
+        token_starts = np.flatnonzero(solid & np.concatenate(([True], space[:-1])))
+        token_ends = np.flatnonzero(solid & np.concatenate((space[1:], [True]))) + 1
+        first_token = np.searchsorted(token_starts, line_starts)
+        token_counts = np.searchsorted(token_starts, line_ends) - first_token
+        
+        # 非空行：去掉首尾空白后的起止位置
+        nonblank = np.flatnonzero(token_counts > 0)
+        stripped_starts = token_starts[first_token[nonblank]]
+        stripped_ends = token_ends[first_token[nonblank] + token_counts[nonblank] - 1]
+        leading = block[stripped_starts]
+        
+        builder = CANMessageTableBuilder(payload_source)
+        
+        # 文件头信息行（按行序处理，同一信息以最后一行为准）
+        for i in np.flatnonzero(_IS_HEADER_START[leading]).tolist():
+            self._parse_header_line(block[stripped_starts[i]:stripped_ends[i]].tobytes())
+        
+        # 以数字开头的行为候选数据行
+        candidates = np.flatnonzero(_IS_DIGIT[leading])
+        lines = nonblank[candidates]
+        starts = stripped_starts[candidates]
+        ends = stripped_ends[candidates]
+        counts = token_counts[lines]
+        tokens = np.minimum(first_token[lines][:, None] + np.arange(7), len(token_starts) - 1)
+        t_starts = token_starts[tokens]
+        t_lens = token_ends[tokens] - t_starts
+        
+        def window(k: int, width: int):
+            """第k个字段开头的定宽窗口及有效位置掩码"""
+            chars = block[np.minimum(t_starts[:, k, None] + np.arange(width), size - 1)]
+            return chars, np.arange(width) < t_lens[:, k, None]
+        
+        # 格式1/3: 时间戳 通道 ID 方向 d DLC 数据；格式2: 时间戳 通道 ID 方向 DLC 数据
+        field5 = block[t_starts[:, 4]]
+        is_d = (t_lens[:, 4] == 1) & ((field5 == ord('d')) | (field5 == ord('D')))
+        valid = (counts >= 6) & ~(is_d & (counts < 7))
+        dlc_token = np.where(is_d, 5, 4)
+        data_starts = np.where(is_d, t_starts[:, 6], t_starts[:, 5])
+        spans = ends - data_starts
+        valid &= spans <= 0xFFFF
+        
+        # 时间戳: 数字和一个不在首尾的小数点，最多15位数字（整数尾数/10^k 即为正确舍入的浮点值）
+        chars, mask = window(0, 16)
+        is_dot = (chars == ord('.')) & mask
+        dot_positions = np.argmax(is_dot, axis=1)
+        valid &= ((t_lens[:, 0] <= 16) & (is_dot.sum(axis=1) == 1)
+                  & (dot_positions > 0) & (dot_positions < t_lens[:, 0] - 1)
+                  & np.all(_IS_DIGIT[chars] | is_dot | ~mask, axis=1))
+        mantissa = np.zeros(len(lines), dtype=np.int64)
+        for j in range(16):
+            take = mask[:, j] & ~is_dot[:, j]
+            mantissa = np.where(take, mantissa * 10 + (chars[:, j].astype(np.int64) - 0x30), mantissa)
+        timestamps = mantissa / 10.0 ** (t_lens[:, 0] - dot_positions - 1)
+        
+        # 通道、DLC: 1~3位数字（存储时取低8位）
+        rows = np.arange(len(lines))
+        values = {}
+        for name, index in (('channel', 1), ('dlc', dlc_token)):
+            t_start = t_starts[rows, index]
+            t_len = t_lens[rows, index]
+            chars = block[np.minimum(t_start[:, None] + np.arange(3), size - 1)]
+            mask = np.arange(3) < t_len[:, None]
+            valid &= (t_len <= 3) & np.all(_IS_DIGIT[chars] | ~mask, axis=1)
+            value = np.zeros(len(lines), dtype=np.int64)
+            for j in range(3):
+                value = np.where(mask[:, j], value * 10 + (chars[:, j].astype(np.int64) - 0x30), value)
+            values[name] = value & 0xFF
+        
+        # CAN ID: 1~8位十六进制，可带 x/X 后缀（小写 x 表示扩展帧）
+        chars, mask = window(2, 9)
+        last = chars[rows, np.clip(t_lens[:, 2] - 1, 0, 8)]  # 超过9个字符的字段由下面的长度检查排除
+        suffixed = (last == ord('x')) | (last == ord('X'))
+        id_lens = t_lens[:, 2] - suffixed
+        mask = np.arange(9) < id_lens[:, None]
+        nibbles = HEX_NIBBLES[chars]
+        valid &= (id_lens >= 1) & (id_lens <= 8) & np.all((nibbles != 0xFF) | ~mask, axis=1)
+        can_ids = np.zeros(len(lines), dtype=np.int64)
+        for j in range(8):
+            can_ids = np.where(mask[:, j], can_ids * 16 + nibbles[:, j], can_ids)
+        
+        # 方向: Rx/Tx（大小写不敏感）
+        first, second = block[t_starts[:, 3]], block[np.minimum(t_starts[:, 3] + 1, size - 1)]
+        is_tx = (first == ord('T')) | (first == ord('t'))
+        valid &= ((t_lens[:, 3] == 2) & (is_tx | (first == ord('R')) | (first == ord('r')))
+                  & ((second == ord('x')) | (second == ord('X'))))
+        
+        flags = np.where(is_tx, FLAG_TX, 0) | np.where((last == ord('x')) | (can_ids > 0x7FF), FLAG_EXTENDED, 0)
+        
+        # 不符合标准格式的行逐行解析（快速路径或正则路径）
+        unparsed = 0
+        for i in np.flatnonzero(~valid).tolist():
+            line_num = first_line + int(lines[i])
+            line = block[starts[i]:ends[i]].tobytes()
+            if message_filter is not None and not message_filter.accepts_line(line):
+                continue
+            record = self._parse_can_message(line, line_num, defer_payload=True)
+            if not record:
+                unparsed += 1
+                continue
+            if message_filter is not None and not message_filter.accepts(record[0], record[1], record[2]):
                 continue
+            if type(record[5]) is int:
+                span = record[5]
+                builder.append_deferred(*record[:5], base + int(ends[i]) - span, span, line_num)
+            else:
+                builder.append(*record, line_num)
+        fallback = builder.build()
+        self._count_unparsed(unparsed)
         
-        return 'utf-8'  # 默认
+        if message_filter is not None:
+            valid &= message_filter.mask(timestamps, values['channel'], can_ids)
+        ok = np.flatnonzero(valid)
+        n = len(ok)
+        table = CANMessageTable(
+            timestamps=timestamps[ok],
+            can_ids=can_ids[ok],
+            channels=values['channel'][ok],
+            dlcs=values['dlc'][ok],
+            flags=flags[ok],
+            line_numbers=first_line + lines[ok],
+            payload_offsets=base + data_starts[ok],
+            payload_spans=spans[ok],
+            payload_pending=np.ones(n, dtype=np.bool_),
+            payload_source=payload_source,
+        )
+        if len(fallback):
+            # 合并后恢复行序
+            table = CANMessageTable.concat([table, fallback])
+            table = table.take(np.argsort(table.line_numbers, kind='stable'))
+        return table, line_count
     
-    def _parse_can_message(self, line: str, line_num: int) -> Dict[str, Any]:
+    def _parse_header_line(self, line: bytes):
+        """解析文件头信息行（只有文件头行才需要解码）"""
+        for prefix, key in _HEADER_PREFIXES:
+            if line.startswith(prefix):
+                self.file_info[key] = self._decode(line)
+                return
+    
+    def _decode(self, line: bytes) -> str:
+        """按检测出的文件编码解码一行"""
+        return decode_line(line, self.encoding)
+    
+    def _read_file_parallel(self, file_path: str, workers: int,
+                            complete_lines_only: bool = False, lazy_payload: bool = False,
+                            progress: Optional[ProgressReporter] = None,
+                            message_filter: Optional['MessageFilter'] = None) -> CANMessageTable:
         """
-        解析CAN消息行
-        支持多种ASC格式，包括标准帧和扩展帧
+        多进程并行解析
+        
+        将文件按换行对齐切分为若干字节范围，在进程池中分别解析，
+        再按文件顺序拼接并把块内行号换算为全局行号。
+        进度按已完成的字节范围报告；取消时撤销未开始的范围，不等待正在解析的进程。
+        """
+        self.encoding = detect_encoding(file_path)
+        print(f"🔤 检测编码: {self.encoding}")
+        
+        file_size = os.path.getsize(file_path)
+        if complete_lines_only:
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                file_size = mm.rfind(b'\n') + 1
+        ranges = self._split_byte_ranges(file_path, workers * PARALLEL_RANGES_PER_WORKER, file_size)
+        print(f"⚙️ 并行解析: {workers} 个进程, {len(ranges)} 个分块")
+        
+        if progress:
+            progress.start(file_size, '并行解析')
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(_parse_byte_range, file_path, start, end, self.encoding, lazy_payload,
+                                       message_filter): end - start for start, end in ranges}
+            pending = set(futures)
+            done_bytes = frames = 0
+            while pending:
+                done, pending = wait(pending, timeout=PROGRESS_INTERVAL / 2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    done_bytes += futures[future]
+                    frames += len(future.result()[0])
+                if progress:
+                    progress.update(done_bytes, frames)
+            results = [future.result() for future in futures]
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+        if progress:
+            progress.finish()
+        
+        # 按字节顺序拼接（即文件顺序，ASC日志中也就是时间戳顺序），行号加上前面各块的行数
+        self.file_info = {}
+        tables = []
+        line_offset = 0
+        unparsed = 0
+        for table, line_count, header_info in results:
+            table.line_numbers += line_offset
+            tables.append(table)
+            unparsed += header_info.pop('unparsed_lines', 0)
+            self.file_info.update(header_info)
+            line_offset += line_count
+        self.file_info['unparsed_lines'] = unparsed
+        self.file_info['line_count'] = line_offset
+        if message_filter:
+            self.file_info['filter'] = message_filter.describe()
+        self.message_filter = message_filter
+        self._statistics = None
+        self._line_index = None
+        self.compression = None
+        self.file_path = file_path
+        self.file_offset = self.file_info['parsed_bytes'] = file_size
+        
+        return CANMessageTable.concat(tables)
+    
+    def _count_unparsed(self, count: int):
+        """累计以数字开头但无法解析为CAN帧的行数（错误帧等事件行或损坏的行）"""
+        self.file_info['unparsed_lines'] = self.file_info.get('unparsed_lines', 0) + count
+    
+    @staticmethod
+    def _split_byte_ranges(file_path: str, count: int, file_size: int) -> List[Tuple[int, int]]:
+        """把文件前 file_size 字节切分为 count 个左右按换行对齐的字节范围"""
+        boundaries = [0]
+        with open(file_path, 'rb') as f:
+            for i in range(1, count):
+                offset = file_size * i // count
+                if offset <= boundaries[-1]:
+                    continue
+                f.seek(offset - 1)
+                f.readline()  # 跳到下一行开头（offset-1 处恰为换行时即为 offset）
+                position = f.tell()
+                if boundaries[-1] < position < file_size:
+                    boundaries.append(position)
+        boundaries.append(file_size)
+        return list(zip(boundaries[:-1], boundaries[1:]))
+    
+    def _parse_can_message(self, line: bytes, line_num: int, defer_payload: bool = False) -> Optional[MessageRecord]:
         """
-        # 格式1: 时间戳 通道 CAN_ID Rx/Tx d DLC 数据字节
-        # 例: 0.000000 1  123             Rx   d 8 01 02 03 04 05 06 07 08
-        # 扩展帧例: 0.000000 1  18FEF100x        Rx   d 8 01 02 03 04 05 06 07 08
-        pattern1 = r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]+)x?\s+(Rx|Tx)\s+d\s+(\d+)\s+(.*)$'
+        解析CAN消息行（快速路径，输入为去除首尾空白的原始字节行）
         
-        # 格式2: 时间戳 通道 CAN_ID Rx/Tx DLC 数据字节
-        # 例: 0.100000 1 123 Rx 8 AA BB CC DD EE FF 00 11
-        # 扩展帧例: 0.100000 1 18FEF100x Rx 8 AA BB CC DD EE FF 00 11
-        pattern2 = r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]+)x?\s+(Rx|Tx)\s+(\d+)\s+(.*)$'
+        用一次 split 完成格式1/2/3的分词，数据字节用 bytes.fromhex 批量解码；
+        只有快速路径无法识别的行才解码为字符串回退到正则解析。
         
-        # 格式3: CANoe格式 - 扩展帧有特殊标记
-        # 例: 0.000000 1  18FEF100         Rx   d 8 01 02 03 04 05 06 07 08
-        pattern3 = r'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]{8})\s+(Rx|Tx)\s+d\s+(\d+)\s+(.*)$'
+        defer_payload 为 True 时（延迟解码模式）快速路径不解码数据字段，
+        记录中数据的位置改为数据字段的字节长度（int），由调用方换算为文件中的字节位置。
+        """
+        if not line or not line[:1].isdigit():
+            # 数据行必须以时间戳开头，其余行（文件头、注释等）正则也不会匹配
+            return None
+        
+        parts = line.split(None, 5)
+        if len(parts) < 6:
+            return self._parse_can_message_regex(self._decode(line), line_num)
+        
+        timestamp, channel, can_id, direction, field5, rest = parts
+        
+        if field5 == b'd' or field5 == b'D':
+            # 格式1/3: ... Rx d DLC 数据
+            tail = rest.split(None, 1)
+            if len(tail) < 2:
+                return self._parse_can_message_regex(self._decode(line), line_num)
+            dlc, data_str = tail
+        else:
+            # 格式2: ... Rx DLC 数据
+            dlc, data_str = field5, rest
+        
+        # 字段校验，不符合时交给CAN FD或正则路径处理
+        flags = _DIRECTION_FLAGS.get(direction)
+        is_extended = can_id.endswith(b'x')
+        id_digits = can_id[:-1] if can_id[-1:] in (b'x', b'X') else can_id
+        if (flags is None or not id_digits or id_digits.strip(_HEX_DIGITS)
+                or not channel.isdigit() or not dlc.isdigit()
+                or not timestamp.replace(b'.', b'', 1).isdigit() or b'.' not in timestamp[1:-1]):
+            if channel.upper() == b'CANFD':
+                return self._parse_canfd_message(line, line_num)
+            return self._parse_can_message_regex(self._decode(line), line_num)
+        
+        can_id_int = int(id_digits, 16)
+        if is_extended or can_id_int > 0x7FF:
+            flags |= FLAG_EXTENDED
         
+        if defer_payload and len(data_str) <= 0xFFFF:
+            return (float(timestamp), int(channel), can_id_int, flags, int(dlc), len(data_str))
+        
+        # 标准 "XX XX XX" 数据字段整体解码（十六进制字段为纯ASCII，latin1 解码零开销且不会失败）
+        try:
+            payload = bytes.fromhex(data_str.decode('latin1'))
+            if len(data_str) != len(payload) * 3 - 1 or data_str[2::3].strip():
+                payload = self._parse_data_bytes(self._decode(data_str))
+        except ValueError:
+            payload = self._parse_data_bytes(self._decode(data_str))
+        
+        return (float(timestamp), int(channel), can_id_int, flags, int(dlc), payload)
+    
+    def _parse_canfd_message(self, line: bytes, line_num: int) -> Optional[MessageRecord]:
+        """
+        解析CAN FD消息行（输入为去除首尾空白的原始字节行）
+        
+        格式: 时间戳 CANFD 通道 方向 ID [符号名] BRS ESI DLC 数据长度 数据字节 [附加字段...]
+        按 BRS/ESI/DLC/数据长度 四个字段的形态判断是否带符号名，只取数据长度个数据字节。
+        """
+        parts = line.split()
+        if len(parts) < 9:
+            return None
+        
+        timestamp, _, channel, direction, can_id = parts[:5]
+        field = 5 if _is_canfd_header(parts[5:9]) else 6
+        if field == 6 and not _is_canfd_header(parts[6:10]):
+            return None
+        brs, esi, dlc, data_length = parts[field:field + 4]
+        
+        flags = _DIRECTION_FLAGS.get(direction)
+        id_digits = can_id[:-1] if can_id[-1:] in (b'x', b'X') else can_id
+        if (flags is None or not id_digits or id_digits.strip(_HEX_DIGITS) or not channel.isdigit()
+                or not timestamp.replace(b'.', b'', 1).isdigit() or b'.' not in timestamp[1:-1]):
+            return None
+        
+        data_str = b' '.join(parts[field + 4:field + 4 + int(data_length)])
+        try:
+            payload = bytes.fromhex(data_str.decode('latin1'))
+        except ValueError:
+            payload = self._parse_data_bytes(self._decode(data_str))
+        
+        can_id_int = int(id_digits, 16)
+        flags |= FLAG_FD
+        if brs == b'1':
+            flags |= FLAG_BRS
+        if esi == b'1':
+            flags |= FLAG_ESI
+        if can_id.endswith(b'x') or can_id_int > 0x7FF:
+            flags |= FLAG_EXTENDED
+        
+        return (float(timestamp), int(channel), can_id_int, flags, int(dlc, 16), payload)
+    
+    def _parse_can_message_regex(self, line: str, line_num: int) -> Optional[MessageRecord]:
+        """
+        解析CAN消息行（正则路径）
+        支持多种ASC格式，包括标准帧和扩展帧
+        """
         # 尝试匹配格式1（支持扩展帧x标记）
-        match = re.match(pattern1, line, re.IGNORECASE)
+        match = _PATTERN_FORMAT1.match(line)
         if match:
             timestamp, channel, can_id, direction, dlc, data_str = match.groups()
             # 检查是否有 'x' 后缀标记（扩展帧标记），具体数值判断在 _create_message 中
@@ -107,7 +750,7 @@ class SimpleASCReader:
             return self._create_message(timestamp, channel, can_id, direction, dlc, data_str, line_num, is_extended)
         
         # 尝试匹配格式2（支持扩展帧x标记）
-        match = re.match(pattern2, line, re.IGNORECASE)
+        match = _PATTERN_FORMAT2.match(line)
         if match:
             timestamp, channel, can_id, direction, dlc, data_str = match.groups()
             # 检查是否有 'x' 后缀标记（扩展帧标记），具体数值判断在 _create_message 中
@@ -115,7 +758,7 @@ class SimpleASCReader:
             return self._create_message(timestamp, channel, can_id, direction, dlc, data_str, line_num, is_extended)
         
         # 尝试匹配格式3（8位十六进制通常是扩展帧）
-        match = re.match(pattern3, line, re.IGNORECASE)
+        match = _PATTERN_FORMAT3.match(line)
         if match:
             timestamp, channel, can_id, direction, dlc, data_str = match.groups()
             is_extended = True  # 8位十六进制默认为扩展帧
@@ -123,23 +766,35 @@ class SimpleASCReader:
         
         return None
     
+    def _decode_payload(self, data_str: str) -> bytes:
+        """
+        解码数据字节字段
+        标准的 "XX XX XX" 格式整体交给 bytes.fromhex，其余格式逐个解析
+        """
+        try:
+            payload = bytes.fromhex(data_str)
+        except ValueError:
+            # 非标准数据字段（单个十六进制位、附加字段等）
+            return self._parse_data_bytes(data_str)
+        # 每个字节恰好2个字符、以单个空白分隔时才与逐个解析结果一致
+        if len(data_str) != len(payload) * 3 - 1 or data_str[2::3].strip():
+            return self._parse_data_bytes(data_str)
+        return payload
+    
+    @staticmethod
+    def _parse_data_bytes(data_str: str) -> bytes:
+        """逐个解析数据字节，遇到无效字段停止（忽略超过2个字符的字段）"""
+        return parse_hex_tokens(data_str)
+    
     def _create_message(self, timestamp: str, channel: str, can_id: str, 
-                       direction: str, dlc: str, data_str: str, line_num: int, is_extended: bool = False) -> Dict[str, Any]:
-        """创建消息字典"""
+                       direction: str, dlc: str, data_str: str, line_num: int, is_extended: bool = False) -> Optional[MessageRecord]:
+        """创建消息记录"""
         try:
             # 清理CAN ID（移除可能的x后缀）
             clean_can_id = can_id.rstrip('x').rstrip('X')
             
             # 解析数据字节
-            data_bytes = []
-            if data_str.strip():
-                hex_values = data_str.strip().split()
-                for hex_val in hex_values:
-                    if len(hex_val) <= 2:  # 确保是有效的十六进制
-                        try:
-                            data_bytes.append(int(hex_val, 16))
-                        except ValueError:
-                            break
+            data_bytes = self._decode_payload(data_str)
             
             # 转换CAN ID为整数
             can_id_int = int(clean_can_id, 16)
@@ -151,101 +806,393 @@ class SimpleASCReader:
                 # 如果CAN ID > 0x7FF (2047)，则认为是扩展帧
                 is_extended = can_id_int > 0x7FF
             
-            return {
-                'timestamp': float(timestamp),
-                'channel': int(channel),
-                'can_id': can_id_int,  # 转换为十进制
-                'can_id_hex': clean_can_id.upper(),
-                'is_extended': is_extended,
-                'frame_type': 'Extended' if is_extended else 'Standard',
-                'direction': direction,
-                'dlc': int(dlc),
-                'data': data_bytes,
-                'data_hex': ' '.join(f'{b:02X}' for b in data_bytes),
-                'line_number': line_num,
-                'raw_line': line_num
-            }
+            flags = FLAG_EXTENDED if is_extended else 0
+            if direction.upper() == 'TX':
+                flags |= FLAG_TX
+            
+            return (float(timestamp), int(channel), can_id_int, flags, int(dlc), data_bytes)
         except (ValueError, TypeError) as e:
             print(f"⚠️ 解析消息失败 (行{line_num}): {e}")
             return None
     
-    def get_statistics(self) -> Dict[str, Any]:
-        """获取统计信息"""
-        if not self.messages:
-            return {}
+    def line_index(self) -> LineOffsetIndex:
+        """
+        当前文件的行偏移索引（首次调用时扫描全文件，之后只扫描文件新追加的部分）
         
-        # 基本统计
-        total_messages = len(self.messages)
-        unique_can_ids = len(set(msg['can_id'] for msg in self.messages))
+        索引不在解析时构建，不影响解析速度；压缩文件无法随机访问，抛出 ValueError。
+        """
+        if self.file_path is None:
+            raise ValueError("尚未读取文件")
+        if self.compression:
+            raise ValueError(f"压缩文件({self.compression})不支持按行随机访问")
+        if self._line_index is None:
+            self._line_index = LineOffsetIndex(self.file_path)
+        self._line_index.update()
+        return self._line_index
+    
+    def raw_lines(self, first_line: int, count: int) -> List[str]:
+        """读取源文件从第 first_line 行（从1开始）开始的 count 行原始文本"""
+        return [self._decode(line) for line in self.line_index().read_lines(first_line, count)]
+    
+    def raw_context(self, line_number: int, before: int = 10, after: int = 10) -> List[Tuple[int, str]]:
+        """
+        第 line_number 行前后的原始文本
         
-        # 时间统计
-        timestamps = [msg['timestamp'] for msg in self.messages]
-        time_start = min(timestamps)
-        time_end = max(timestamps)
-        duration = time_end - time_start
+        Returns:
+            [(行号, 文本), ...]
+        """
+        first_line = max(1, line_number - before)
+        lines = self.raw_lines(first_line, line_number - first_line + after + 1)
+        return list(enumerate(lines, first_line))
+    
+    def raw_context_at_time(self, timestamp: float, before: int = 10,
+                            after: int = 10) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        时间戳最接近 timestamp 的帧所在行前后的原始文本
+        
+        Returns:
+            (该帧的行号, [(行号, 文本), ...])
+        """
+        if not self.messages:
+            raise ValueError("没有已解析的消息")
+        row = self.messages.time_index().nearest(timestamp)
+        line_number = int(self.messages.line_numbers[row])
+        return line_number, self.raw_context(line_number, before, after)
+    
+    def export_raw_clip(self, output_path: str, start_time: Optional[float] = None,
+                        end_time: Optional[float] = None) -> int:
+        """
+        按时间范围 [start_time, end_time] 裁剪原始日志
         
-        # CAN ID统计
-        can_id_counts = {}
-        for msg in self.messages:
-            can_id = msg['can_id']
-            can_id_counts[can_id] = can_id_counts.get(can_id, 0) + 1
+        输出源文件的文件头（第一帧之前的行）和范围内首帧到末帧之间的所有原始行
+        （含其间的注释、事件等非帧行），只读取这两段字节，不重新格式化。
         
-        # 方向统计
-        rx_count = sum(1 for msg in self.messages if msg['direction'].upper() == 'RX')
-        tx_count = sum(1 for msg in self.messages if msg['direction'].upper() == 'TX')
+        Returns:
+            范围内的帧数（0 表示没有帧，不写文件）
+        """
+        rows = self.messages.time_index().rows(start_time, end_time) if self.messages else slice(0, 0)
+        line_numbers = self.messages.line_numbers[rows]
+        if not len(line_numbers):
+            return 0
         
-        return {
-            'total_messages': total_messages,
-            'unique_can_ids': unique_can_ids,
-            'time_start': time_start,
-            'time_end': time_end,
-            'duration_seconds': duration,
-            'frequency_hz': total_messages / duration if duration > 0 else 0,
-            'rx_messages': rx_count,
-            'tx_messages': tx_count,
-            'can_id_counts': dict(sorted(can_id_counts.items(), key=lambda x: x[1], reverse=True)),
-            'most_frequent_can_id': max(can_id_counts.items(), key=lambda x: x[1]) if can_id_counts else None,
-        }
+        index = self.line_index()
+        header_end = index.line_offset(int(self.messages.line_numbers.min()))
+        start, end = index.byte_range(int(line_numbers.min()), int(line_numbers.max() - line_numbers.min()) + 1)
+        with open(self.file_path, 'rb') as source, open(output_path, 'wb') as output:
+            output.write(source.read(header_end))
+            source.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = source.read(min(remaining, SCAN_BLOCK_SIZE))
+                if not chunk:
+                    break
+                output.write(chunk)
+                remaining -= len(chunk)
+        return len(line_numbers)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+        
+        首次调用时由行索引一次向量化汇总，之后 read_appended 只累加新批次，
+        再次调用的开销与CAN ID数量成正比，与消息数无关。
+        """
+        if self._statistics is None:
+            self._statistics = MessageStatistics()
+            self._statistics.update(self.messages)
+        return self._statistics.result()
     
-    def filter_by_can_id(self, can_id: int) -> List[Dict[str, Any]]:
+    def get_file_statistics(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """流式统计ASC文件，不在内存中保留完整消息表"""
+        statistics = MessageStatistics()
+        for batch in self.iter_messages(file_path, chunk_size):
+            statistics.update(batch)
+        return statistics.result()
+    
+    def filter_by_can_id(self, can_id: int) -> CANMessageTable:
         """按CAN ID过滤消息"""
-        return [msg for msg in self.messages if msg['can_id'] == can_id]
+        return self.messages.select(can_id)
     
-    def filter_by_time_range(self, start_time: float, end_time: float) -> List[Dict[str, Any]]:
+    def filter_by_time_range(self, start_time: float, end_time: float) -> CANMessageTable:
         """按时间范围过滤消息"""
-        return [msg for msg in self.messages if start_time <= msg['timestamp'] <= end_time]
+        return self.messages.time_slice(start_time, end_time)
+    
+    def export_to_csv(self, output_path: str,
+                      messages: Optional[Iterable[CANMessageTable]] = None) -> bool:
+        """
+        导出为CSV格式（按块整体格式化，见 can_table_export.write_csv）
+        
+        Args:
+            output_path: 输出CSV路径
+            messages: 消息批次的可迭代对象，默认导出 self.messages
+        """
+        return self._export('csv', output_path, messages)
+    
+    def export_to_parquet(self, output_path: str,
+                          messages: Optional[Iterable[CANMessageTable]] = None,
+                          compression: Optional[str] = DEFAULT_COMPRESSION,
+                          row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> bool:
+        """
+        导出为Parquet格式（需要pyarrow；CAN ID字典编码，默认zstd压缩）
+        
+        Args:
+            output_path: 输出路径
+            messages: 消息批次的可迭代对象，默认导出 self.messages
+            compression: 列压缩算法
+            row_group_size: 每个行组的行数
+        """
+        return self._export('parquet', output_path, messages,
+                            compression=compression, row_group_size=row_group_size)
+    
+    def export_to_arrow(self, output_path: str,
+                        messages: Optional[Iterable[CANMessageTable]] = None,
+                        compression: Optional[str] = DEFAULT_COMPRESSION) -> bool:
+        """导出为Arrow IPC(Feather v2)格式（需要pyarrow）"""
+        return self._export('arrow', output_path, messages, compression=compression)
     
-    def export_to_csv(self, output_path: str) -> bool:
-        """导出为CSV格式"""
+    def export_to_asc(self, output_path: str,
+                      messages: Optional[Iterable[CANMessageTable]] = None,
+                      compression: Optional[str] = 'auto') -> bool:
+        """导出为ASC格式（按扩展名 .gz/.xz/.zst 压缩输出）"""
+        return self._export('asc', output_path, messages, compression=compression)
+    
+    def _export(self, fmt: str, output_path: str,
+                messages: Optional[Iterable[CANMessageTable]], **options) -> bool:
+        """按格式导出，messages 为 None 时导出 self.messages"""
+        name = {'csv': 'CSV', 'parquet': 'Parquet', 'arrow': 'Arrow', 'asc': 'ASC'}[fmt]
         try:
-            import csv
-            
-            with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-                if not self.messages:
-                    return False
-                
-                # CSV头部
-                fieldnames = ['timestamp', 'channel', 'can_id_hex', 'direction', 'dlc', 'data_hex']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                # 写入数据
-                for msg in self.messages:
-                    writer.writerow({
-                        'timestamp': msg['timestamp'],
-                        'channel': msg['channel'],
-                        'can_id_hex': f"0x{msg['can_id']:X}",
-                        'direction': msg['direction'],
-                        'dlc': msg['dlc'],
-                        'data_hex': msg['data_hex']
-                    })
-            
-            print(f"✅ CSV导出成功: {output_path}")
+            total = export_messages(output_path, self.messages if messages is None else messages, fmt, **options)
+            if not total:
+                return False
+            print(f"✅ {name}导出成功: {output_path} ({total} 条消息)")
             return True
-            
         except Exception as e:
-            print(f"❌ CSV导出失败: {e}")
+            print(f"❌ {name}导出失败: {e}")
             return False
+    
+    def export_file_to_csv(self, file_path: str, output_path: str,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> bool:
+        """流式将ASC文件转换为CSV，不在内存中保留完整消息表"""
+        return self.export_to_csv(output_path, self.iter_messages(file_path, chunk_size))
+    
+    def export_file_to_parquet(self, file_path: str, output_path: str,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE) -> bool:
+        """流式将ASC文件转换为Parquet，不在内存中保留完整消息表"""
+        return self.export_to_parquet(output_path, self.iter_messages(file_path, chunk_size))
+
+
+def _is_canfd_header(fields: List[bytes]) -> bool:
+    """CAN FD 行中 BRS ESI DLC 数据长度 四个字段的形态是否正确"""
+    return (len(fields) == 4 and fields[0] in (b'0', b'1') and fields[1] in (b'0', b'1')
+            and len(fields[2]) == 1 and fields[2] in _HEX_DIGITS and fields[3].isdigit())
+
+
+def _parse_byte_range(file_path: str, start: int, end: int, encoding: str, lazy_payload: bool = False,
+                      message_filter: Optional['MessageFilter'] = None):
+    """
+    进程池任务：解析文件中 [start, end) 字节范围内的完整行（lazy_payload 时只记录数据字段位置，
+    给出 message_filter 时只保留符合条件的帧）
+    
+    Returns:
+        (消息表(块内行号), 行数, 文件头信息)
+    """
+    reader = SimpleASCReader()
+    reader.encoding = encoding
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if lazy_payload:
+            batches = reader._scan_deferred(mm, start, end, 1, (os.path.abspath(file_path), encoding),
+                                            message_filter=message_filter)
+        else:
+            batches = reader._iter_lines(mm, start, end, None, message_filter=message_filter)
+        table = CANMessageTable.concat(list(batches))
+    return table, reader.file_info.pop('line_count'), reader.file_info
+
+
+class MessageFilter:
+    """
+    帧过滤条件（下推到分词阶段）
+
+    逐行解析时 accepts_line 只切出时间戳/通道/ID字段判断，不符合的行不解码数据、不创建记录；
+    向量化扫描时 mask 在转换出时间戳/通道/ID列后按行筛选，数据字段位置只为保留的帧记录。
+
+    Args:
+        ids: 保留的CAN ID，None 表示不限
+        channels: 保留的通道号，None 表示不限
+        time_range: 保留的时间范围 (start, end)，闭区间，任一端为 None 表示不限
+    """
+
+    def __init__(self, ids: Optional[Iterable[int]] = None, channels: Optional[Iterable[int]] = None,
+                 time_range: Optional[Tuple[Optional[float], Optional[float]]] = None):
+        self.ids = None if ids is None else frozenset(int(can_id) for can_id in ids)
+        self.channels = None if channels is None else frozenset(int(channel) for channel in channels)
+        self.start, self.end = time_range if time_range is not None else (None, None)
+        self._id_array = None if self.ids is None else np.array(sorted(self.ids), dtype=np.int64)
+        self._channel_array = None if self.channels is None else np.array(sorted(self.channels), dtype=np.int64)
+
+    @classmethod
+    def create(cls, ids=None, channels=None, time_range=None) -> Optional['MessageFilter']:
+        """没有任何条件时返回 None（不过滤）"""
+        if ids is None and channels is None and (time_range is None or tuple(time_range) == (None, None)):
+            return None
+        return cls(ids, channels, time_range)
+
+    def describe(self) -> Dict[str, Any]:
+        """过滤条件（写入 file_info['filter']）"""
+        return {
+            'ids': None if self.ids is None else sorted(self.ids),
+            'channels': None if self.channels is None else sorted(self.channels),
+            'time_range': [self.start, self.end],
+        }
+
+    def accepts(self, timestamp: float, channel: int, can_id: int) -> bool:
+        """已解析的帧是否符合条件"""
+        return ((self.ids is None or can_id in self.ids)
+                and (self.channels is None or channel in self.channels)
+                and (self.start is None or timestamp >= self.start)
+                and (self.end is None or timestamp <= self.end))
+
+    def accepts_line(self, line: bytes) -> bool:
+        """
+        预筛选数据行（去除首尾空白的原始字节行）
+
+        只切出前几个字段判断 ID/通道/时间戳；字段形态不标准、无法判断的行返回 True，
+        交给完整解析后再用 accepts 检查。
+        """
+        parts = line.split(None, 3)
+        if len(parts) < 4:
+            return True
+        timestamp, channel, can_id, rest = parts
+        if channel.upper() == b'CANFD':
+            # CAN FD: 时间戳 CANFD 通道 方向 ID ...
+            fields = rest.split(None, 2)
+            if len(fields) < 2:
+                return True
+            channel, can_id = can_id, fields[1]
+        try:
+            if self.ids is not None:
+                id_digits = can_id[:-1] if can_id[-1:] in (b'x', b'X') else can_id
+                if int(id_digits, 16) not in self.ids:
+                    return False
+            if self.channels is not None and int(channel) not in self.channels:
+                return False
+            if self.start is not None or self.end is not None:
+                value = float(timestamp)
+                if (self.start is not None and value < self.start) or (self.end is not None and value > self.end):
+                    return False
+        except ValueError:
+            return True
+        return True
+
+    def mask(self, timestamps: np.ndarray, channels: np.ndarray, can_ids: np.ndarray) -> np.ndarray:
+        """按列筛选，返回符合条件的行掩码"""
+        keep = np.ones(len(timestamps), dtype=bool)
+        if self._id_array is not None:
+            keep &= np.isin(can_ids, self._id_array)
+        if self._channel_array is not None:
+            keep &= np.isin(channels, self._channel_array)
+        if self.start is not None:
+            keep &= timestamps >= self.start
+        if self.end is not None:
+            keep &= timestamps <= self.end
+        return keep
+
+    def apply(self, table: CANMessageTable) -> CANMessageTable:
+        """筛选已加载的消息表"""
+        rows = np.flatnonzero(self.mask(table.timestamps, table.channels, table.can_ids))
+        return table if len(rows) == len(table) else table.take(rows)
+
+
+class MessageStatistics:
+    """
+    增量统计累加器
+    逐批次 update，可用于完整消息表或 iter_messages 的流式批次。
+    
+    每个批次只做一次向量化汇总：帧数和每个ID的时间范围由 (CAN ID, 通道) 行索引
+    分组归约得到（read_file 已构建索引，不需要再排序），方向/帧类型由标志位
+    的 bincount 得到，DLC 分布由 DLC 的 bincount 得到；之后只按分组数合并到字典。
+    """
+    
+    def __init__(self):
+        self.total_messages = 0
+        self.time_start = None
+        self.time_end = None
+        # CAN ID -> [帧数, 最早时间戳, 最晚时间戳]
+        self.can_id_stats: Dict[int, List] = {}
+        self.channel_counts: Dict[int, int] = {}
+        self.dlc_counts: Dict[int, int] = {}
+        # 标志位组合 -> 帧数（方向、扩展帧、CAN FD 由此汇总）
+        self.flag_counts = np.zeros(256, dtype=np.int64)
+    
+    @property
+    def can_id_counts(self) -> Dict[int, int]:
+        """CAN ID -> 帧数"""
+        return {can_id: stats[0] for can_id, stats in self.can_id_stats.items()}
+    
+    def update(self, batch: CANMessageTable):
+        """累加一个批次"""
+        if not len(batch):
+            return
+        
+        self.total_messages += len(batch)
+        self.flag_counts += np.bincount(batch.flags, minlength=256)
+        for dlc, count in enumerate(np.bincount(batch.dlcs).tolist()):
+            if count:
+                self.dlc_counts[dlc] = self.dlc_counts.get(dlc, 0) + count
+        
+        group_keys, counts, firsts, lasts = batch.group_summary()
+        batch_start = float(firsts.min())
+        batch_end = float(lasts.max())
+        self.time_start = batch_start if self.time_start is None else min(self.time_start, batch_start)
+        self.time_end = batch_end if self.time_end is None else max(self.time_end, batch_end)
+        
+        can_id_stats = self.can_id_stats
+        channel_counts = self.channel_counts
+        for key, count, first, last in zip(group_keys.tolist(), counts.tolist(), firsts.tolist(), lasts.tolist()):
+            can_id, channel = key >> 8, key & 0xFF
+            channel_counts[channel] = channel_counts.get(channel, 0) + count
+            stats = can_id_stats.get(can_id)
+            if stats is None:
+                can_id_stats[can_id] = [count, first, last]
+            else:
+                stats[0] += count
+                stats[1] = min(stats[1], first)
+                stats[2] = max(stats[2], last)
+    
+    def _count_flag(self, flag: int) -> int:
+        """带指定标志位的帧数"""
+        return int(self.flag_counts[(np.arange(256) & flag) != 0].sum())
+    
+    def result(self) -> Dict[str, Any]:
+        """生成统计结果（格式与 get_statistics 一致）"""
+        if not self.total_messages:
+            return {}
+        
+        duration = self.time_end - self.time_start
+        tx_messages = self._count_flag(FLAG_TX)
+        
+        # CAN ID统计（按数量降序）
+        ordered = sorted(self.can_id_stats.items(), key=lambda x: x[1][0], reverse=True)
+        can_id_counts = {can_id: stats[0] for can_id, stats in ordered}
+        
+        return {
+            'total_messages': self.total_messages,
+            'unique_can_ids': len(can_id_counts),
+            'time_start': self.time_start,
+            'time_end': self.time_end,
+            'duration_seconds': duration,
+            'frequency_hz': self.total_messages / duration if duration > 0 else 0,
+            'rx_messages': self.total_messages - tx_messages,
+            'tx_messages': tx_messages,
+            'direction_counts': {'Rx': self.total_messages - tx_messages, 'Tx': tx_messages},
+            'extended_messages': self._count_flag(FLAG_EXTENDED),
+            'fd_messages': self._count_flag(FLAG_FD),
+            'can_id_counts': can_id_counts,
+            # CAN ID -> (最早时间戳, 最晚时间戳)，顺序与 can_id_counts 一致
+            'can_id_time_ranges': {can_id: (stats[1], stats[2]) for can_id, stats in ordered},
+            'channel_counts': dict(sorted(self.channel_counts.items())),
+            'dlc_counts': dict(sorted(self.dlc_counts.items())),
+            'most_frequent_can_id': next(iter(can_id_counts.items())) if can_id_counts else None,
+        }
 
 def demo_read_asc():
     """演示ASC文件读取"""
@@ -281,6 +1228,8 @@ def demo_read_asc():
         print(f"   平均频率: {stats['frequency_hz']:.2f}Hz")
         print(f"   RX消息: {stats['rx_messages']} 条")
         print(f"   TX消息: {stats['tx_messages']} 条")
+        print(f"   通道分布: " + ", ".join(f"CH{ch}: {count}" for ch, count in stats['channel_counts'].items()))
+        print(f"   DLC分布: " + ", ".join(f"{dlc}: {count}" for dlc, count in stats['dlc_counts'].items()))
         
         # 显示CAN ID分布
         if stats['can_id_counts']: